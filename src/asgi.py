@@ -0,0 +1,257 @@
+from contextlib import asynccontextmanager
+from urllib.parse import parse_qs
+import jwt
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.wsgi import WSGIMiddleware
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.http import parse_etags, quote_etag
+from src.main import app as flask_app
+from src.models.dashboard_snapshot import DashboardSnapshot
+from src.routes.reports import DASHBOARD_VERSIONS
+from src.utils.auth_tokens import cached_token_version, remember_token_version, token_version_statement
+from src.utils.change_versions import CACHE_CONTROL, compute_etag, versions_statement
+from src.utils.compression import AsgiCompressionMiddleware
+from src.utils.dashboard import dashboard_scopes, dashboard_stats, get_dashboard_snapshot, snapshot_is_settled
+from src.utils.jobs import ASYNC_ARGUMENT, ASYNC_VALUES
+from src.utils.reports import (
+    academic_performance_statement, summarize_academic_performance, attendance_statement, summarize_attendance
+)
+from src.utils.request_identity import Principal
+from src.utils.serializers import dumps
+
+# Run with `uvicorn src.asgi:app`: the read-only report and dashboard endpoints below are
+# served on async sessions, every other request goes to the Flask API
+
+config = flask_app.config
+
+# Async drivers of the database backends the sync API runs on
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql'
+}
+
+TEACHER_OR_ABOVE = ('admin', 'coordinator', 'teacher')
+
+
+def async_database_url():
+    if config['ASYNC_DATABASE_URL']:
+        return make_url(config['ASYNC_DATABASE_URL'])
+
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'No async driver known for {backend}; set ASYNC_DATABASE_URL')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def _create_engine():
+    url = async_database_url()
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # In-memory databases live on a single connection
+        return create_async_engine(url)
+    return create_async_engine(url, pool_size=config['ASYNC_POOL_SIZE'], pool_pre_ping=True)
+
+
+engine = _create_engine()
+Session = async_sessionmaker(engine, expire_on_commit=False)
+
+
+class ApiError(Exception):
+    """Error answered as {'error': message} with the given status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def json_response(payload, status=200, headers=None):
+    return Response(dumps(payload), status_code=status, media_type='application/json', headers=headers)
+
+
+async def authenticate(request, session):
+    """Principal of a bearer access token, checked against the account's token version"""
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        raise ApiError(401, 'Missing Authorization Header')
+
+    try:
+        claims = jwt.decode(
+            token, config['JWT_SECRET_KEY'],
+            algorithms=[config.get('JWT_ALGORITHM', 'HS256')],
+            audience=config.get('JWT_DECODE_AUDIENCE'),
+            issuer=config.get('JWT_DECODE_ISSUER'),
+            leeway=config.get('JWT_DECODE_LEEWAY', 0)
+        )
+    except jwt.ExpiredSignatureError:
+        raise ApiError(401, 'Token has expired')
+    except jwt.InvalidTokenError as e:
+        raise ApiError(422, str(e))
+
+    if claims.get('type') != 'access':
+        raise ApiError(422, 'Only access tokens are allowed')
+
+    user_id = int(claims['sub'])
+    hit, version = cached_token_version(user_id)
+    if not hit:
+        row = (await session.execute(token_version_statement(user_id))).first()
+        version = remember_token_version(user_id, row, config['TOKEN_VERSION_CACHE_SECONDS'])
+    if claims.get('ver') is None or claims['ver'] != version:
+        raise ApiError(401, 'Token is no longer valid, please log in again')
+
+    return Principal(
+        id=user_id,
+        role=claims.get('role'),
+        teacher_id=claims.get('teacher_id'),
+        student_id=claims.get('student_id')
+    )
+
+
+def require_teacher_or_above(principal):
+    if principal.role not in TEACHER_OR_ABOVE:
+        raise ApiError(403, 'Teacher access or above required')
+
+
+def int_arg(request, name):
+    """Integer query argument, None when missing or malformed (as Flask's type=int)"""
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return None
+
+
+async def current_etag(request, session, principal, keys, daily=False):
+    """The ETag conditional_get would compute for this request"""
+    keys = set(keys)
+    versions = dict.fromkeys(keys, 0)
+    if keys:
+        for row in await session.execute(versions_statement(keys)):
+            versions[(row.table_name, row.scope_id)] = row.version
+    return compute_etag(f'{request.url.path}?{request.url.query}', principal, versions, daily)
+
+
+def _settle_snapshots(scopes):
+    # Building or recounting a snapshot writes, which stays with the sync code
+    with flask_app.app_context():
+        for scope, owner_id in scopes:
+            get_dashboard_snapshot(scope, owner_id)
+
+
+@asynccontextmanager
+async def lifespan(api):
+    yield
+    await engine.dispose()
+
+
+read_api = FastAPI(title='SGA read API', docs_url=None, redoc_url=None, openapi_url=None, lifespan=lifespan)
+
+# Preflight requests go to Flask; the responses served here need the same CORS headers
+read_api.add_middleware(CORSMiddleware, allow_origins=config['CORS_ORIGINS'], allow_methods=['*'], allow_headers=['*'])
+
+# Flask responses are compressed by the WSGI middleware; these get the same negotiation
+read_api.add_middleware(AsgiCompressionMiddleware, config=config)
+
+
+@read_api.exception_handler(ApiError)
+async def api_error_response(request, error):
+    return json_response({'error': error.message}, error.status)
+
+
+@read_api.get('/api/reports/dashboard')
+async def get_dashboard_stats(request: Request):
+    """Get dashboard statistics"""
+    async with Session() as session:
+        principal = await authenticate(request, session)
+        try:
+            etag = await current_etag(request, session, principal, DASHBOARD_VERSIONS, daily=True)
+            headers = {'ETag': quote_etag(etag), 'Cache-Control': CACHE_CONTROL}
+            if parse_etags(request.headers.get('if-none-match')).contains(etag):
+                return Response(status_code=304, headers=headers)
+
+            scopes = dashboard_scopes(principal)
+            snapshots = [await session.get(DashboardSnapshot, key) for key in scopes]
+            if not all(snapshot_is_settled(snapshot) for snapshot in snapshots):
+                await run_in_threadpool(_settle_snapshots, scopes)
+                snapshots = [await session.get(DashboardSnapshot, key, populate_existing=True) for key in scopes]
+
+            return json_response(dashboard_stats(principal, snapshots), headers=headers)
+
+        except Exception as e:
+            return json_response({'error': str(e)}, 500)
+
+
+@read_api.get('/api/reports/academic-performance')
+async def get_academic_performance(request: Request):
+    """Get academic performance report"""
+    async with Session() as session:
+        principal = await authenticate(request, session)
+        require_teacher_or_above(principal)
+        try:
+            statement = academic_performance_statement(
+                principal,
+                course_id=int_arg(request, 'course_id'),
+                semester=request.query_params.get('semester'),
+                year=int_arg(request, 'year')
+            )
+
+            results = (await session.execute(statement)).all()
+
+            return json_response(summarize_academic_performance(results))
+
+        except Exception as e:
+            return json_response({'error': str(e)}, 500)
+
+
+@read_api.get('/api/reports/attendance')
+async def get_attendance_report(request: Request):
+    """Get attendance report"""
+    async with Session() as session:
+        principal = await authenticate(request, session)
+        require_teacher_or_above(principal)
+        try:
+            statement = attendance_statement(
+                principal,
+                class_id=int_arg(request, 'class_id'),
+                student_id=int_arg(request, 'student_id')
+            )
+
+            results = (await session.execute(statement)).all()
+
+            return json_response(summarize_attendance(results))
+
+        except Exception as e:
+            return json_response({'error': str(e)}, 500)
+
+
+class ReadDispatcher:
+    """ASGI app sending the requests read_api serves to it and everything else to Flask"""
+
+    def __init__(self, read_api, wsgi_app):
+        self.read_api = read_api
+        self.wsgi = WSGIMiddleware(wsgi_app)
+
+    def _served_async(self, scope):
+        if scope['method'] not in ('GET', 'HEAD'):
+            return False
+
+        # Requests queued as background jobs need the Flask job machinery
+        arguments = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        if arguments.get(ASYNC_ARGUMENT, [''])[0].lower() in ASYNC_VALUES:
+            return False
+
+        return any(route.matches(scope)[0] == Match.FULL for route in self.read_api.router.routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or self._served_async(scope):
+            await self.read_api(scope, receive, send)
+        else:
+            await self.wsgi(scope, receive, send)
+
+
+app = ReadDispatcher(read_api, flask_app)
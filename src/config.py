@@ -10,6 +10,58 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-string-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    TOKEN_VERSION_CACHE_SECONDS = 30  # How long a revoked token may still be accepted by other workers
+    
+    # X-Identity-Lookups diagnostic headers; off by default as they expose internal metrics
+    IDENTITY_LOOKUP_HEADERS = os.environ.get('IDENTITY_LOOKUP_HEADERS', '').lower() in ('1', 'true', 'yes')
+    
+    # Password hashing (bcrypt runs on a bounded worker pool)
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))  # Calibrate with `flask calibrate-bcrypt`
+    PASSWORD_HASH_EXECUTOR = os.environ.get('PASSWORD_HASH_EXECUTOR', 'thread')  # 'thread' or 'process'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 32))  # Waiting hashes before logins get 503
+    PASSWORD_HASH_TIMEOUT = 30
+    
+    # Bulk imports: rows committed per transaction and workers hashing their passwords
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+    IMPORT_HASH_WORKERS = int(os.environ.get('IMPORT_HASH_WORKERS', os.cpu_count() or 2))
+    
+    # Dashboard snapshots: seconds between background full rebuilds (0 disables)
+    DASHBOARD_REBUILD_INTERVAL = int(os.environ.get('DASHBOARD_REBUILD_INTERVAL', 0))
+    
+    # PDF transcripts: rendered on a process pool and cached on disk by content version
+    TRANSCRIPT_CACHE_DIR = os.environ.get('TRANSCRIPT_CACHE_DIR') or os.path.join(os.path.dirname(__file__), 'database', 'transcripts')
+    TRANSCRIPT_RENDER_WORKERS = int(os.environ.get('TRANSCRIPT_RENDER_WORKERS', 2))
+    TRANSCRIPT_RESOLVED_CACHE_SIZE = int(os.environ.get('TRANSCRIPT_RESOLVED_CACHE_SIZE', 2048))  # Students per worker
+    
+    # Background jobs (?async=1 on reports and exports), run by `flask run-job-workers`
+    JOB_RESULT_DIR = os.environ.get('JOB_RESULT_DIR') or os.path.join(os.path.dirname(__file__), 'database', 'jobs')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_POLL_INTERVAL = 1.0  # Seconds an idle worker waits before polling again
+    JOB_MAX_ATTEMPTS = 3
+    JOB_RETRY_DELAY = 10  # Seconds before the first retry, doubled on each further attempt
+    JOB_TIMEOUT = 1800  # Running jobs older than this are assumed orphaned and claimed again
+    JOB_RESULT_RETENTION = int(os.environ.get('JOB_RESULT_RETENTION', 7 * 24 * 3600))  # Seconds results are kept after a job finishes
+    JOB_SWEEP_INTERVAL = 3600  # Seconds between sweeps of expired results by an idle worker
+    
+    # Response compression (Brotli or gzip by Accept-Encoding); quality per route class, first matching prefix wins
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # Smaller bodies go out as they are
+    COMPRESSION_ROUTE_CLASSES = [
+        ('/api/exports', 'bulk'),
+        ('/api/jobs', 'bulk'),
+        ('/api/reports', 'report'),
+        ('/api', 'api')
+    ]
+    COMPRESSION_QUALITY = {
+        'api': {'br': 4, 'gzip': 6},  # Small JSON on every request: cheap levels
+        'report': {'br': 5, 'gzip': 6},
+        'bulk': {'br': 3, 'gzip': 4},  # Large streamed exports: keep up with the producer
+        'default': {'br': 6, 'gzip': 6}  # Frontend assets
+    }
+    
+    # Async read API (src/asgi.py); the URL defaults to DATABASE_URL with its async driver
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')
+    ASYNC_POOL_SIZE = int(os.environ.get('ASYNC_POOL_SIZE', 20))
     
     # CORS Configuration
     CORS_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000"]
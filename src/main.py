@@ -6,9 +6,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from flask import Flask, send_from_directory
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from flask_migrate import Migrate
 from src.models import db
 from src.config import config
 
+def running_migrations():
+    """Whether this process runs `flask db ...`, where Alembic owns the schema"""
+    program = os.path.basename(sys.argv[0]) if sys.argv else ''
+    is_flask = program in ('flask', 'flask.exe') or sys.argv[0].endswith(os.path.join('flask', '__main__.py'))
+    return is_flask and 'db' in sys.argv[1:]
+
 def create_app(config_name='default'):
     app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
     
@@ -19,6 +26,19 @@ def create_app(config_name='default'):
     db.init_app(app)
     CORS(app, origins=app.config['CORS_ORIGINS'])
     jwt = JWTManager(app)
+    migrate = Migrate(app, db, directory=os.path.join(os.path.dirname(__file__), 'migrations'), render_as_batch=True)
+    
+    # Tokens are checked against the account version instead of loading the user
+    from src.utils.auth_tokens import register_token_callbacks
+    register_token_callbacks(jwt)
+    
+    # Per-request identity cache and its lookup counters
+    from src.utils.request_identity import register_request_identity
+    register_request_identity(app)
+    
+    # Saturated password hashing answers 503 with Retry-After
+    from src.utils.passwords import register_password_pool_errors
+    register_password_pool_errors(app)
     
     # Import models to register them
     from src.models.user import User
@@ -33,6 +53,10 @@ def create_app(config_name='default'):
     from src.models.evaluation import Evaluation
     from src.models.grade import Grade
     from src.models.attendance import Attendance
+    from src.models.table_counter import TableCounter
+    from src.models.dashboard_snapshot import DashboardSnapshot
+    from src.models.job import Job
+    from src.models.change_version import ChangeVersion
     
     # Import blueprints
     from src.routes.auth import auth_bp
@@ -44,6 +68,8 @@ def create_app(config_name='default'):
     from src.routes.classes import classes_bp
     from src.routes.grades import grades_bp
     from src.routes.reports import reports_bp
+    from src.routes.exports import exports_bp
+    from src.routes.jobs import jobs_bp
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -55,14 +81,34 @@ def create_app(config_name='default'):
     app.register_blueprint(classes_bp, url_prefix='/api/classes')
     app.register_blueprint(grades_bp, url_prefix='/api/grades')
     app.register_blueprint(reports_bp, url_prefix='/api/reports')
+    app.register_blueprint(exports_bp, url_prefix='/api/exports')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    
+    # Negotiated Brotli/gzip compression of text and JSON responses
+    from src.utils.compression import CompressionMiddleware
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, app.config)
+    
+    # Register CLI commands
+    from src.utils.commands import register_commands
+    register_commands(app)
+    
+    # Create database tables (not under `flask db`: the models may be ahead of the schema being migrated)
+    if not running_migrations():
+        with app.app_context():
+            db.create_all()
+            
+            # Full-text search index (SQLite FTS5)
+            from src.utils.search_index import init_search_index
+            init_search_index(app)
+            
+            # Create default data if needed
+            from src.utils.seed_data import create_default_data
+            create_default_data()
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
-        
-        # Create default data if needed
-        from src.utils.seed_data import create_default_data
-        create_default_data()
+    # Background full rebuild of the dashboard snapshots
+    if app.config.get('DASHBOARD_REBUILD_INTERVAL') and not running_migrations():
+        from src.utils.dashboard import start_dashboard_rebuilder
+        start_dashboard_rebuilder(app, app.config['DASHBOARD_REBUILD_INTERVAL'])
     
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
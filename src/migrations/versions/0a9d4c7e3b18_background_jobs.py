@@ -0,0 +1,54 @@
+"""background jobs
+
+Revision ID: 0a9d4c7e3b18
+Revises: f3b7d1a6c205
+Create Date: 2026-10-16 10:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9d4c7e3b18'
+down_revision = 'f3b7d1a6c205'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('jobs'):
+        return
+
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('method', sa.String(length=10), nullable=False),
+        sa.Column('path', sa.String(length=500), nullable=False),
+        sa.Column('query_string', sa.Text(), nullable=True),
+        sa.Column('status', sa.Enum('queued', 'running', 'succeeded', 'failed', 'cancelled', name='job_status'), nullable=False),
+        sa.Column('progress', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('max_attempts', sa.Integer(), server_default='3', nullable=False),
+        sa.Column('run_after', sa.DateTime(), nullable=True),
+        sa.Column('worker', sa.String(length=100), nullable=True),
+        sa.Column('result_status', sa.Integer(), nullable=True),
+        sa.Column('result_mimetype', sa.String(length=200), nullable=True),
+        sa.Column('result_filename', sa.String(length=255), nullable=True),
+        sa.Column('result_size', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_status_run_after', 'jobs', ['status', 'run_after', 'id'])
+    op.create_index('ix_jobs_user_created_at', 'jobs', ['user_id', 'created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_jobs_user_created_at', table_name='jobs')
+    op.drop_index('ix_jobs_status_run_after', table_name='jobs')
+    op.drop_table('jobs')
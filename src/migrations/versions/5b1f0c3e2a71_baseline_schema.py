@@ -0,0 +1,264 @@
+"""baseline schema
+
+Revision ID: 5b1f0c3e2a71
+Revises:
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1f0c3e2a71'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _create_table(name, *columns):
+    # Databases created by db.create_all() already have the baseline tables
+    if not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *columns)
+
+
+def upgrade():
+    _create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=50), nullable=False),
+        sa.Column('email', sa.String(length=100), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=False),
+        sa.Column('last_name', sa.String(length=100), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('role', sa.Enum('admin', 'coordinator', 'teacher', 'student', name='user_roles'), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('last_login', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username')
+    )
+    _create_table(
+        'institutions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=False),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('email', sa.String(length=100), nullable=True),
+        sa.Column('website', sa.String(length=200), nullable=True),
+        sa.Column('logo_url', sa.String(length=500), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code')
+    )
+    _create_table(
+        'evaluation_types',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('default_weight', sa.Numeric(precision=3, scale=2), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    _create_table(
+        'courses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('institution_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('duration_semesters', sa.Integer(), nullable=False),
+        sa.Column('total_credits', sa.Integer(), nullable=True),
+        sa.Column('degree_type', sa.Enum('bachelor', 'master', 'doctorate', 'technical', 'other', name='degree_types'), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['institution_id'], ['institutions.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('institution_id', 'code', name='_institution_course_code_uc')
+    )
+    _create_table(
+        'teachers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('employee_number', sa.String(length=20), nullable=False),
+        sa.Column('department', sa.String(length=100), nullable=True),
+        sa.Column('specialization', sa.Text(), nullable=True),
+        sa.Column('academic_degree', sa.Enum('bachelor', 'master', 'doctorate', 'post_doctorate', name='academic_degrees'), nullable=False),
+        sa.Column('hire_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.Enum('active', 'inactive', 'on_leave', name='teacher_status'), nullable=True),
+        sa.Column('birth_date', sa.Date(), nullable=True),
+        sa.Column('gender', sa.Enum('M', 'F', 'other', name='gender_types'), nullable=True),
+        sa.Column('document_type', sa.String(length=20), nullable=True),
+        sa.Column('document_number', sa.String(length=50), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('city', sa.String(length=100), nullable=True),
+        sa.Column('state', sa.String(length=50), nullable=True),
+        sa.Column('zip_code', sa.String(length=20), nullable=True),
+        sa.Column('photo_url', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('employee_number'),
+        sa.UniqueConstraint('user_id')
+    )
+    _create_table(
+        'students',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('student_number', sa.String(length=20), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('enrollment_date', sa.Date(), nullable=False),
+        sa.Column('expected_graduation_date', sa.Date(), nullable=True),
+        sa.Column('status', sa.Enum('active', 'inactive', 'graduated', 'dropped', 'suspended', name='student_status'), nullable=True),
+        sa.Column('birth_date', sa.Date(), nullable=True),
+        sa.Column('gender', sa.Enum('M', 'F', 'other', name='gender_types'), nullable=True),
+        sa.Column('document_type', sa.String(length=20), nullable=True),
+        sa.Column('document_number', sa.String(length=50), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('city', sa.String(length=100), nullable=True),
+        sa.Column('state', sa.String(length=50), nullable=True),
+        sa.Column('zip_code', sa.String(length=20), nullable=True),
+        sa.Column('emergency_contact_name', sa.String(length=200), nullable=True),
+        sa.Column('emergency_contact_phone', sa.String(length=20), nullable=True),
+        sa.Column('photo_url', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('student_number'),
+        sa.UniqueConstraint('user_id')
+    )
+    _create_table(
+        'subjects',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('credits', sa.Integer(), nullable=False),
+        sa.Column('workload_hours', sa.Integer(), nullable=False),
+        sa.Column('semester', sa.Integer(), nullable=True),
+        sa.Column('is_mandatory', sa.Boolean(), nullable=True),
+        sa.Column('prerequisites', sa.Text(), nullable=True),
+        sa.Column('syllabus', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('course_id', 'code', name='_course_subject_code_uc')
+    )
+    _create_table(
+        'class_groups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subject_id', sa.Integer(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('semester', sa.String(length=10), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('class_code', sa.String(length=20), nullable=False),
+        sa.Column('max_students', sa.Integer(), nullable=True),
+        sa.Column('schedule_info', sa.Text(), nullable=True),
+        sa.Column('classroom', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.Enum('planned', 'active', 'completed', 'cancelled', name='class_status'), nullable=True),
+        sa.Column('start_date', sa.Date(), nullable=True),
+        sa.Column('end_date', sa.Date(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['subject_id'], ['subjects.id']),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('subject_id', 'class_code', 'semester', 'year', name='_subject_class_semester_uc')
+    )
+    _create_table(
+        'enrollments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('class_group_id', sa.Integer(), nullable=False),
+        sa.Column('enrollment_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.Enum('enrolled', 'dropped', 'completed', 'failed', name='enrollment_status'), nullable=True),
+        sa.Column('final_grade', sa.Numeric(precision=4, scale=2), nullable=True),
+        sa.Column('final_status', sa.Enum('approved', 'failed', 'incomplete', 'in_progress', name='final_status'), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['class_group_id'], ['class_groups.id']),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('student_id', 'class_group_id', name='_student_class_uc')
+    )
+    _create_table(
+        'evaluations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('class_group_id', sa.Integer(), nullable=False),
+        sa.Column('evaluation_type_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('weight', sa.Numeric(precision=3, scale=2), nullable=False),
+        sa.Column('max_score', sa.Numeric(precision=5, scale=2), nullable=False),
+        sa.Column('evaluation_date', sa.Date(), nullable=True),
+        sa.Column('due_date', sa.Date(), nullable=True),
+        sa.Column('is_published', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['class_group_id'], ['class_groups.id']),
+        sa.ForeignKeyConstraint(['evaluation_type_id'], ['evaluation_types.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    _create_table(
+        'grades',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('enrollment_id', sa.Integer(), nullable=False),
+        sa.Column('evaluation_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('comments', sa.Text(), nullable=True),
+        sa.Column('graded_by', sa.Integer(), nullable=True),
+        sa.Column('graded_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['enrollment_id'], ['enrollments.id']),
+        sa.ForeignKeyConstraint(['evaluation_id'], ['evaluations.id']),
+        sa.ForeignKeyConstraint(['graded_by'], ['teachers.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('enrollment_id', 'evaluation_id', name='_enrollment_evaluation_uc')
+    )
+    _create_table(
+        'attendance',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('enrollment_id', sa.Integer(), nullable=False),
+        sa.Column('class_date', sa.Date(), nullable=False),
+        sa.Column('class_period', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('present', 'absent', 'late', 'justified', name='attendance_status'), nullable=False),
+        sa.Column('comments', sa.Text(), nullable=True),
+        sa.Column('recorded_by', sa.Integer(), nullable=True),
+        sa.Column('recorded_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['enrollment_id'], ['enrollments.id']),
+        sa.ForeignKeyConstraint(['recorded_by'], ['teachers.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('enrollment_id', 'class_date', 'class_period', name='_enrollment_date_period_uc')
+    )
+
+
+def downgrade():
+    op.drop_table('attendance')
+    op.drop_table('grades')
+    op.drop_table('evaluations')
+    op.drop_table('enrollments')
+    op.drop_table('class_groups')
+    op.drop_table('subjects')
+    op.drop_table('students')
+    op.drop_table('teachers')
+    op.drop_table('courses')
+    op.drop_table('evaluation_types')
+    op.drop_table('institutions')
+    op.drop_table('users')
@@ -0,0 +1,35 @@
+"""change versions
+
+Revision ID: 5e1c8a3f9d27
+Revises: 0a9d4c7e3b18
+Create Date: 2026-10-16 10:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1c8a3f9d27'
+down_revision = '0a9d4c7e3b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Missing keys read as version 0, so there is nothing to backfill
+    if sa.inspect(op.get_bind()).has_table('change_versions'):
+        return
+
+    op.create_table(
+        'change_versions',
+        sa.Column('table_name', sa.String(length=100), nullable=False),
+        sa.Column('scope_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('table_name', 'scope_id')
+    )
+
+
+def downgrade():
+    op.drop_table('change_versions')
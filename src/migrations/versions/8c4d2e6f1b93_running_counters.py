@@ -0,0 +1,132 @@
+"""running counters on enrollments and evaluations, table row counters
+
+Revision ID: 8c4d2e6f1b93
+Revises: 5b1f0c3e2a71
+Create Date: 2026-10-16 09:10:00.000000
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4d2e6f1b93'
+down_revision = '5b1f0c3e2a71'
+branch_labels = None
+depends_on = None
+
+SCORE_HISTOGRAM_BUCKETS = 10
+
+ENROLLMENT_COLUMNS = [
+    ('grade_weighted_sum', sa.Numeric(precision=10, scale=4)),
+    ('grade_total_weight', sa.Numeric(precision=10, scale=4)),
+    ('attendance_total', sa.Integer()),
+    ('attendance_present', sa.Integer()),
+    ('attendance_late', sa.Integer()),
+    ('attendance_absent', sa.Integer()),
+    ('attendance_justified', sa.Integer())
+]
+
+EVALUATION_COLUMNS = [
+    ('score_count', sa.Integer()),
+    ('score_sum', sa.Numeric(precision=12, scale=4)),
+    ('score_sum_squares', sa.Numeric(precision=16, scale=4))
+]
+
+
+def _add_missing_columns(table_name, columns):
+    """Add columns with a constant server default; SQLite does this without copying the table"""
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table_name)}
+    added = []
+    for name, type_ in columns:
+        if name not in existing:
+            op.add_column(table_name, sa.Column(name, type_, nullable=False, server_default='0'))
+            added.append(name)
+    return added
+
+
+def _backfill_enrollments():
+    op.execute("""
+        UPDATE enrollments SET
+            grade_weighted_sum = COALESCE((
+                SELECT SUM(g.score * e.weight) FROM grades g
+                JOIN evaluations e ON e.id = g.evaluation_id
+                WHERE g.enrollment_id = enrollments.id AND g.score IS NOT NULL), 0),
+            grade_total_weight = COALESCE((
+                SELECT SUM(e.weight) FROM grades g
+                JOIN evaluations e ON e.id = g.evaluation_id
+                WHERE g.enrollment_id = enrollments.id AND g.score IS NOT NULL), 0),
+            attendance_total = (SELECT COUNT(*) FROM attendance a WHERE a.enrollment_id = enrollments.id),
+            attendance_present = (SELECT COUNT(*) FROM attendance a WHERE a.enrollment_id = enrollments.id AND a.status = 'present'),
+            attendance_late = (SELECT COUNT(*) FROM attendance a WHERE a.enrollment_id = enrollments.id AND a.status = 'late'),
+            attendance_absent = (SELECT COUNT(*) FROM attendance a WHERE a.enrollment_id = enrollments.id AND a.status = 'absent'),
+            attendance_justified = (SELECT COUNT(*) FROM attendance a WHERE a.enrollment_id = enrollments.id AND a.status = 'justified')
+    """)
+    op.execute("""
+        UPDATE enrollments SET final_grade = CASE
+            WHEN grade_total_weight > 0 THEN ROUND(grade_weighted_sum / grade_total_weight, 2)
+            ELSE NULL END
+    """)
+
+
+def _backfill_evaluations():
+    op.execute("""
+        UPDATE evaluations SET
+            score_count = (SELECT COUNT(g.score) FROM grades g WHERE g.evaluation_id = evaluations.id),
+            score_sum = COALESCE((SELECT SUM(g.score) FROM grades g WHERE g.evaluation_id = evaluations.id), 0),
+            score_sum_squares = COALESCE((SELECT SUM(g.score * g.score) FROM grades g WHERE g.evaluation_id = evaluations.id), 0)
+    """)
+
+    # Histogram buckets mirror src.utils.evaluation_stats.score_bucket
+    connection = op.get_bind()
+    histograms = {}
+    rows = connection.execute(sa.text(
+        "SELECT e.id, e.max_score, g.score FROM evaluations e "
+        "LEFT JOIN grades g ON g.evaluation_id = e.id AND g.score IS NOT NULL"
+    ))
+    for evaluation_id, max_score, score in rows:
+        histogram = histograms.setdefault(evaluation_id, [0] * SCORE_HISTOGRAM_BUCKETS)
+        if score is None:
+            continue
+        bucket = int(float(score) / float(max_score) * SCORE_HISTOGRAM_BUCKETS) if max_score else 0
+        histogram[min(max(bucket, 0), SCORE_HISTOGRAM_BUCKETS - 1)] += 1
+
+    update = sa.text("UPDATE evaluations SET score_histogram = :histogram WHERE id = :id")
+    for evaluation_id, histogram in histograms.items():
+        connection.execute(update, {'id': evaluation_id, 'histogram': json.dumps(histogram)})
+
+
+def upgrade():
+    if _add_missing_columns('enrollments', ENROLLMENT_COLUMNS):
+        _backfill_enrollments()
+
+    evaluation_columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('evaluations')}
+    added = _add_missing_columns('evaluations', EVALUATION_COLUMNS)
+    if 'score_histogram' not in evaluation_columns:
+        op.add_column('evaluations', sa.Column('score_histogram', sa.Text(), nullable=True))
+        added.append('score_histogram')
+    if added:
+        _backfill_evaluations()
+
+    if not sa.inspect(op.get_bind()).has_table('table_counters'):
+        op.create_table(
+            'table_counters',
+            sa.Column('table_name', sa.String(length=100), nullable=False),
+            sa.Column('row_count', sa.Integer(), nullable=False),
+            sa.Column('counted_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('table_name')
+        )
+
+
+def downgrade():
+    op.drop_table('table_counters')
+
+    with op.batch_alter_table('evaluations') as batch_op:
+        batch_op.drop_column('score_histogram')
+        for name, _ in reversed(EVALUATION_COLUMNS):
+            batch_op.drop_column(name)
+
+    with op.batch_alter_table('enrollments') as batch_op:
+        for name, _ in reversed(ENROLLMENT_COLUMNS):
+            batch_op.drop_column(name)
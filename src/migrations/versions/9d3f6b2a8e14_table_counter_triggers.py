@@ -0,0 +1,108 @@
+"""table counter triggers
+
+Revision ID: 9d3f6b2a8e14
+Revises: 5e1c8a3f9d27
+Create Date: 2026-10-16 15:20:00.000000
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3f6b2a8e14'
+down_revision = '5e1c8a3f9d27'
+branch_labels = None
+depends_on = None
+
+# Copied from src.models.table_counter so this revision keeps working as the models change
+COUNTED_TABLES = (
+    'users', 'students', 'teachers', 'courses', 'subjects', 'class_groups', 'grades', 'jobs'
+)
+
+SQLITE_TRIGGERS = [
+    (
+        '{table}_count_insert',
+        "CREATE TRIGGER IF NOT EXISTS {name} AFTER INSERT ON {table} BEGIN "
+        "UPDATE table_counters SET row_count = row_count + 1 WHERE table_name = '{table}'; END"
+    ),
+    (
+        '{table}_count_delete',
+        "CREATE TRIGGER IF NOT EXISTS {name} AFTER DELETE ON {table} BEGIN "
+        "UPDATE table_counters SET row_count = row_count - 1 WHERE table_name = '{table}'; END"
+    )
+]
+
+POSTGRESQL_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION shift_table_counter() RETURNS trigger AS $$ "
+    "BEGIN "
+    "UPDATE table_counters SET row_count = row_count + (CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END) "
+    "WHERE table_name = TG_TABLE_NAME; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql"
+)
+
+POSTGRESQL_TRIGGERS = [
+    (
+        '{table}_row_count',
+        "CREATE TRIGGER {name} AFTER INSERT OR DELETE ON {table} "
+        "FOR EACH ROW EXECUTE FUNCTION shift_table_counter()"
+    )
+]
+
+
+def _triggers(dialect):
+    return POSTGRESQL_TRIGGERS if dialect == 'postgresql' else SQLITE_TRIGGERS
+
+
+def upgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        # Without triggers the counters would drift; estimated totals fall back to exact counts
+        op.execute("DELETE FROM table_counters")
+        return
+
+    if dialect == 'postgresql':
+        op.execute(POSTGRESQL_FUNCTION)
+    for table_name in COUNTED_TABLES:
+        for name, statement in _triggers(dialect):
+            name = name.format(table=table_name)
+            if dialect == 'postgresql':
+                op.execute(f'DROP TRIGGER IF EXISTS {name} ON {table_name}')
+            op.execute(statement.format(name=name, table=table_name))
+
+    # Counters lazily seeded by list requests may have drifted; recount every table under its trigger
+    counters = sa.table(
+        'table_counters',
+        sa.column('table_name', sa.String),
+        sa.column('row_count', sa.Integer),
+        sa.column('counted_at', sa.DateTime)
+    )
+    op.execute(counters.delete())
+    now = datetime.utcnow()
+    op.bulk_insert(counters, [
+        {
+            'table_name': table_name,
+            'row_count': bind.execute(sa.text(f'SELECT COUNT(*) FROM {table_name}')).scalar(),
+            'counted_at': now
+        }
+        for table_name in COUNTED_TABLES
+    ])
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        return
+
+    for table_name in COUNTED_TABLES:
+        for name, _ in _triggers(dialect):
+            name = name.format(table=table_name)
+            if dialect == 'postgresql':
+                op.execute(f'DROP TRIGGER IF EXISTS {name} ON {table_name}')
+            else:
+                op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    if dialect == 'postgresql':
+        op.execute('DROP FUNCTION IF EXISTS shift_table_counter()')
@@ -0,0 +1,64 @@
+"""index pack matched to the route query shapes
+
+Revision ID: c7e95a0d4f28
+Revises: 8c4d2e6f1b93
+Create Date: 2026-10-16 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e95a0d4f28'
+down_revision = '8c4d2e6f1b93'
+branch_labels = None
+depends_on = None
+
+# Foreign keys leading a unique constraint (grades.enrollment_id, attendance.enrollment_id,
+# enrollments.student_id, class_groups.subject_id, students/teachers.user_id) are already
+# served by the constraint's own index.
+INDEXES = [
+    ('ix_users_role_active', 'users', ['role', 'is_active']),
+    ('ix_users_name', 'users', ['first_name', 'last_name', 'id']),
+    ('ix_users_created_at', 'users', ['created_at', 'id']),
+    ('ix_students_course_status', 'students', ['course_id', 'status']),
+    ('ix_students_status', 'students', ['status']),
+    ('ix_students_created_at', 'students', ['created_at', 'id']),
+    ('ix_teachers_status', 'teachers', ['status']),
+    ('ix_teachers_created_at', 'teachers', ['created_at', 'id']),
+    ('ix_courses_active_degree', 'courses', ['is_active', 'degree_type']),
+    ('ix_courses_name', 'courses', ['name', 'id']),
+    ('ix_courses_created_at', 'courses', ['created_at', 'id']),
+    ('ix_subjects_course_semester', 'subjects', ['course_id', 'semester', 'is_active']),
+    ('ix_subjects_active', 'subjects', ['is_active']),
+    ('ix_subjects_name', 'subjects', ['name', 'id']),
+    ('ix_subjects_created_at', 'subjects', ['created_at', 'id']),
+    ('ix_class_groups_teacher_term', 'class_groups', ['teacher_id', 'status', 'semester', 'year']),
+    ('ix_class_groups_term', 'class_groups', ['year', 'semester', 'status']),
+    ('ix_class_groups_class_code', 'class_groups', ['class_code', 'id']),
+    ('ix_class_groups_created_at', 'class_groups', ['created_at', 'id']),
+    ('ix_enrollments_class_group_status', 'enrollments', ['class_group_id', 'status']),
+    ('ix_enrollments_student_status', 'enrollments', ['student_id', 'status']),
+    ('ix_evaluations_class_group_date', 'evaluations', ['class_group_id', 'evaluation_date']),
+    ('ix_evaluations_evaluation_type_id', 'evaluations', ['evaluation_type_id']),
+    ('ix_grades_evaluation_score', 'grades', ['evaluation_id', 'score']),
+    ('ix_grades_graded_by', 'grades', ['graded_by']),
+    ('ix_grades_created_at', 'grades', ['created_at', 'id']),
+    ('ix_attendance_enrollment_status', 'attendance', ['enrollment_id', 'status']),
+    ('ix_attendance_class_date', 'attendance', ['class_date']),
+]
+
+
+def upgrade():
+    # CREATE INDEX only takes a write lock on SQLite, readers keep going while it builds
+    for name, table_name, columns in INDEXES:
+        op.create_index(name, table_name, columns, unique=False, if_not_exists=True)
+    if op.get_bind().dialect.name == 'sqlite':
+        # Refresh planner statistics so the new composite indexes get picked
+        op.execute('ANALYZE')
+
+
+def downgrade():
+    for name, table_name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table_name, if_exists=True)
@@ -0,0 +1,44 @@
+"""dashboard snapshots
+
+Revision ID: e2a8b5c91d46
+Revises: c7e95a0d4f28
+Create Date: 2026-10-16 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a8b5c91d46'
+down_revision = 'c7e95a0d4f28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows are built lazily by the dashboard endpoint, so there is nothing to backfill
+    if sa.inspect(op.get_bind()).has_table('dashboard_snapshots'):
+        return
+
+    op.create_table(
+        'dashboard_snapshots',
+        sa.Column('scope', sa.Enum('global', 'teacher', 'student', name='dashboard_scopes'), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('total_students', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_teachers', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_courses', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_subjects', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('active_classes', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('pending_grades', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('pending_stale', sa.Boolean(), server_default='0', nullable=False),
+        sa.Column('recent_enrollments', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('recent_since', sa.Date(), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('scope', 'owner_id')
+    )
+
+
+def downgrade():
+    op.drop_table('dashboard_snapshots')
@@ -0,0 +1,27 @@
+"""user token version
+
+Revision ID: f3b7d1a6c205
+Revises: e2a8b5c91d46
+Create Date: 2026-10-16 09:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b7d1a6c205'
+down_revision = 'e2a8b5c91d46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('users')}
+    if 'token_version' not in columns:
+        op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('token_version')
@@ -1,14 +1,29 @@
 from datetime import datetime, date
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import column_property
 from src.models import db
+from src.models.enrollment import Enrollment
+
+# Enrollment counter column for each attendance status
+ATTENDANCE_COUNTERS = {
+    'present': 'attendance_present',
+    'late': 'attendance_late',
+    'absent': 'attendance_absent',
+    'justified': 'attendance_justified'
+}
 
 class Attendance(db.Model):
     __tablename__ = 'attendance'
     
     id = db.Column(db.Integer, primary_key=True)
-    enrollment_id = db.Column(db.Integer, db.ForeignKey('enrollments.id'), nullable=False)
+    # Old values are loaded before a change so the counters can move off them, even when expired
+    enrollment_id = column_property(db.Column(db.Integer, db.ForeignKey('enrollments.id'), nullable=False), active_history=True)
     class_date = db.Column(db.Date, nullable=False)
     class_period = db.Column(db.Integer, nullable=False)  # 1, 2, 3, etc. (classes of the day)
-    status = db.Column(db.Enum('present', 'absent', 'late', 'justified', name='attendance_status'), nullable=False)
+    status = column_property(
+        db.Column(db.Enum('present', 'absent', 'late', 'justified', name='attendance_status'), nullable=False),
+        active_history=True
+    )
     comments = db.Column(db.Text)
     recorded_by = db.Column(db.Integer, db.ForeignKey('teachers.id'))
     recorded_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -18,8 +33,12 @@ class Attendance(db.Model):
     # Relationships
     recorder = db.relationship('Teacher', foreign_keys=[recorded_by])
     
-    # Unique constraint
-    __table_args__ = (db.UniqueConstraint('enrollment_id', 'class_date', 'class_period', name='_enrollment_date_period_uc'),)
+    # Unique constraint and indexes matched to the list and report filters
+    __table_args__ = (
+        db.UniqueConstraint('enrollment_id', 'class_date', 'class_period', name='_enrollment_date_period_uc'),
+        db.Index('ix_attendance_enrollment_status', 'enrollment_id', 'status'),
+        db.Index('ix_attendance_class_date', 'class_date')
+    )
     
     def to_dict(self):
         return {
@@ -40,3 +59,47 @@ class Attendance(db.Model):
     def __repr__(self):
         return f'<Attendance {self.enrollment_id} - {self.class_date}: {self.status}>'
 
+
+def shift_attendance_counters(connection, enrollment_id, status, step):
+    """Add step to an enrollment's total and per-status attendance counters
+
+    Runs inside the attendance flush, whose change version listener also bumps the
+    enrollments keys (change_versions.DERIVED_VERSIONS).
+    """
+    if enrollment_id is None or status not in ATTENDANCE_COUNTERS:
+        return
+    
+    enrollments = Enrollment.__table__
+    column = ATTENDANCE_COUNTERS[status]
+    connection.execute(
+        update(enrollments).where(enrollments.c.id == enrollment_id).values({
+            'attendance_total': enrollments.c.attendance_total + step,
+            column: enrollments.c[column] + step
+        })
+    )
+
+
+@event.listens_for(Attendance, 'after_insert')
+def _count_inserted_attendance(mapper, connection, target):
+    shift_attendance_counters(connection, target.enrollment_id, target.status, 1)
+
+
+@event.listens_for(Attendance, 'after_update')
+def _count_updated_attendance(mapper, connection, target):
+    state = inspect(target)
+    status_history = state.attrs.status.history
+    enrollment_history = state.attrs.enrollment_id.history
+    
+    if not status_history.has_changes() and not enrollment_history.has_changes():
+        return
+    
+    old_status = status_history.deleted[0] if status_history.deleted else target.status
+    old_enrollment_id = enrollment_history.deleted[0] if enrollment_history.deleted else target.enrollment_id
+    
+    shift_attendance_counters(connection, old_enrollment_id, old_status, -1)
+    shift_attendance_counters(connection, target.enrollment_id, target.status, 1)
+
+
+@event.listens_for(Attendance, 'after_delete')
+def _count_deleted_attendance(mapper, connection, target):
+    shift_attendance_counters(connection, target.enrollment_id, target.status, -1)
@@ -0,0 +1,22 @@
+from datetime import datetime
+from src.models import db
+
+class ChangeVersion(db.Model):
+    __tablename__ = 'change_versions'
+
+    # One row per table (scope_id 0) plus one per class group for class-scoped tables
+    table_name = db.Column(db.String(100), primary_key=True)
+    scope_id = db.Column(db.Integer, primary_key=True, default=0)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'table_name': self.table_name,
+            'scope_id': self.scope_id,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<ChangeVersion {self.table_name}:{self.scope_id} v{self.version}>'
@@ -23,8 +23,14 @@ class ClassGroup(db.Model):
     enrollments = db.relationship('Enrollment', backref='class_group', lazy=True, cascade='all, delete-orphan')
     evaluations = db.relationship('Evaluation', backref='class_group', lazy=True, cascade='all, delete-orphan')
     
-    # Unique constraint
-    __table_args__ = (db.UniqueConstraint('subject_id', 'class_code', 'semester', 'year', name='_subject_class_semester_uc'),)
+    # Unique constraint and indexes matched to the list and report filters
+    __table_args__ = (
+        db.UniqueConstraint('subject_id', 'class_code', 'semester', 'year', name='_subject_class_semester_uc'),
+        db.Index('ix_class_groups_teacher_term', 'teacher_id', 'status', 'semester', 'year'),
+        db.Index('ix_class_groups_term', 'year', 'semester', 'status'),
+        db.Index('ix_class_groups_class_code', 'class_code', 'id'),
+        db.Index('ix_class_groups_created_at', 'created_at', 'id')
+    )
     
     @property
     def enrolled_students_count(self):
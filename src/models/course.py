@@ -20,8 +20,13 @@ class Course(db.Model):
     subjects = db.relationship('Subject', backref='course', lazy=True, cascade='all, delete-orphan')
     students = db.relationship('Student', backref='course', lazy=True)
     
-    # Unique constraint
-    __table_args__ = (db.UniqueConstraint('institution_id', 'code', name='_institution_course_code_uc'),)
+    # Unique constraint and indexes matched to the list and report filters
+    __table_args__ = (
+        db.UniqueConstraint('institution_id', 'code', name='_institution_course_code_uc'),
+        db.Index('ix_courses_active_degree', 'is_active', 'degree_type'),
+        db.Index('ix_courses_name', 'name', 'id'),
+        db.Index('ix_courses_created_at', 'created_at', 'id')
+    )
     
     def to_dict(self):
         return {
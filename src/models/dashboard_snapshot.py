@@ -0,0 +1,36 @@
+from datetime import datetime
+from src.models import db
+
+class DashboardSnapshot(db.Model):
+    __tablename__ = 'dashboard_snapshots'
+
+    # One 'global' row (owner_id 0) plus one row per teacher and per student
+    scope = db.Column(db.Enum('global', 'teacher', 'student', name='dashboard_scopes'), primary_key=True)
+    owner_id = db.Column(db.Integer, primary_key=True, default=0)
+    total_students = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_teachers = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_courses = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_subjects = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    active_classes = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pending_grades = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pending_stale = db.Column(db.Boolean, nullable=False, default=False, server_default='0')  # Recount pending_grades on next read
+    recent_enrollments = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    recent_since = db.Column(db.Date)  # First day counted by recent_enrollments
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)  # Last full recount
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)  # Last incremental update
+
+    def to_dict(self):
+        return {
+            'total_students': self.total_students,
+            'total_teachers': self.total_teachers,
+            'total_courses': self.total_courses,
+            'total_subjects': self.total_subjects,
+            'active_classes': self.active_classes,
+            'pending_grades': self.pending_grades,
+            'recent_enrollments': self.recent_enrollments,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<DashboardSnapshot {self.scope}:{self.owner_id}>'
@@ -10,6 +10,15 @@ class Enrollment(db.Model):
     enrollment_date = db.Column(db.Date, nullable=False, default=date.today)
     status = db.Column(db.Enum('enrolled', 'dropped', 'completed', 'failed', name='enrollment_status'), default='enrolled')
     final_grade = db.Column(db.Numeric(4, 2))
+    # Running totals behind final_grade, maintained by grade writes
+    grade_weighted_sum = db.Column(db.Numeric(10, 4), nullable=False, default=0, server_default='0')
+    grade_total_weight = db.Column(db.Numeric(10, 4), nullable=False, default=0, server_default='0')
+    # Attendance counters, maintained by Attendance writes
+    attendance_total = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    attendance_present = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    attendance_late = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    attendance_absent = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    attendance_justified = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     final_status = db.Column(db.Enum('approved', 'failed', 'incomplete', 'in_progress', name='final_status'), default='in_progress')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -18,17 +27,18 @@ class Enrollment(db.Model):
     grades = db.relationship('Grade', backref='enrollment', lazy=True, cascade='all, delete-orphan')
     attendance_records = db.relationship('Attendance', backref='enrollment', lazy=True, cascade='all, delete-orphan')
     
-    # Unique constraint
-    __table_args__ = (db.UniqueConstraint('student_id', 'class_group_id', name='_student_class_uc'),)
+    # Unique constraint and indexes matched to the list and report filters
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'class_group_id', name='_student_class_uc'),
+        db.Index('ix_enrollments_class_group_status', 'class_group_id', 'status'),
+        db.Index('ix_enrollments_student_status', 'student_id', 'status')
+    )
     
     @property
     def attendance_percentage(self):
-        """Calculate attendance percentage"""
-        if not self.attendance_records:
-            return 0
-        
-        total_classes = len(self.attendance_records)
-        present_classes = len([a for a in self.attendance_records if a.status in ['present', 'late']])
+        """Calculate attendance percentage from the attendance counters"""
+        total_classes = self.attendance_total or 0
+        present_classes = (self.attendance_present or 0) + (self.attendance_late or 0)
         
         return round((present_classes / total_classes) * 100, 2) if total_classes > 0 else 0
     
@@ -1,6 +1,11 @@
+import json
+import math
 from datetime import datetime, date
 from src.models import db
 
+# Score histogram buckets, each covering a tenth of max_score
+SCORE_HISTOGRAM_BUCKETS = 10
+
 class Evaluation(db.Model):
     __tablename__ = 'evaluations'
     
@@ -14,23 +19,46 @@ class Evaluation(db.Model):
     evaluation_date = db.Column(db.Date)
     due_date = db.Column(db.Date)
     is_published = db.Column(db.Boolean, default=False)
+    # Running score statistics, maintained by grade writes
+    score_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    score_sum = db.Column(db.Numeric(12, 4), nullable=False, default=0, server_default='0')
+    score_sum_squares = db.Column(db.Numeric(16, 4), nullable=False, default=0, server_default='0')
+    score_histogram = db.Column(db.Text)  # JSON array with one count per histogram bucket
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     grades = db.relationship('Grade', backref='evaluation', lazy=True, cascade='all, delete-orphan')
     
+    # Indexes matched to the list and report filters
+    __table_args__ = (
+        db.Index('ix_evaluations_class_group_date', 'class_group_id', 'evaluation_date'),
+        db.Index('ix_evaluations_evaluation_type_id', 'evaluation_type_id')
+    )
+    
     @property
     def grades_count(self):
-        return len(self.grades)
+        return self.score_count or 0
     
     @property
     def average_score(self):
-        if not self.grades:
+        if not self.score_count:
+            return None
+        
+        return round(float(self.score_sum) / self.score_count, 2)
+    
+    @property
+    def score_std_dev(self):
+        if not self.score_count:
             return None
         
-        valid_scores = [float(g.score) for g in self.grades if g.score is not None]
-        return round(sum(valid_scores) / len(valid_scores), 2) if valid_scores else None
+        mean = float(self.score_sum) / self.score_count
+        variance = float(self.score_sum_squares) / self.score_count - mean ** 2
+        return round(math.sqrt(max(variance, 0)), 2)
+    
+    @property
+    def score_distribution(self):
+        return json.loads(self.score_histogram) if self.score_histogram else [0] * SCORE_HISTOGRAM_BUCKETS
     
     def to_dict(self):
         return {
@@ -46,6 +74,8 @@ class Evaluation(db.Model):
             'is_published': self.is_published,
             'grades_count': self.grades_count,
             'average_score': self.average_score,
+            'score_std_dev': self.score_std_dev,
+            'score_distribution': self.score_distribution,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'class_group': self.class_group.to_dict() if self.class_group else None,
@@ -17,8 +17,13 @@ class Grade(db.Model):
     # Relationships
     grader = db.relationship('Teacher', foreign_keys=[graded_by])
     
-    # Unique constraint
-    __table_args__ = (db.UniqueConstraint('enrollment_id', 'evaluation_id', name='_enrollment_evaluation_uc'),)
+    # Unique constraint and indexes matched to the list and report filters
+    __table_args__ = (
+        db.UniqueConstraint('enrollment_id', 'evaluation_id', name='_enrollment_evaluation_uc'),
+        db.Index('ix_grades_evaluation_score', 'evaluation_id', 'score'),
+        db.Index('ix_grades_graded_by', 'graded_by'),
+        db.Index('ix_grades_created_at', 'created_at', 'id')
+    )
     
     @property
     def percentage_score(self):
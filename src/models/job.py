@@ -0,0 +1,66 @@
+from datetime import datetime
+from src.models import db
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    method = db.Column(db.String(10), nullable=False, default='GET')
+    path = db.Column(db.String(500), nullable=False)  # Endpoint replayed by the worker
+    query_string = db.Column(db.Text)
+    status = db.Column(db.Enum(*JOB_STATUSES, name='job_status'), nullable=False, default='queued')
+    progress = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Percent done
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    max_attempts = db.Column(db.Integer, nullable=False, default=3, server_default='3')
+    run_after = db.Column(db.DateTime, default=datetime.utcnow)  # Earliest start, pushed back on retry
+    worker = db.Column(db.String(100))  # host:pid of the worker that claimed it
+    result_status = db.Column(db.Integer)  # HTTP status the endpoint answered with
+    result_mimetype = db.Column(db.String(200))
+    result_filename = db.Column(db.String(255))
+    result_size = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    # Workers claim the oldest runnable job; owners list their latest jobs
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after', 'id'),
+        db.Index('ix_jobs_user_created_at', 'user_id', 'created_at', 'id')
+    )
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'method': self.method,
+            'path': self.path,
+            'query_string': self.query_string,
+            'status': self.status,
+            'progress': self.progress,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'result': {
+                'status': self.result_status,
+                'mimetype': self.result_mimetype,
+                'filename': self.result_filename,
+                'size': self.result_size,
+                'url': f'/api/jobs/{self.id}/result'
+            } if self.status == 'succeeded' else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.method} {self.path}: {self.status}>'
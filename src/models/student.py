@@ -28,6 +28,13 @@ class Student(db.Model):
     # Relationships
     enrollments = db.relationship('Enrollment', backref='student', lazy=True, cascade='all, delete-orphan')
     
+    # Indexes matched to the list and report filters
+    __table_args__ = (
+        db.Index('ix_students_course_status', 'course_id', 'status'),
+        db.Index('ix_students_status', 'status'),
+        db.Index('ix_students_created_at', 'created_at', 'id')
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
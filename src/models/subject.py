@@ -22,8 +22,14 @@ class Subject(db.Model):
     # Relationships
     class_groups = db.relationship('ClassGroup', backref='subject', lazy=True, cascade='all, delete-orphan')
     
-    # Unique constraint
-    __table_args__ = (db.UniqueConstraint('course_id', 'code', name='_course_subject_code_uc'),)
+    # Unique constraint and indexes matched to the list and report filters
+    __table_args__ = (
+        db.UniqueConstraint('course_id', 'code', name='_course_subject_code_uc'),
+        db.Index('ix_subjects_course_semester', 'course_id', 'semester', 'is_active'),
+        db.Index('ix_subjects_active', 'is_active'),
+        db.Index('ix_subjects_name', 'name', 'id'),
+        db.Index('ix_subjects_created_at', 'created_at', 'id')
+    )
     
     def to_dict(self):
         return {
@@ -0,0 +1,117 @@
+from datetime import datetime
+from sqlalchemy import event, text
+from src.models import db
+
+# Tables behind list endpoints whose unfiltered totals may be estimated
+COUNTED_TABLES = (
+    'users', 'students', 'teachers', 'courses', 'subjects', 'class_groups', 'grades', 'jobs'
+)
+
+class TableCounter(db.Model):
+    __tablename__ = 'table_counters'
+
+    table_name = db.Column(db.String(100), primary_key=True)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    counted_at = db.Column(db.DateTime, default=datetime.utcnow)  # Last full recount
+
+    def to_dict(self):
+        return {
+            'table_name': self.table_name,
+            'row_count': self.row_count,
+            'counted_at': self.counted_at.isoformat() if self.counted_at else None
+        }
+
+    def __repr__(self):
+        return f'<TableCounter {self.table_name}: {self.row_count}>'
+
+
+# Row counters are kept by the database itself, so ORM flushes, Core statements and
+# raw SQL all move them; dialects without a definition here are always counted exactly
+_SQLITE_TRIGGERS = [
+    (
+        '{table}_count_insert',
+        "CREATE TRIGGER {name} AFTER INSERT ON {table} BEGIN "
+        "UPDATE table_counters SET row_count = row_count + 1 WHERE table_name = '{table}'; END"
+    ),
+    (
+        '{table}_count_delete',
+        "CREATE TRIGGER {name} AFTER DELETE ON {table} BEGIN "
+        "UPDATE table_counters SET row_count = row_count - 1 WHERE table_name = '{table}'; END"
+    )
+]
+
+_POSTGRESQL_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION shift_table_counter() RETURNS trigger AS $$ "
+    "BEGIN "
+    "UPDATE table_counters SET row_count = row_count + (CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END) "
+    "WHERE table_name = TG_TABLE_NAME; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql"
+)
+
+_POSTGRESQL_TRIGGERS = [
+    (
+        '{table}_row_count',
+        "CREATE TRIGGER {name} AFTER INSERT OR DELETE ON {table} "
+        "FOR EACH ROW EXECUTE FUNCTION shift_table_counter()"
+    )
+]
+
+_TRIGGER_EXISTS = {
+    'sqlite': "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name",
+    'postgresql': "SELECT 1 FROM pg_trigger WHERE tgname = :name"
+}
+
+
+def counter_triggers_supported(dialect_name):
+    return dialect_name in _TRIGGER_EXISTS
+
+
+def install_counter_triggers(connection):
+    """Create the row counting triggers that are missing and recount the tables they now cover"""
+    dialect = connection.dialect.name
+    if not counter_triggers_supported(dialect):
+        return []
+
+    if dialect == 'postgresql':
+        connection.execute(text(_POSTGRESQL_FUNCTION))
+        triggers = _POSTGRESQL_TRIGGERS
+    else:
+        triggers = _SQLITE_TRIGGERS
+
+    installed = []
+    for table_name in COUNTED_TABLES:
+        created = False
+        for name, statement in triggers:
+            name = name.format(table=table_name)
+            if connection.execute(text(_TRIGGER_EXISTS[dialect]), {'name': name}).first() is None:
+                connection.execute(text(statement.format(name=name, table=table_name)))
+                created = True
+
+        # Counted in the same transaction that installed the trigger, so no write is missed
+        seeded = connection.execute(
+            text('SELECT 1 FROM table_counters WHERE table_name = :table_name'), {'table_name': table_name}
+        ).first() is not None
+        if created or not seeded:
+            recount_table(connection, table_name)
+            installed.append(table_name)
+    return installed
+
+
+def recount_table(connection, table_name):
+    """Set a table's counter to its exact row count, creating the counter if needed"""
+    counters = TableCounter.__table__
+    row_count = connection.execute(text(f'SELECT COUNT(*) FROM {table_name}')).scalar()
+    values = {'row_count': row_count, 'counted_at': datetime.utcnow()}
+    updated = connection.execute(
+        counters.update().where(counters.c.table_name == table_name).values(**values)
+    ).rowcount
+    if not updated:
+        connection.execute(counters.insert().values(table_name=table_name, **values))
+    return row_count
+
+
+@event.listens_for(db.Model.metadata, 'after_create')
+def _install_counter_triggers(target, connection, **kw):
+    # create_all builds the schema outside migrations; the triggers come with it
+    install_counter_triggers(connection)
@@ -27,6 +27,12 @@ class Teacher(db.Model):
     # Relationships
     class_groups = db.relationship('ClassGroup', backref='teacher', lazy=True)
     
+    # Indexes matched to the list and report filters
+    __table_args__ = (
+        db.Index('ix_teachers_status', 'status'),
+        db.Index('ix_teachers_created_at', 'created_at', 'id')
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
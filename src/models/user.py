@@ -1,8 +1,7 @@
 from datetime import datetime
-from flask_sqlalchemy import SQLAlchemy
-import bcrypt
-
-db = SQLAlchemy()
+from sqlalchemy import event, inspect
+from src.models import db
+from src.utils.passwords import hash_password, verify_password
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -19,15 +18,27 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = db.Column(db.DateTime)
+    token_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # Bumped to revoke issued tokens
     
     # Relationships
     student = db.relationship('Student', backref='user', uselist=False, cascade='all, delete-orphan')
     teacher = db.relationship('Teacher', backref='user', uselist=False, cascade='all, delete-orphan')
     
-    def __init__(self, username, email, password, first_name, last_name, role, phone=None):
+    # Indexes matched to the list and report filters
+    __table_args__ = (
+        db.Index('ix_users_role_active', 'role', 'is_active'),
+        db.Index('ix_users_name', 'first_name', 'last_name', 'id'),
+        db.Index('ix_users_created_at', 'created_at', 'id')
+    )
+    
+    def __init__(self, username, email, password, first_name, last_name, role, phone=None, password_hash=None):
         self.username = username
         self.email = email
-        self.set_password(password)
+        if password_hash:
+            # Already hashed, e.g. by a bulk import
+            self.password_hash = password_hash
+        else:
+            self.set_password(password)
         self.first_name = first_name
         self.last_name = last_name
         self.role = role
@@ -35,11 +46,16 @@ class User(db.Model):
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password_hash = hash_password(password)
+    
+    def rehash_password(self, password):
+        """Re-hash the unchanged password with the configured cost, keeping issued tokens valid"""
+        self.set_password(password)
+        self._password_rehashed = True
     
     def check_password(self, password):
         """Check if provided password matches hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return verify_password(password, self.password_hash)
     
     @property
     def full_name(self):
@@ -63,3 +79,17 @@ class User(db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
 
+
+# Changes that alter what a token may do invalidate every token already issued
+TOKEN_VERSION_ATTRIBUTES = ('role', 'is_active', 'password_hash')
+
+
+@event.listens_for(User, 'before_update')
+def _bump_token_version(mapper, connection, target):
+    state = inspect(target)
+    changed = [name for name in TOKEN_VERSION_ATTRIBUTES if state.attrs[name].history.has_changes()]
+    if getattr(target, '_password_rehashed', False):
+        changed = [name for name in changed if name != 'password_hash']
+        target._password_rehashed = False
+    if changed:
+        target.token_version = (target.token_version or 0) + 1
@@ -1,8 +1,11 @@
 from datetime import datetime
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required
 from src.models import db
 from src.models.user import User
+from src.utils.auth_tokens import create_access_token_for, create_refresh_token_for
+from src.utils.request_identity import current_identity
+from src.utils.passwords import PASSWORD_POOL_ERRORS, RETRY_AFTER_SECONDS, needs_rehash
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -23,19 +26,32 @@ def login():
             (User.username == username) | (User.email == username)
         ).first()
         
-        if not user or not user.check_password(password):
-            return jsonify({'error': 'Invalid credentials'}), 401
+        try:
+            if not user or not user.check_password(password):
+                return jsonify({'error': 'Invalid credentials'}), 401
+        except PASSWORD_POOL_ERRORS:
+            # Shed login bursts instead of queueing them behind every worker
+            response = jsonify({'error': 'Too many logins in progress, please retry shortly'})
+            response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+            return response, 503
         
         if not user.is_active:
             return jsonify({'error': 'Account is inactive'}), 401
         
+        # Upgrade hashes made with an older work factor while the password is at hand
+        if needs_rehash(user.password_hash):
+            try:
+                user.rehash_password(password)
+            except PASSWORD_POOL_ERRORS:
+                pass
+        
         # Update last login
         user.last_login = datetime.utcnow()
         db.session.commit()
         
-        # Create tokens
-        access_token = create_access_token(identity=user.id)
-        refresh_token = create_refresh_token(identity=user.id)
+        # Create tokens carrying role, profile ids and account version
+        access_token = create_access_token_for(user)
+        refresh_token = create_refresh_token_for(user)
         
         return jsonify({
             'access_token': access_token,
@@ -51,13 +67,13 @@ def login():
 def refresh():
     """Refresh access token"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_identity().user
         
         if not user or not user.is_active:
             return jsonify({'error': 'User not found or inactive'}), 404
         
-        new_token = create_access_token(identity=current_user_id)
+        # Claims are re-read so profile changes reach the new token
+        new_token = create_access_token_for(user)
         
         return jsonify({
             'access_token': new_token
@@ -71,8 +87,7 @@ def refresh():
 def get_current_user():
     """Get current user information"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_identity().user
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -99,8 +114,7 @@ def logout():
 def change_password():
     """Change user password"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_identity().user
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -122,8 +136,15 @@ def change_password():
         user.set_password(new_password)
         db.session.commit()
         
-        return jsonify({'message': 'Password changed successfully'}), 200
+        # The password change revoked existing tokens; hand out fresh ones
+        return jsonify({
+            'message': 'Password changed successfully',
+            'access_token': create_access_token_for(user),
+            'refresh_token': create_refresh_token_for(user)
+        }), 200
         
+    except PASSWORD_POOL_ERRORS:
+        raise  # Answered with 503 by the app-level handler
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1,22 +1,46 @@
 from flask import Blueprint, request, jsonify
+from datetime import date
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 from src.models import db
 from src.models.class_group import ClassGroup
 from src.models.subject import Subject
 from src.models.teacher import Teacher
 from src.models.student import Student
 from src.models.enrollment import Enrollment
-from src.utils.decorators import coordinator_or_admin_required, teacher_or_above_required, get_current_user
+from src.utils.decorators import coordinator_or_admin_required, get_current_user
+from src.utils.serialization import with_graph, render_graph
+from src.utils.serializers import serializer_for, json_response
+from src.utils.pagination import paginate, PaginationError
+from src.utils.stats import summarize, count_where, counts_by_value, rounded
+from src.utils.search_index import apply_search
+from src.utils.bulk_enrollment import enroll_students, lock_class_seats
+from src.utils.change_versions import conditional_get, table_keys, class_keys
 
 classes_bp = Blueprint('classes', __name__)
 
+# Tables rendered by the class listings
+MY_CLASSES_VERSIONS = table_keys(
+    'class_groups', 'enrollments', 'users', 'students', 'teachers', 'subjects', 'courses', 'institutions'
+)
+
+def class_students_versions(class_id):
+    """Change versions of everything the roster of a class renders"""
+    return class_keys(class_id, 'class_groups', 'enrollments', 'attendance') + table_keys(
+        'users', 'students', 'teachers', 'subjects', 'courses', 'institutions'
+    )
+
+CLASS_SORT_KEYS = {
+    'id': (ClassGroup.id,),
+    'name': (ClassGroup.class_code, ClassGroup.id),
+    'created_at': (ClassGroup.created_at, ClassGroup.id)
+}
+
 @classes_bp.route('', methods=['GET'])
 @jwt_required()
 def get_classes():
     """Get all class groups with pagination and filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         subject_id = request.args.get('subject_id', type=int)
         teacher_id = request.args.get('teacher_id', type=int)
         semester = request.args.get('semester')
@@ -43,28 +67,20 @@ def get_classes():
             query = query.filter(ClassGroup.status == status)
         
         if search:
-            search_filter = f"%{search}%"
-            query = query.join(Subject).filter(
-                (ClassGroup.class_code.ilike(search_filter)) |
-                (Subject.name.ilike(search_filter)) |
-                (Subject.code.ilike(search_filter))
-            )
+            query = apply_search(query.join(Subject), 'class_group', ClassGroup.id, search, (
+                ClassGroup.class_code, Subject.name, Subject.code
+            ))
         
-        # Paginate results
-        classes = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        # Paginate results, read as the columns the serializer renders
+        classes, pagination = paginate(query, CLASS_SORT_KEYS, serializer=serializer_for(ClassGroup))
         
-        return jsonify({
-            'classes': [class_group.to_dict() for class_group in classes.items],
-            'total': classes.total,
-            'pages': classes.pages,
-            'current_page': page,
-            'per_page': per_page
+        return json_response({
+            'classes': classes,
+            **pagination
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -235,6 +251,7 @@ def delete_class(class_id):
 
 @classes_bp.route('/<int:class_id>/students', methods=['GET'])
 @jwt_required()
+@conditional_get(class_students_versions)
 def get_class_students(class_id):
     """Get students enrolled in a specific class"""
     try:
@@ -246,7 +263,11 @@ def get_class_students(class_id):
         status = request.args.get('status', 'enrolled')
         
         # Filter enrollments by status
-        enrollments = [e for e in class_group.enrollments if e.status == status]
+        enrollments = with_graph(
+            Enrollment.query.filter_by(class_group_id=class_id, status=status),
+            Enrollment,
+            *render_graph(Student, 'student')
+        ).all()
         
         students_data = []
         for enrollment in enrollments:
@@ -298,8 +319,10 @@ def enroll_student(class_id):
         if existing_enrollment:
             return jsonify({'error': 'Student is already enrolled in this class'}), 400
         
-        # Check if class is full
-        if class_group.enrolled_students_count >= class_group.max_students:
+        # Check if class is full, counting under the class lock
+        lock_class_seats([class_id])
+        enrolled_count = Enrollment.query.filter_by(class_group_id=class_id, status='enrolled').count()
+        if enrolled_count >= class_group.max_students:
             return jsonify({'error': 'Class is full'}), 400
         
         # Create enrollment
@@ -321,6 +344,72 @@ def enroll_student(class_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _bulk_enrollment_response(pairs, data):
+    """Enroll the given pairs and commit, answering with one outcome per pair"""
+    enrollment_date = data.get('enrollment_date')
+    if enrollment_date:
+        try:
+            enrollment_date = date.fromisoformat(enrollment_date)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'enrollment_date must be a date (YYYY-MM-DD)'}), 400
+    
+    results = enroll_students(pairs, enrollment_date)
+    db.session.commit()
+    
+    enrolled = sum(1 for result in results if result['status'] == 'enrolled')
+    return jsonify({
+        'message': f'{enrolled} enrollments created',
+        'enrolled': enrolled,
+        'failed': len(results) - enrolled,
+        'results': results
+    }), 200
+
+def _id_list(data, field):
+    values = data.get(field)
+    if not isinstance(values, list) or not values or not all(
+            isinstance(value, int) and not isinstance(value, bool) for value in values):
+        return None
+    return values
+
+@classes_bp.route('/<int:class_id>/students/bulk', methods=['POST'])
+@jwt_required()
+@coordinator_or_admin_required
+def enroll_students_bulk(class_id):
+    """Enroll many students in a class at once"""
+    try:
+        if not ClassGroup.query.get(class_id):
+            return jsonify({'error': 'Class not found'}), 404
+        
+        data = request.get_json() or {}
+        student_ids = _id_list(data, 'student_ids')
+        if student_ids is None:
+            return jsonify({'error': 'student_ids must be a non-empty list of ids'}), 400
+        
+        return _bulk_enrollment_response([(class_id, student_id) for student_id in student_ids], data)
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@classes_bp.route('/enrollments/bulk', methods=['POST'])
+@jwt_required()
+@coordinator_or_admin_required
+def enroll_cohort_bulk():
+    """Enroll every listed student in every listed class"""
+    try:
+        data = request.get_json() or {}
+        class_ids = _id_list(data, 'class_ids')
+        student_ids = _id_list(data, 'student_ids')
+        if class_ids is None or student_ids is None:
+            return jsonify({'error': 'class_ids and student_ids must be non-empty lists of ids'}), 400
+        
+        pairs = [(class_id, student_id) for class_id in class_ids for student_id in student_ids]
+        return _bulk_enrollment_response(pairs, data)
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @classes_bp.route('/<int:class_id>/students/<int:student_id>', methods=['DELETE'])
 @jwt_required()
 @coordinator_or_admin_required
@@ -347,42 +436,52 @@ def unenroll_student(class_id, student_id):
 
 @classes_bp.route('/my-classes', methods=['GET'])
 @jwt_required()
+@conditional_get(MY_CLASSES_VERSIONS)
 def get_my_classes():
     """Get classes for the current user (teacher or student)"""
     try:
         current_user = get_current_user()
         
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if not teacher:
+            teacher_id = current_user.teacher_id
+            if not teacher_id:
                 return jsonify({'error': 'Teacher profile not found'}), 404
             
             semester = request.args.get('semester')
             year = request.args.get('year', type=int)
             
-            query = teacher.class_groups
+            query = ClassGroup.query.filter_by(teacher_id=teacher_id)
             if semester:
-                query = [cg for cg in query if cg.semester == semester]
+                query = query.filter(ClassGroup.semester == semester)
             if year:
-                query = [cg for cg in query if cg.year == year]
+                query = query.filter(ClassGroup.year == year)
             
-            classes = [class_group.to_dict() for class_group in query]
+            classes = [class_group.to_dict() for class_group in with_graph(query, ClassGroup).all()]
             
         elif current_user.role == 'student':
-            student = Student.query.filter_by(user_id=current_user.id).first()
-            if not student:
+            student_id = current_user.student_id
+            if not student_id:
                 return jsonify({'error': 'Student profile not found'}), 404
             
             semester = request.args.get('semester')
             year = request.args.get('year', type=int)
             status = request.args.get('status', 'enrolled')
             
-            enrollments = [e for e in student.enrollments if e.status == status]
+            query = Enrollment.query.join(ClassGroup).filter(
+                Enrollment.student_id == student_id,
+                Enrollment.status == status
+            )
             
             if semester:
-                enrollments = [e for e in enrollments if e.class_group.semester == semester]
+                query = query.filter(ClassGroup.semester == semester)
             if year:
-                enrollments = [e for e in enrollments if e.class_group.year == year]
+                query = query.filter(ClassGroup.year == year)
+            
+            enrollments = with_graph(
+                query,
+                Enrollment,
+                *render_graph(ClassGroup, 'class_group')
+            ).all()
             
             classes = []
             for enrollment in enrollments:
@@ -410,38 +509,30 @@ def get_my_classes():
 def get_class_stats():
     """Get class statistics"""
     try:
-        stats = {
-            'total_classes': ClassGroup.query.count(),
-            'active_classes': ClassGroup.query.filter(ClassGroup.status == 'active').count(),
-            'classes_by_status': {},
-            'classes_by_semester': {},
-            'average_enrollment': 0
-        }
-        
-        # Count classes by status
-        statuses = ['planned', 'active', 'completed', 'cancelled']
-        for status in statuses:
-            count = ClassGroup.query.filter(ClassGroup.status == status).count()
-            stats['classes_by_status'][status] = count
-        
-        # Count classes by current semester/year
         from datetime import datetime
         current_year = datetime.now().year
         current_month = datetime.now().month
         current_semester = f"{current_year}.1" if current_month <= 6 else f"{current_year}.2"
         
-        semester_classes = ClassGroup.query.filter(ClassGroup.semester == current_semester).all()
-        for class_group in semester_classes:
-            semester_key = f"{class_group.semester}"
-            if semester_key not in stats['classes_by_semester']:
-                stats['classes_by_semester'][semester_key] = 0
-            stats['classes_by_semester'][semester_key] += 1
-        
-        # Calculate average enrollment
-        active_classes = ClassGroup.query.filter(ClassGroup.status.in_(['active', 'planned'])).all()
-        if active_classes:
-            total_enrollment = sum(cg.enrolled_students_count for cg in active_classes)
-            stats['average_enrollment'] = round(total_enrollment / len(active_classes), 2)
+        stats = summarize(ClassGroup, {
+            'total_classes': func.count(ClassGroup.id),
+            'active_classes': count_where(ClassGroup.status == 'active'),
+            'classes_by_status': counts_by_value(ClassGroup.status),
+            'current_semester_classes': count_where(ClassGroup.semester == current_semester)
+        })
+        
+        # Count classes by current semester/year
+        semester_count = stats.pop('current_semester_classes')
+        stats['classes_by_semester'] = {current_semester: semester_count} if semester_count else {}
+        
+        # Average enrolled students over open classes
+        enrollment = summarize(ClassGroup.__table__.outerjoin(
+            Enrollment.__table__, (Enrollment.class_group_id == ClassGroup.id) & (Enrollment.status == 'enrolled')
+        ), {
+            'classes': func.count(func.distinct(ClassGroup.id)),
+            'enrolled': func.count(Enrollment.id)
+        }, ClassGroup.status.in_(['active', 'planned']))
+        stats['average_enrollment'] = rounded(enrollment['enrolled'] / enrollment['classes']) if enrollment['classes'] else 0
         
         return jsonify(stats), 200
         
@@ -1,19 +1,30 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 from src.models import db
 from src.models.course import Course
 from src.models.institution import Institution
+from src.models.student import Student
 from src.utils.decorators import coordinator_or_admin_required
+from src.utils.serialization import with_graph
+from src.utils.serializers import serializer_for, json_response
+from src.utils.pagination import paginate, PaginationError
+from src.utils.stats import summarize, count_where, counts_by_value, totals_by
+from src.utils.search_index import apply_search
 
 courses_bp = Blueprint('courses', __name__)
 
+COURSE_SORT_KEYS = {
+    'id': (Course.id,),
+    'name': (Course.name, Course.id),
+    'created_at': (Course.created_at, Course.id)
+}
+
 @courses_bp.route('', methods=['GET'])
 @jwt_required()
 def get_courses():
     """Get all courses with pagination and filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         institution_id = request.args.get('institution_id', type=int)
         degree_type = request.args.get('degree_type')
         search = request.args.get('search')
@@ -32,28 +43,20 @@ def get_courses():
             query = query.filter(Course.is_active == is_active)
         
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                (Course.name.ilike(search_filter)) |
-                (Course.code.ilike(search_filter)) |
-                (Course.description.ilike(search_filter))
-            )
-        
-        # Paginate results
-        courses = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+            query = apply_search(query, 'course', Course.id, search, (
+                Course.name, Course.code, Course.description
+            ))
         
-        return jsonify({
-            'courses': [course.to_dict() for course in courses.items],
-            'total': courses.total,
-            'pages': courses.pages,
-            'current_page': page,
-            'per_page': per_page
+        # Paginate results, read as the columns the serializer renders
+        courses, pagination = paginate(query, COURSE_SORT_KEYS, serializer=serializer_for(Course))
+        
+        return json_response({
+            'courses': courses,
+            **pagination
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -252,16 +255,17 @@ def get_course_students(course_id):
         per_page = request.args.get('per_page', 20, type=int)
         
         # Filter students by status
-        students_query = [s for s in course.students if s.status == status]
+        students_query = Student.query.filter_by(course_id=course_id, status=status)
+        total = students_query.count()
         
         # Simple pagination for list
-        start = (page - 1) * per_page
-        end = start + per_page
-        students_page = students_query[start:end]
+        students_page = with_graph(students_query.order_by(Student.id), Student).offset(
+            (page - 1) * per_page
+        ).limit(per_page).all()
         
         return jsonify({
             'students': [student.to_dict() for student in students_page],
-            'total': len(students_query),
+            'total': total,
             'current_page': page,
             'per_page': per_page
         }), 200
@@ -274,24 +278,19 @@ def get_course_students(course_id):
 def get_course_stats():
     """Get course statistics"""
     try:
-        stats = {
-            'total_courses': Course.query.count(),
-            'active_courses': Course.query.filter(Course.is_active == True).count(),
-            'courses_by_degree_type': {},
-            'courses_by_institution': {}
-        }
-        
-        # Count courses by degree type
-        degree_types = ['bachelor', 'master', 'doctorate', 'technical', 'other']
-        for degree_type in degree_types:
-            count = Course.query.filter(Course.degree_type == degree_type, Course.is_active == True).count()
-            stats['courses_by_degree_type'][degree_type] = count
-        
-        # Count courses by institution
-        institutions = Institution.query.filter(Institution.is_active == True).all()
-        for institution in institutions:
-            count = Course.query.filter(Course.institution_id == institution.id, Course.is_active == True).count()
-            stats['courses_by_institution'][institution.name] = count
+        active = Course.is_active == True
+        stats = summarize(Course, {
+            'total_courses': func.count(Course.id),
+            'active_courses': count_where(active),
+            'courses_by_degree_type': counts_by_value(Course.degree_type, condition=active)
+        })
+        
+        # Active courses per active institution
+        stats['courses_by_institution'] = totals_by(
+            db.session.query(Institution.name, func.count(Course.id)).outerjoin(
+                Course, (Course.institution_id == Institution.id) & active
+            ).filter(Institution.is_active == True).group_by(Institution.id, Institution.name)
+        )
         
         return jsonify(stats), 200
         
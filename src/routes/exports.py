@@ -0,0 +1,96 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from src.models.class_group import ClassGroup
+from src.models.subject import Subject
+from src.models.course import Course
+from src.utils.decorators import teacher_or_above_required, get_current_user
+from src.utils.jobs import async_job
+from src.utils.exports import (
+    EXPORT_MIMETYPES, ROSTER_COLUMNS, GRADEBOOK_COLUMNS, roster_rows, gradebook_rows, export_response
+)
+
+exports_bp = Blueprint('exports', __name__)
+
+def _export_scope():
+    """Read the export scope (one class, a subject/term or a course) from the query string"""
+    scope = {
+        'class_id': request.args.get('class_id', type=int),
+        'subject_id': request.args.get('subject_id', type=int),
+        'semester': request.args.get('semester'),
+        'year': request.args.get('year', type=int),
+        'course_id': request.args.get('course_id', type=int)
+    }
+
+    if scope['class_id']:
+        if not ClassGroup.query.get(scope['class_id']):
+            return None, (jsonify({'error': 'Class not found'}), 404)
+        name = f"class-{scope['class_id']}"
+    elif scope['subject_id']:
+        if not Subject.query.get(scope['subject_id']):
+            return None, (jsonify({'error': 'Subject not found'}), 404)
+        name = '-'.join(str(part) for part in ('subject', scope['subject_id'], scope['year'], scope['semester']) if part)
+    elif scope['course_id']:
+        if not Course.query.get(scope['course_id']):
+            return None, (jsonify({'error': 'Course not found'}), 404)
+        name = '-'.join(str(part) for part in ('course', scope['course_id'], scope['year'], scope['semester']) if part)
+    else:
+        return None, (jsonify({'error': 'class_id, subject_id or course_id is required'}), 400)
+
+    # Teachers export only their own classes
+    current_user = get_current_user()
+    if current_user.role == 'teacher':
+        if not current_user.teacher_id:
+            return None, (jsonify({'error': 'Permission denied'}), 403)
+        scope['teacher_id'] = current_user.teacher_id
+
+    return (scope, name), None
+
+def _export_format():
+    export_format = request.args.get('format', 'csv').lower()
+    return export_format if export_format in EXPORT_MIMETYPES else None
+
+@exports_bp.route('/gradebook', methods=['GET'])
+@jwt_required()
+@teacher_or_above_required
+@async_job
+def export_gradebook():
+    """Stream the gradebook of the selected classes as CSV or XLSX"""
+    try:
+        export_format = _export_format()
+        if not export_format:
+            return jsonify({'error': 'format must be csv or xlsx'}), 400
+
+        selection, error = _export_scope()
+        if error:
+            return error
+        scope, name = selection
+
+        return export_response(export_format, f'gradebook-{name}', GRADEBOOK_COLUMNS, gradebook_rows(**scope), 'Gradebook')
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@exports_bp.route('/roster', methods=['GET'])
+@jwt_required()
+@teacher_or_above_required
+@async_job
+def export_roster():
+    """Stream the student roster of the selected classes as CSV or XLSX"""
+    try:
+        export_format = _export_format()
+        if not export_format:
+            return jsonify({'error': 'format must be csv or xlsx'}), 400
+
+        selection, error = _export_scope()
+        if error:
+            return error
+        scope, name = selection
+
+        # status=all exports every enrollment regardless of status
+        status = request.args.get('status', 'enrolled')
+        rows = roster_rows(status=None if status == 'all' else status, **scope)
+
+        return export_response(export_format, f'roster-{name}', ROSTER_COLUMNS, rows, 'Roster')
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
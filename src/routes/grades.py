@@ -7,20 +7,35 @@ from src.models.evaluation import Evaluation
 from src.models.evaluation_type import EvaluationType
 from src.models.enrollment import Enrollment
 from src.models.class_group import ClassGroup
-from src.models.teacher import Teacher
-from src.models.student import Student
 from src.utils.decorators import teacher_or_above_required, get_current_user
+from src.utils.gradebook import build_class_gradebook
+from src.utils.final_grades import apply_grade_change
+from src.utils.evaluation_stats import apply_score_change
+from src.utils.grade_batch import upsert_grades
+from src.utils.serialization import with_graph
+from src.utils.serializers import serializer_for, json_response
+from src.utils.pagination import paginate, PaginationError
+from src.utils.change_versions import conditional_get, table_keys, class_keys
 
 grades_bp = Blueprint('grades', __name__)
 
+def gradebook_versions(class_id):
+    """Change versions of everything the gradebook of a class renders"""
+    return class_keys(class_id, 'class_groups', 'evaluations', 'enrollments', 'grades', 'attendance') + table_keys(
+        'evaluation_types', 'users', 'students', 'teachers', 'subjects', 'courses', 'institutions'
+    )
+
+GRADE_SORT_KEYS = {
+    'id': (Grade.id,),
+    'created_at': (Grade.created_at, Grade.id)
+}
+
 @grades_bp.route('', methods=['GET'])
 @jwt_required()
 def get_grades():
     """Get grades with pagination and filtering"""
     try:
         current_user = get_current_user()
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         class_id = request.args.get('class_id', type=int)
         student_id = request.args.get('student_id', type=int)
         evaluation_id = request.args.get('evaluation_id', type=int)
@@ -29,13 +44,12 @@ def get_grades():
         
         # Apply role-based filtering
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if teacher:
-                query = query.filter(ClassGroup.teacher_id == teacher.id)
+            teacher_id = current_user.teacher_id
+            if teacher_id:
+                query = query.filter(ClassGroup.teacher_id == teacher_id)
         elif current_user.role == 'student':
-            student = Student.query.filter_by(user_id=current_user.id).first()
-            if student:
-                query = query.filter(Enrollment.student_id == student.id)
+            if current_user.student_id:
+                query = query.filter(Enrollment.student_id == current_user.student_id)
         
         # Apply additional filters
         if class_id:
@@ -47,21 +61,16 @@ def get_grades():
         if evaluation_id:
             query = query.filter(Grade.evaluation_id == evaluation_id)
         
-        # Paginate results
-        grades = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        # Paginate results, read as the columns the serializer renders
+        grades, pagination = paginate(query, GRADE_SORT_KEYS, serializer=serializer_for(Grade))
         
-        return jsonify({
-            'grades': [grade.to_dict() for grade in grades.items],
-            'total': grades.total,
-            'pages': grades.pages,
-            'current_page': page,
-            'per_page': per_page
+        return json_response({
+            'grades': grades,
+            **pagination
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -107,8 +116,8 @@ def create_grade():
         
         # Check if teacher has permission to grade this class
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if not teacher or evaluation.class_group.teacher_id != teacher.id:
+            teacher_id = current_user.teacher_id
+            if not teacher_id or evaluation.class_group.teacher_id != teacher_id:
                 return jsonify({'error': 'Permission denied'}), 403
         
         # Validate score
@@ -124,17 +133,16 @@ def create_grade():
         
         if existing_grade:
             # Update existing grade
+            old_score = existing_grade.score
             existing_grade.score = data['score']
             existing_grade.comments = data.get('comments')
             if current_user.role == 'teacher':
-                teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-                existing_grade.graded_by = teacher.id if teacher else None
+                existing_grade.graded_by = current_user.teacher_id
             existing_grade.graded_at = datetime.utcnow()
             
-            db.session.commit()
-            
-            # Update enrollment final grade
-            enrollment.final_grade = enrollment.calculate_final_grade()
+            # Update enrollment final grade and evaluation statistics
+            apply_grade_change(enrollment, evaluation.weight, old_score, data['score'])
+            apply_score_change(evaluation, old_score, data['score'])
             db.session.commit()
             
             return jsonify({
@@ -152,14 +160,13 @@ def create_grade():
             )
             
             if current_user.role == 'teacher':
-                teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-                grade.graded_by = teacher.id if teacher else None
+                grade.graded_by = current_user.teacher_id
             
             db.session.add(grade)
-            db.session.commit()
             
-            # Update enrollment final grade
-            enrollment.final_grade = enrollment.calculate_final_grade()
+            # Update enrollment final grade and evaluation statistics
+            apply_grade_change(enrollment, evaluation.weight, None, data['score'])
+            apply_score_change(evaluation, None, data['score'])
             db.session.commit()
             
             return jsonify({
@@ -183,78 +190,11 @@ def create_grades_batch():
         if not data.get('grades') or not isinstance(data['grades'], list):
             return jsonify({'error': 'grades array is required'}), 400
         
-        teacher = None
+        teacher_id = None
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-        
-        created_grades = []
-        updated_grades = []
-        errors = []
-        
-        for i, grade_data in enumerate(data['grades']):
-            try:
-                # Validate required fields
-                required_fields = ['enrollment_id', 'evaluation_id', 'score']
-                for field in required_fields:
-                    if field not in grade_data:
-                        errors.append(f'Grade {i+1}: {field} is required')
-                        continue
-                
-                # Check if enrollment and evaluation exist
-                enrollment = Enrollment.query.get(grade_data['enrollment_id'])
-                evaluation = Evaluation.query.get(grade_data['evaluation_id'])
-                
-                if not enrollment:
-                    errors.append(f'Grade {i+1}: Enrollment not found')
-                    continue
-                
-                if not evaluation:
-                    errors.append(f'Grade {i+1}: Evaluation not found')
-                    continue
-                
-                # Check teacher permission
-                if teacher and evaluation.class_group.teacher_id != teacher.id:
-                    errors.append(f'Grade {i+1}: Permission denied')
-                    continue
-                
-                # Validate score
-                if grade_data['score'] is not None:
-                    if grade_data['score'] < 0 or grade_data['score'] > float(evaluation.max_score):
-                        errors.append(f'Grade {i+1}: Score must be between 0 and {evaluation.max_score}')
-                        continue
-                
-                # Check if grade already exists
-                existing_grade = Grade.query.filter_by(
-                    enrollment_id=grade_data['enrollment_id'],
-                    evaluation_id=grade_data['evaluation_id']
-                ).first()
-                
-                if existing_grade:
-                    # Update existing grade
-                    existing_grade.score = grade_data['score']
-                    existing_grade.comments = grade_data.get('comments')
-                    existing_grade.graded_by = teacher.id if teacher else None
-                    existing_grade.graded_at = datetime.utcnow()
-                    updated_grades.append(existing_grade.to_dict())
-                else:
-                    # Create new grade
-                    grade = Grade(
-                        enrollment_id=grade_data['enrollment_id'],
-                        evaluation_id=grade_data['evaluation_id'],
-                        score=grade_data['score'],
-                        comments=grade_data.get('comments'),
-                        graded_by=teacher.id if teacher else None,
-                        graded_at=datetime.utcnow()
-                    )
-                    
-                    db.session.add(grade)
-                    created_grades.append(grade_data)
-                
-                # Update enrollment final grade
-                enrollment.final_grade = enrollment.calculate_final_grade()
-                
-            except Exception as e:
-                errors.append(f'Grade {i+1}: {str(e)}')
+            teacher_id = current_user.teacher_id
+        
+        created, updated, errors = upsert_grades(data['grades'], teacher_id)
         
         if errors:
             db.session.rollback()
@@ -264,8 +204,8 @@ def create_grades_batch():
         
         return jsonify({
             'message': 'Grades processed successfully',
-            'created': len(created_grades),
-            'updated': len(updated_grades),
+            'created': created,
+            'updated': updated,
             'errors': len(errors)
         }), 200
         
@@ -287,11 +227,12 @@ def update_grade(grade_id):
         
         # Check teacher permission
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if not teacher or grade.evaluation.class_group.teacher_id != teacher.id:
+            teacher_id = current_user.teacher_id
+            if not teacher_id or grade.evaluation.class_group.teacher_id != teacher_id:
                 return jsonify({'error': 'Permission denied'}), 403
         
         data = request.get_json()
+        old_score = grade.score
         
         # Update grade information
         if 'score' in data:
@@ -305,13 +246,11 @@ def update_grade(grade_id):
         
         grade.graded_at = datetime.utcnow()
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            grade.graded_by = teacher.id if teacher else None
-        
-        db.session.commit()
+            grade.graded_by = current_user.teacher_id
         
-        # Update enrollment final grade
-        grade.enrollment.final_grade = grade.enrollment.calculate_final_grade()
+        # Update enrollment final grade and evaluation statistics
+        apply_grade_change(grade.enrollment, grade.evaluation.weight, old_score, grade.score)
+        apply_score_change(grade.evaluation, old_score, grade.score)
         db.session.commit()
         
         return jsonify({
@@ -337,16 +276,18 @@ def delete_grade(grade_id):
         
         # Check teacher permission
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if not teacher or grade.evaluation.class_group.teacher_id != teacher.id:
+            teacher_id = current_user.teacher_id
+            if not teacher_id or grade.evaluation.class_group.teacher_id != teacher_id:
                 return jsonify({'error': 'Permission denied'}), 403
         
         enrollment = grade.enrollment
+        evaluation = grade.evaluation
+        old_score = grade.score
         db.session.delete(grade)
-        db.session.commit()
         
-        # Update enrollment final grade
-        enrollment.final_grade = enrollment.calculate_final_grade()
+        # Update enrollment final grade and evaluation statistics
+        apply_grade_change(enrollment, evaluation.weight, old_score, None)
+        apply_score_change(evaluation, old_score, None)
         db.session.commit()
         
         return jsonify({'message': 'Grade deleted successfully'}), 200
@@ -368,9 +309,9 @@ def get_evaluations():
         
         # Apply role-based filtering
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if teacher:
-                query = query.filter(ClassGroup.teacher_id == teacher.id)
+            teacher_id = current_user.teacher_id
+            if teacher_id:
+                query = query.filter(ClassGroup.teacher_id == teacher_id)
         
         # Apply additional filters
         if class_id:
@@ -379,7 +320,7 @@ def get_evaluations():
         if evaluation_type_id:
             query = query.filter(Evaluation.evaluation_type_id == evaluation_type_id)
         
-        evaluations = query.all()
+        evaluations = with_graph(query, Evaluation).all()
         
         return jsonify({
             'evaluations': [evaluation.to_dict() for evaluation in evaluations]
@@ -410,8 +351,8 @@ def create_evaluation():
         
         # Check teacher permission
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if not teacher or class_group.teacher_id != teacher.id:
+            teacher_id = current_user.teacher_id
+            if not teacher_id or class_group.teacher_id != teacher_id:
                 return jsonify({'error': 'Permission denied'}), 403
         
         # Check if evaluation type exists
@@ -460,6 +401,7 @@ def get_evaluation_types():
 @grades_bp.route('/class/<int:class_id>/gradebook', methods=['GET'])
 @jwt_required()
 @teacher_or_above_required
+@conditional_get(gradebook_versions)
 def get_class_gradebook(class_id):
     """Get complete gradebook for a class"""
     try:
@@ -471,49 +413,11 @@ def get_class_gradebook(class_id):
         
         # Check teacher permission
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if not teacher or class_group.teacher_id != teacher.id:
+            teacher_id = current_user.teacher_id
+            if not teacher_id or class_group.teacher_id != teacher_id:
                 return jsonify({'error': 'Permission denied'}), 403
         
-        # Get all evaluations for this class
-        evaluations = Evaluation.query.filter_by(class_group_id=class_id).all()
-        
-        # Get all enrollments for this class
-        enrollments = Enrollment.query.filter_by(class_group_id=class_id, status='enrolled').all()
-        
-        # Build gradebook data
-        gradebook = {
-            'class': class_group.to_dict(),
-            'evaluations': [eval.to_dict() for eval in evaluations],
-            'students': []
-        }
-        
-        for enrollment in enrollments:
-            student_data = {
-                'student': enrollment.student.to_dict(),
-                'enrollment': {
-                    'id': enrollment.id,
-                    'final_grade': float(enrollment.final_grade) if enrollment.final_grade else None,
-                    'final_status': enrollment.final_status,
-                    'attendance_percentage': enrollment.attendance_percentage
-                },
-                'grades': {}
-            }
-            
-            # Get grades for each evaluation
-            for evaluation in evaluations:
-                grade = Grade.query.filter_by(
-                    enrollment_id=enrollment.id,
-                    evaluation_id=evaluation.id
-                ).first()
-                
-                student_data['grades'][evaluation.id] = {
-                    'score': float(grade.score) if grade and grade.score else None,
-                    'comments': grade.comments if grade else None,
-                    'graded_at': grade.graded_at.isoformat() if grade and grade.graded_at else None
-                }
-            
-            gradebook['students'].append(student_data)
+        gradebook = build_class_gradebook(class_group)
         
         return jsonify(gradebook), 200
         
@@ -0,0 +1,142 @@
+import os
+from datetime import datetime
+from flask import Blueprint, jsonify, send_file
+from flask_jwt_extended import jwt_required
+from src.models import db
+from src.models.job import Job
+from src.utils.decorators import get_current_user
+from src.utils.pagination import paginate, PaginationError
+from src.utils.jobs import result_path, remove_job_results
+
+jobs_bp = Blueprint('jobs', __name__)
+
+JOB_SORT_KEYS = {
+    'id': (Job.id,),
+    'created_at': (Job.created_at, Job.id)
+}
+
+def _get_job(job_id):
+    """Load a job visible to the current user, or return an error response"""
+    job = Job.query.get(job_id)
+    if not job:
+        return None, (jsonify({'error': 'Job not found'}), 404)
+
+    current_user = get_current_user()
+    if current_user.role != 'admin' and job.user_id != current_user.id:
+        return None, (jsonify({'error': 'Permission denied'}), 403)
+
+    return job, None
+
+@jobs_bp.route('', methods=['GET'])
+@jwt_required()
+def get_jobs():
+    """List the current user's jobs (all jobs for admins)"""
+    try:
+        current_user = get_current_user()
+        query = Job.query
+        if current_user.role != 'admin':
+            query = query.filter(Job.user_id == current_user.id)
+
+        jobs, pagination = paginate(query, JOB_SORT_KEYS)
+
+        return jsonify({
+            'jobs': [job.to_dict() for job in jobs],
+            **pagination
+        }), 200
+
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Get job status and progress"""
+    try:
+        job, error = _get_job(job_id)
+        if error:
+            return error
+
+        return jsonify({'job': job.to_dict()}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jobs_bp.route('/<int:job_id>/result', methods=['GET'])
+@jwt_required()
+def get_job_result(job_id):
+    """Download the stored response of a finished job"""
+    try:
+        job, error = _get_job(job_id)
+        if error:
+            return error
+
+        if job.status != 'succeeded':
+            return jsonify({'error': f'Job is {job.status}', 'job': job.to_dict()}), 409
+
+        path = result_path(job.id, job.started_at)
+        if not os.path.exists(path):
+            return jsonify({'error': 'Job result is no longer available'}), 410
+
+        as_attachment = job.result_mimetype != 'application/json'
+        return send_file(path, mimetype=job.result_mimetype, as_attachment=as_attachment,
+                         download_name=job.result_filename)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jobs_bp.route('/<int:job_id>/retry', methods=['POST'])
+@jwt_required()
+def retry_job(job_id):
+    """Queue a failed or cancelled job again"""
+    try:
+        job, error = _get_job(job_id)
+        if error:
+            return error
+
+        if job.status not in ('failed', 'cancelled'):
+            return jsonify({'error': f'Only failed or cancelled jobs can be retried (job is {job.status})'}), 409
+
+        job.status = 'queued'
+        job.attempts = 0
+        job.progress = 0
+        job.error = None
+        job.run_after = datetime.utcnow()
+        job.started_at = None
+        job.finished_at = None
+        db.session.commit()
+
+        return jsonify({'message': 'Job queued', 'job': job.to_dict()}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@jobs_bp.route('/<int:job_id>', methods=['DELETE'])
+@jwt_required()
+def delete_job(job_id):
+    """Cancel a queued job, or delete a finished one with its result"""
+    try:
+        job, error = _get_job(job_id)
+        if error:
+            return error
+
+        if job.status == 'running':
+            return jsonify({'error': 'Job is running and cannot be cancelled'}), 409
+
+        if job.status == 'queued':
+            job.status = 'cancelled'
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            return jsonify({'message': 'Job cancelled', 'job': job.to_dict()}), 200
+
+        db.session.delete(job)
+        db.session.commit()
+        remove_job_results(job_id)
+
+        return jsonify({'message': 'Job deleted successfully'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
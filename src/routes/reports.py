@@ -1,100 +1,52 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, send_file
 from flask_jwt_extended import jwt_required
-from sqlalchemy import func, and_
 from src.models import db
 from src.models.student import Student
 from src.models.teacher import Teacher
-from src.models.course import Course
-from src.models.subject import Subject
 from src.models.class_group import ClassGroup
 from src.models.enrollment import Enrollment
 from src.models.grade import Grade
 from src.models.evaluation import Evaluation
-from src.models.attendance import Attendance
 from src.utils.decorators import teacher_or_above_required, get_current_user
+from src.utils.pending_grades import get_pending_grades
+from src.utils.dashboard import get_dashboard_snapshot, dashboard_scopes, dashboard_stats
+from src.utils.reports import (
+    academic_performance_statement, summarize_academic_performance, attendance_statement, summarize_attendance
+)
+from src.utils.transcripts import build_transcript, request_transcript_pdf
+from src.utils.jobs import async_job
+from src.utils.change_versions import conditional_get, current_versions, table_keys, class_keys
 
 reports_bp = Blueprint('reports', __name__)
 
+# Source tables of the dashboard counters (recent enrollments also move with the date)
+DASHBOARD_VERSIONS = table_keys('students', 'teachers', 'courses', 'subjects', 'class_groups',
+                                'enrollments', 'evaluations', 'grades')
+# Whole tables a transcript renders; its enrollments, grades and classes are versioned per class
+TRANSCRIPT_CATALOG_VERSIONS = table_keys('users', 'students', 'teachers', 'subjects', 'courses', 'institutions')
+
+def transcript_versions(student_id):
+    """Change versions of everything the transcript of a student renders"""
+    class_ids = {
+        class_id for (class_id,) in db.session.query(Enrollment.class_group_id).filter_by(student_id=student_id)
+    }
+    return TRANSCRIPT_CATALOG_VERSIONS + [
+        key for class_id in sorted(class_ids) for key in class_keys(class_id, 'enrollments', 'grades', 'class_groups')
+    ]
+
 @reports_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
+@conditional_get(DASHBOARD_VERSIONS, daily=True)
+@async_job
 def get_dashboard_stats():
     """Get dashboard statistics"""
     try:
         current_user = get_current_user()
         
-        # Base statistics
-        stats = {
-            'total_students': Student.query.filter_by(status='active').count(),
-            'total_teachers': Teacher.query.filter_by(status='active').count(),
-            'total_courses': Course.query.filter_by(is_active=True).count(),
-            'total_subjects': Subject.query.filter_by(is_active=True).count(),
-            'active_classes': ClassGroup.query.filter_by(status='active').count(),
-            'pending_grades': 0,
-            'recent_enrollments': 0
-        }
-        
-        # Role-specific filtering
-        if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if teacher:
-                # Filter stats for this teacher's classes
-                teacher_classes = ClassGroup.query.filter_by(teacher_id=teacher.id, status='active').all()
-                stats['active_classes'] = len(teacher_classes)
-                
-                # Count pending grades for teacher's classes
-                pending_grades = 0
-                for class_group in teacher_classes:
-                    evaluations = Evaluation.query.filter_by(class_group_id=class_group.id).all()
-                    enrollments = Enrollment.query.filter_by(class_group_id=class_group.id, status='enrolled').all()
-                    
-                    for evaluation in evaluations:
-                        for enrollment in enrollments:
-                            grade = Grade.query.filter_by(
-                                enrollment_id=enrollment.id,
-                                evaluation_id=evaluation.id
-                            ).first()
-                            if not grade:
-                                pending_grades += 1
-                
-                stats['pending_grades'] = pending_grades
-        
-        elif current_user.role == 'student':
-            student = Student.query.filter_by(user_id=current_user.id).first()
-            if student:
-                # Filter stats for this student
-                student_enrollments = Enrollment.query.filter_by(student_id=student.id, status='enrolled').all()
-                stats['active_classes'] = len(student_enrollments)
-                stats['total_students'] = 1  # Just this student
-        
-        else:
-            # Admin/Coordinator - calculate pending grades across all classes
-            total_pending = 0
-            all_evaluations = Evaluation.query.all()
-            
-            for evaluation in all_evaluations:
-                enrollments = Enrollment.query.filter_by(
-                    class_group_id=evaluation.class_group_id, 
-                    status='enrolled'
-                ).all()
-                
-                for enrollment in enrollments:
-                    grade = Grade.query.filter_by(
-                        enrollment_id=enrollment.id,
-                        evaluation_id=evaluation.id
-                    ).first()
-                    if not grade:
-                        total_pending += 1
-            
-            stats['pending_grades'] = total_pending
-        
-        # Recent enrollments (last 30 days)
-        from datetime import datetime, timedelta
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        stats['recent_enrollments'] = Enrollment.query.filter(
-            Enrollment.enrollment_date >= thirty_days_ago.date()
-        ).count()
+        # Global snapshot, narrowed by the caller's own row
+        snapshots = [get_dashboard_snapshot(scope, owner_id) for scope, owner_id in dashboard_scopes(current_user)]
         
-        return jsonify(stats), 200
+        return jsonify(dashboard_stats(current_user, snapshots)), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -102,108 +54,20 @@ def get_dashboard_stats():
 @reports_bp.route('/academic-performance', methods=['GET'])
 @jwt_required()
 @teacher_or_above_required
+@async_job
 def get_academic_performance():
     """Get academic performance report"""
     try:
-        current_user = get_current_user()
-        course_id = request.args.get('course_id', type=int)
-        semester = request.args.get('semester')
-        year = request.args.get('year', type=int)
-        
-        # Base query for enrollments
-        query = db.session.query(
-            Enrollment.final_grade,
-            Enrollment.final_status,
-            Student.id.label('student_id'),
-            ClassGroup.semester,
-            ClassGroup.year,
-            Subject.name.label('subject_name'),
-            Course.name.label('course_name')
-        ).join(Student).join(ClassGroup).join(Subject).join(Course)
-        
-        # Apply role-based filtering
-        if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if teacher:
-                query = query.filter(ClassGroup.teacher_id == teacher.id)
-        
-        # Apply filters
-        if course_id:
-            query = query.filter(Course.id == course_id)
-        
-        if semester:
-            query = query.filter(ClassGroup.semester == semester)
-        
-        if year:
-            query = query.filter(ClassGroup.year == year)
-        
-        # Only completed enrollments with grades
-        query = query.filter(
-            Enrollment.final_grade.isnot(None),
-            Enrollment.final_status.in_(['approved', 'failed'])
+        statement = academic_performance_statement(
+            get_current_user(),
+            course_id=request.args.get('course_id', type=int),
+            semester=request.args.get('semester'),
+            year=request.args.get('year', type=int)
         )
         
-        results = query.all()
+        results = db.session.execute(statement).all()
         
-        # Calculate statistics
-        if results:
-            grades = [float(r.final_grade) for r in results if r.final_grade]
-            
-            performance_stats = {
-                'total_enrollments': len(results),
-                'average_grade': round(sum(grades) / len(grades), 2) if grades else 0,
-                'highest_grade': max(grades) if grades else 0,
-                'lowest_grade': min(grades) if grades else 0,
-                'approval_rate': 0,
-                'grade_distribution': {
-                    '9.0-10.0': 0,
-                    '8.0-8.9': 0,
-                    '7.0-7.9': 0,
-                    '6.0-6.9': 0,
-                    '5.0-5.9': 0,
-                    '0.0-4.9': 0
-                },
-                'status_distribution': {
-                    'approved': 0,
-                    'failed': 0
-                }
-            }
-            
-            # Calculate approval rate
-            approved_count = len([r for r in results if r.final_status == 'approved'])
-            performance_stats['approval_rate'] = round((approved_count / len(results)) * 100, 2)
-            
-            # Calculate grade distribution
-            for grade in grades:
-                if grade >= 9.0:
-                    performance_stats['grade_distribution']['9.0-10.0'] += 1
-                elif grade >= 8.0:
-                    performance_stats['grade_distribution']['8.0-8.9'] += 1
-                elif grade >= 7.0:
-                    performance_stats['grade_distribution']['7.0-7.9'] += 1
-                elif grade >= 6.0:
-                    performance_stats['grade_distribution']['6.0-6.9'] += 1
-                elif grade >= 5.0:
-                    performance_stats['grade_distribution']['5.0-5.9'] += 1
-                else:
-                    performance_stats['grade_distribution']['0.0-4.9'] += 1
-            
-            # Calculate status distribution
-            for result in results:
-                performance_stats['status_distribution'][result.final_status] += 1
-        
-        else:
-            performance_stats = {
-                'total_enrollments': 0,
-                'average_grade': 0,
-                'highest_grade': 0,
-                'lowest_grade': 0,
-                'approval_rate': 0,
-                'grade_distribution': {},
-                'status_distribution': {}
-            }
-        
-        return jsonify(performance_stats), 200
+        return jsonify(summarize_academic_performance(results)), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -211,74 +75,19 @@ def get_academic_performance():
 @reports_bp.route('/attendance', methods=['GET'])
 @jwt_required()
 @teacher_or_above_required
+@async_job
 def get_attendance_report():
     """Get attendance report"""
     try:
-        current_user = get_current_user()
-        class_id = request.args.get('class_id', type=int)
-        student_id = request.args.get('student_id', type=int)
-        
-        # Base query for attendance
-        query = db.session.query(
-            Attendance.status,
-            Enrollment.id.label('enrollment_id'),
-            Student.id.label('student_id'),
-            ClassGroup.id.label('class_id'),
-            Subject.name.label('subject_name')
-        ).join(Enrollment).join(Student).join(ClassGroup).join(Subject)
-        
-        # Apply role-based filtering
-        if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if teacher:
-                query = query.filter(ClassGroup.teacher_id == teacher.id)
-        elif current_user.role == 'student':
-            student = Student.query.filter_by(user_id=current_user.id).first()
-            if student:
-                query = query.filter(Student.id == student.id)
-        
-        # Apply filters
-        if class_id:
-            query = query.filter(ClassGroup.id == class_id)
-        
-        if student_id and current_user.role in ['admin', 'coordinator', 'teacher']:
-            query = query.filter(Student.id == student_id)
-        
-        results = query.all()
-        
-        # Calculate attendance statistics
-        if results:
-            total_records = len(results)
-            present_count = len([r for r in results if r.status in ['present', 'late']])
-            absent_count = len([r for r in results if r.status == 'absent'])
-            justified_count = len([r for r in results if r.status == 'justified'])
-            
-            attendance_stats = {
-                'total_records': total_records,
-                'present_count': present_count,
-                'absent_count': absent_count,
-                'justified_count': justified_count,
-                'attendance_rate': round((present_count / total_records) * 100, 2) if total_records > 0 else 0,
-                'absence_rate': round((absent_count / total_records) * 100, 2) if total_records > 0 else 0,
-                'status_distribution': {
-                    'present': len([r for r in results if r.status == 'present']),
-                    'absent': absent_count,
-                    'late': len([r for r in results if r.status == 'late']),
-                    'justified': justified_count
-                }
-            }
-        else:
-            attendance_stats = {
-                'total_records': 0,
-                'present_count': 0,
-                'absent_count': 0,
-                'justified_count': 0,
-                'attendance_rate': 0,
-                'absence_rate': 0,
-                'status_distribution': {}
-            }
+        statement = attendance_statement(
+            get_current_user(),
+            class_id=request.args.get('class_id', type=int),
+            student_id=request.args.get('student_id', type=int)
+        )
+        
+        results = db.session.execute(statement).all()
         
-        return jsonify(attendance_stats), 200
+        return jsonify(summarize_attendance(results)), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -286,6 +95,7 @@ def get_attendance_report():
 @reports_bp.route('/class-summary/<int:class_id>', methods=['GET'])
 @jwt_required()
 @teacher_or_above_required
+@async_job
 def get_class_summary(class_id):
     """Get detailed summary for a specific class"""
     try:
@@ -297,8 +107,8 @@ def get_class_summary(class_id):
         
         # Check teacher permission
         if current_user.role == 'teacher':
-            teacher = Teacher.query.filter_by(user_id=current_user.id).first()
-            if not teacher or class_group.teacher_id != teacher.id:
+            teacher_id = current_user.teacher_id
+            if not teacher_id or class_group.teacher_id != teacher_id:
                 return jsonify({'error': 'Permission denied'}), 403
         
         # Get enrollments
@@ -373,6 +183,8 @@ def get_class_summary(class_id):
 
 @reports_bp.route('/student-transcript/<int:student_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(transcript_versions)
+@async_job
 def get_student_transcript(student_id):
     """Get academic transcript for a student"""
     try:
@@ -386,63 +198,39 @@ def get_student_transcript(student_id):
         if current_user.role == 'student' and student.user_id != current_user.id:
             return jsonify({'error': 'Permission denied'}), 403
         
-        # Get all enrollments for the student
-        enrollments = Enrollment.query.filter_by(student_id=student_id).all()
+        transcript_data = build_transcript(student)
         
-        # Organize by semester/year
-        transcript_data = {
-            'student': student.to_dict(),
-            'course': student.course.to_dict() if student.course else None,
-            'semesters': {},
-            'summary': {
-                'total_credits_attempted': 0,
-                'total_credits_earned': 0,
-                'gpa': 0,
-                'total_subjects': len(enrollments),
-                'approved_subjects': 0,
-                'failed_subjects': 0
-            }
-        }
+        return jsonify(transcript_data), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reports_bp.route('/student-transcript/<int:student_id>/pdf', methods=['GET'])
+@jwt_required()
+@conditional_get(transcript_versions)
+def get_student_transcript_pdf(student_id):
+    """Download the transcript of a student as a PDF rendered in the background"""
+    try:
+        current_user = get_current_user()
+        student = Student.query.get(student_id)
         
-        total_grade_points = 0
-        total_credits_for_gpa = 0
+        if not student:
+            return jsonify({'error': 'Student not found'}), 404
         
-        for enrollment in enrollments:
-            class_group = enrollment.class_group
-            subject = class_group.subject
-            semester_key = f"{class_group.year}.{class_group.semester}"
-            
-            if semester_key not in transcript_data['semesters']:
-                transcript_data['semesters'][semester_key] = []
-            
-            # Calculate grade points for GPA
-            if enrollment.final_grade and subject.credits:
-                total_grade_points += float(enrollment.final_grade) * subject.credits
-                total_credits_for_gpa += subject.credits
-            
-            # Count credits
-            transcript_data['summary']['total_credits_attempted'] += subject.credits
-            if enrollment.final_status == 'approved':
-                transcript_data['summary']['total_credits_earned'] += subject.credits
-                transcript_data['summary']['approved_subjects'] += 1
-            elif enrollment.final_status == 'failed':
-                transcript_data['summary']['failed_subjects'] += 1
-            
-            # Add to semester data
-            transcript_data['semesters'][semester_key].append({
-                'subject': subject.to_dict(),
-                'class_code': class_group.class_code,
-                'teacher': class_group.teacher.user.full_name if class_group.teacher else 'N/A',
-                'final_grade': float(enrollment.final_grade) if enrollment.final_grade else None,
-                'final_status': enrollment.final_status,
-                'credits': subject.credits
-            })
-        
-        # Calculate GPA
-        if total_credits_for_gpa > 0:
-            transcript_data['summary']['gpa'] = round(total_grade_points / total_credits_for_gpa, 2)
+        # Check permissions
+        if current_user.role == 'student' and student.user_id != current_user.id:
+            return jsonify({'error': 'Permission denied'}), 403
         
-        return jsonify(transcript_data), 200
+        # Unchanged versions find the cached PDF without building the transcript
+        path, ready = request_transcript_pdf(student, current_versions(transcript_versions(student_id)))
+        if ready:
+            return send_file(path, mimetype='application/pdf', as_attachment=True,
+                             download_name=f'transcript-{student.student_number}.pdf')
+        
+        # Rendering runs on the process pool; the client polls this URL
+        response = jsonify({'status': 'rendering', 'message': 'Transcript is being rendered, try again shortly'})
+        response.headers['Retry-After'] = '2'
+        return response, 202
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -450,6 +238,7 @@ def get_student_transcript(student_id):
 @reports_bp.route('/teacher-workload/<int:teacher_id>', methods=['GET'])
 @jwt_required()
 @teacher_or_above_required
+@async_job
 def get_teacher_workload(teacher_id):
     """Get workload report for a teacher"""
     try:
@@ -476,6 +265,9 @@ def get_teacher_workload(teacher_id):
         
         classes = query.all()
         
+        # Count pending grades for all selected classes at once
+        pending = get_pending_grades(teacher_id=teacher_id, semester=semester, year=year)
+        
         workload_data = {
             'teacher': teacher.to_dict(),
             'period': {
@@ -496,17 +288,7 @@ def get_teacher_workload(teacher_id):
             enrolled_students = len([e for e in class_group.enrollments if e.status == 'enrolled'])
             evaluations = Evaluation.query.filter_by(class_group_id=class_group.id).all()
             
-            # Count pending grades
-            pending_grades = 0
-            for evaluation in evaluations:
-                for enrollment in class_group.enrollments:
-                    if enrollment.status == 'enrolled':
-                        grade = Grade.query.filter_by(
-                            enrollment_id=enrollment.id,
-                            evaluation_id=evaluation.id
-                        ).first()
-                        if not grade:
-                            pending_grades += 1
+            pending_grades = pending['by_class'].get(class_group.id, 0)
             
             class_data = {
                 'class': class_group.to_dict(),
@@ -1,20 +1,33 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 from src.models import db
 from src.models.user import User
 from src.models.student import Student
 from src.models.course import Course
+from src.models.enrollment import Enrollment
 from src.utils.decorators import coordinator_or_admin_required, get_current_user
+from src.utils.serialization import with_graph
+from src.utils.serializers import serializer_for, json_response
+from src.utils.pagination import paginate, PaginationError
+from src.utils.passwords import PASSWORD_POOL_ERRORS
+from src.utils.bulk_import import import_people, read_rows, ImportFormatError
+from src.utils.stats import summarize, count_where, counts_by_value, totals_by
+from src.utils.search_index import apply_search
 
 students_bp = Blueprint('students', __name__)
 
+STUDENT_SORT_KEYS = {
+    'id': (Student.id,),
+    'name': (User.first_name, User.last_name, Student.id),
+    'created_at': (Student.created_at, Student.id)
+}
+
 @students_bp.route('', methods=['GET'])
 @jwt_required()
 def get_students():
     """Get all students with pagination and filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         course_id = request.args.get('course_id', type=int)
         status = request.args.get('status')
         search = request.args.get('search')
@@ -29,29 +42,20 @@ def get_students():
             query = query.filter(Student.status == status)
         
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                (User.first_name.ilike(search_filter)) |
-                (User.last_name.ilike(search_filter)) |
-                (User.email.ilike(search_filter)) |
-                (Student.student_number.ilike(search_filter))
-            )
-        
-        # Paginate results
-        students = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+            query = apply_search(query, 'student', Student.id, search, (
+                User.first_name, User.last_name, User.email, Student.student_number
+            ))
         
-        return jsonify({
-            'students': [student.to_dict() for student in students.items],
-            'total': students.total,
-            'pages': students.pages,
-            'current_page': page,
-            'per_page': per_page
+        # Paginate results, read as the columns the serializer renders
+        students, pagination = paginate(query, STUDENT_SORT_KEYS, serializer=serializer_for(Student))
+        
+        return json_response({
+            'students': students,
+            **pagination
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -142,6 +146,33 @@ def create_student():
             'student': student.to_dict()
         }), 201
         
+    except PASSWORD_POOL_ERRORS:
+        db.session.rollback()
+        raise  # Answered with 503 by the app-level handler
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@students_bp.route('/import', methods=['POST'])
+@jwt_required()
+@coordinator_or_admin_required
+def import_students():
+    """Bulk import students from an uploaded CSV or XLSX file"""
+    try:
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            return jsonify({'error': 'file is required'}), 400
+        
+        report = import_people('students', read_rows(upload.stream, upload.filename))
+        
+        return jsonify({
+            'message': f"{report['created']} students imported",
+            **report
+        }), 200
+        
+    except ImportFormatError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -271,7 +302,8 @@ def get_student_enrollments(student_id):
            (current_user.role not in ['admin', 'coordinator', 'teacher', 'student']):
             return jsonify({'error': 'Permission denied'}), 403
         
-        enrollments = [enrollment.to_dict() for enrollment in student.enrollments]
+        enrollments = with_graph(Enrollment.query.filter_by(student_id=student_id), Enrollment).all()
+        enrollments = [enrollment.to_dict() for enrollment in enrollments]
         
         return jsonify({'enrollments': enrollments}), 200
         
@@ -283,24 +315,18 @@ def get_student_enrollments(student_id):
 def get_student_stats():
     """Get student statistics"""
     try:
-        stats = {
-            'total_students': Student.query.count(),
-            'active_students': Student.query.filter(Student.status == 'active').count(),
-            'students_by_status': {},
-            'students_by_course': {}
-        }
-        
-        # Count students by status
-        statuses = ['active', 'inactive', 'graduated', 'dropped', 'suspended']
-        for status in statuses:
-            count = Student.query.filter(Student.status == status).count()
-            stats['students_by_status'][status] = count
-        
-        # Count students by course
-        courses = Course.query.all()
-        for course in courses:
-            count = Student.query.filter(Student.course_id == course.id, Student.status == 'active').count()
-            stats['students_by_course'][course.name] = count
+        stats = summarize(Student, {
+            'total_students': func.count(Student.id),
+            'active_students': count_where(Student.status == 'active'),
+            'students_by_status': counts_by_value(Student.status)
+        })
+        
+        # Active students per course, listing courses without students too
+        stats['students_by_course'] = totals_by(
+            db.session.query(Course.name, func.count(Student.id)).outerjoin(
+                Student, (Student.course_id == Course.id) & (Student.status == 'active')
+            ).group_by(Course.id, Course.name)
+        )
         
         return jsonify(stats), 200
         
@@ -1,19 +1,30 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 from src.models import db
 from src.models.subject import Subject
 from src.models.course import Course
+from src.models.class_group import ClassGroup
 from src.utils.decorators import coordinator_or_admin_required
+from src.utils.serialization import with_graph
+from src.utils.serializers import serializer_for, json_response
+from src.utils.pagination import paginate, PaginationError
+from src.utils.stats import summarize, count_where, totals_by, avg_where, rounded
+from src.utils.search_index import apply_search
 
 subjects_bp = Blueprint('subjects', __name__)
 
+SUBJECT_SORT_KEYS = {
+    'id': (Subject.id,),
+    'name': (Subject.name, Subject.id),
+    'created_at': (Subject.created_at, Subject.id)
+}
+
 @subjects_bp.route('', methods=['GET'])
 @jwt_required()
 def get_subjects():
     """Get all subjects with pagination and filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         course_id = request.args.get('course_id', type=int)
         semester = request.args.get('semester', type=int)
         is_mandatory = request.args.get('is_mandatory', type=bool)
@@ -36,28 +47,20 @@ def get_subjects():
             query = query.filter(Subject.is_active == is_active)
         
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                (Subject.name.ilike(search_filter)) |
-                (Subject.code.ilike(search_filter)) |
-                (Subject.description.ilike(search_filter))
-            )
-        
-        # Paginate results
-        subjects = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+            query = apply_search(query, 'subject', Subject.id, search, (
+                Subject.name, Subject.code, Subject.description
+            ))
         
-        return jsonify({
-            'subjects': [subject.to_dict() for subject in subjects.items],
-            'total': subjects.total,
-            'pages': subjects.pages,
-            'current_page': page,
-            'per_page': per_page
+        # Paginate results, read as the columns the serializer renders
+        subjects, pagination = paginate(query, SUBJECT_SORT_KEYS, serializer=serializer_for(Subject))
+        
+        return json_response({
+            'subjects': subjects,
+            **pagination
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -229,17 +232,17 @@ def get_subject_classes(subject_id):
         year = request.args.get('year', type=int)
         status = request.args.get('status')
         
-        query = subject.class_groups
+        query = ClassGroup.query.filter_by(subject_id=subject_id)
         
         # Apply filters
         if semester:
-            query = [cg for cg in query if cg.semester == semester]
+            query = query.filter(ClassGroup.semester == semester)
         if year:
-            query = [cg for cg in query if cg.year == year]
+            query = query.filter(ClassGroup.year == year)
         if status:
-            query = [cg for cg in query if cg.status == status]
+            query = query.filter(ClassGroup.status == status)
         
-        classes = [class_group.to_dict() for class_group in query]
+        classes = [class_group.to_dict() for class_group in with_graph(query, ClassGroup).all()]
         
         return jsonify({'classes': classes}), 200
         
@@ -279,29 +282,24 @@ def get_subjects_by_course(course_id):
 def get_subject_stats():
     """Get subject statistics"""
     try:
-        stats = {
-            'total_subjects': Subject.query.count(),
-            'active_subjects': Subject.query.filter(Subject.is_active == True).count(),
-            'mandatory_subjects': Subject.query.filter(Subject.is_mandatory == True, Subject.is_active == True).count(),
-            'elective_subjects': Subject.query.filter(Subject.is_mandatory == False, Subject.is_active == True).count(),
-            'subjects_by_course': {},
-            'average_credits': 0,
-            'average_workload': 0
-        }
-        
-        # Count subjects by course
-        courses = Course.query.filter(Course.is_active == True).all()
-        for course in courses:
-            count = Subject.query.filter(Subject.course_id == course.id, Subject.is_active == True).count()
-            stats['subjects_by_course'][course.name] = count
-        
-        # Calculate averages
-        active_subjects = Subject.query.filter(Subject.is_active == True).all()
-        if active_subjects:
-            total_credits = sum(s.credits for s in active_subjects)
-            total_workload = sum(s.workload_hours for s in active_subjects)
-            stats['average_credits'] = round(total_credits / len(active_subjects), 2)
-            stats['average_workload'] = round(total_workload / len(active_subjects), 2)
+        active = Subject.is_active == True
+        stats = summarize(Subject, {
+            'total_subjects': func.count(Subject.id),
+            'active_subjects': count_where(active),
+            'mandatory_subjects': count_where(active & (Subject.is_mandatory == True)),
+            'elective_subjects': count_where(active & (Subject.is_mandatory == False)),
+            'average_credits': avg_where(Subject.credits, active),
+            'average_workload': avg_where(Subject.workload_hours, active)
+        })
+        stats['average_credits'] = rounded(stats['average_credits'])
+        stats['average_workload'] = rounded(stats['average_workload'])
+        
+        # Active subjects per active course
+        stats['subjects_by_course'] = totals_by(
+            db.session.query(Course.name, func.count(Subject.id)).outerjoin(
+                Subject, (Subject.course_id == Course.id) & active
+            ).filter(Course.is_active == True).group_by(Course.id, Course.name)
+        )
         
         return jsonify(stats), 200
         
@@ -1,19 +1,32 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 from src.models import db
 from src.models.user import User
 from src.models.teacher import Teacher
+from src.models.class_group import ClassGroup
 from src.utils.decorators import coordinator_or_admin_required, get_current_user
+from src.utils.serialization import with_graph
+from src.utils.serializers import serializer_for, json_response
+from src.utils.pagination import paginate, PaginationError
+from src.utils.passwords import PASSWORD_POOL_ERRORS
+from src.utils.bulk_import import import_people, read_rows, ImportFormatError
+from src.utils.stats import summarize, count_where, counts_by_value, totals_by
+from src.utils.search_index import apply_search
 
 teachers_bp = Blueprint('teachers', __name__)
 
+TEACHER_SORT_KEYS = {
+    'id': (Teacher.id,),
+    'name': (User.first_name, User.last_name, Teacher.id),
+    'created_at': (Teacher.created_at, Teacher.id)
+}
+
 @teachers_bp.route('', methods=['GET'])
 @jwt_required()
 def get_teachers():
     """Get all teachers with pagination and filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         department = request.args.get('department')
         status = request.args.get('status')
         search = request.args.get('search')
@@ -28,29 +41,20 @@ def get_teachers():
             query = query.filter(Teacher.status == status)
         
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                (User.first_name.ilike(search_filter)) |
-                (User.last_name.ilike(search_filter)) |
-                (User.email.ilike(search_filter)) |
-                (Teacher.employee_number.ilike(search_filter))
-            )
-        
-        # Paginate results
-        teachers = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+            query = apply_search(query, 'teacher', Teacher.id, search, (
+                User.first_name, User.last_name, User.email, Teacher.employee_number
+            ))
         
-        return jsonify({
-            'teachers': [teacher.to_dict() for teacher in teachers.items],
-            'total': teachers.total,
-            'pages': teachers.pages,
-            'current_page': page,
-            'per_page': per_page
+        # Paginate results, read as the columns the serializer renders
+        teachers, pagination = paginate(query, TEACHER_SORT_KEYS, serializer=serializer_for(Teacher))
+        
+        return json_response({
+            'teachers': teachers,
+            **pagination
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -141,6 +145,33 @@ def create_teacher():
             'teacher': teacher.to_dict()
         }), 201
         
+    except PASSWORD_POOL_ERRORS:
+        db.session.rollback()
+        raise  # Answered with 503 by the app-level handler
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@teachers_bp.route('/import', methods=['POST'])
+@jwt_required()
+@coordinator_or_admin_required
+def import_teachers():
+    """Bulk import teachers from an uploaded CSV or XLSX file"""
+    try:
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            return jsonify({'error': 'file is required'}), 400
+        
+        report = import_people('teachers', read_rows(upload.stream, upload.filename))
+        
+        return jsonify({
+            'message': f"{report['created']} teachers imported",
+            **report
+        }), 200
+        
+    except ImportFormatError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -273,13 +304,13 @@ def get_teacher_classes(teacher_id):
         semester = request.args.get('semester')
         year = request.args.get('year', type=int)
         
-        query = teacher.class_groups
+        query = ClassGroup.query.filter_by(teacher_id=teacher_id)
         if semester:
-            query = [cg for cg in query if cg.semester == semester]
+            query = query.filter(ClassGroup.semester == semester)
         if year:
-            query = [cg for cg in query if cg.year == year]
+            query = query.filter(ClassGroup.year == year)
         
-        classes = [class_group.to_dict() for class_group in query]
+        classes = [class_group.to_dict() for class_group in with_graph(query, ClassGroup).all()]
         
         return jsonify({'classes': classes}), 200
         
@@ -291,32 +322,18 @@ def get_teacher_classes(teacher_id):
 def get_teacher_stats():
     """Get teacher statistics"""
     try:
-        stats = {
-            'total_teachers': Teacher.query.count(),
-            'active_teachers': Teacher.query.filter(Teacher.status == 'active').count(),
-            'teachers_by_status': {},
-            'teachers_by_department': {},
-            'teachers_by_degree': {}
-        }
-        
-        # Count teachers by status
-        statuses = ['active', 'inactive', 'on_leave']
-        for status in statuses:
-            count = Teacher.query.filter(Teacher.status == status).count()
-            stats['teachers_by_status'][status] = count
-        
-        # Count teachers by department
-        departments = db.session.query(Teacher.department).distinct().all()
-        for (dept,) in departments:
-            if dept:
-                count = Teacher.query.filter(Teacher.department == dept, Teacher.status == 'active').count()
-                stats['teachers_by_department'][dept] = count
-        
-        # Count teachers by academic degree
-        degrees = ['bachelor', 'master', 'doctorate', 'post_doctorate']
-        for degree in degrees:
-            count = Teacher.query.filter(Teacher.academic_degree == degree, Teacher.status == 'active').count()
-            stats['teachers_by_degree'][degree] = count
+        active = Teacher.status == 'active'
+        stats = summarize(Teacher, {
+            'total_teachers': func.count(Teacher.id),
+            'active_teachers': count_where(active),
+            'teachers_by_status': counts_by_value(Teacher.status),
+            'teachers_by_degree': counts_by_value(Teacher.academic_degree, condition=active)
+        })
+        
+        # Active teachers per department
+        stats['teachers_by_department'] = totals_by(
+            db.session.query(Teacher.department, count_where(active)).group_by(Teacher.department)
+        )
         
         return jsonify(stats), 200
         
@@ -1,18 +1,27 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 from src.models import db
 from src.models.user import User
-from src.utils.decorators import admin_required
+from src.utils.decorators import admin_required, get_current_user
+from src.utils.pagination import paginate, PaginationError
+from src.utils.passwords import PASSWORD_POOL_ERRORS
+from src.utils.stats import summarize, count_where, counts_by_value
+from src.utils.search_index import apply_search
 
 users_bp = Blueprint('users', __name__)
 
+USER_SORT_KEYS = {
+    'id': (User.id,),
+    'name': (User.first_name, User.last_name, User.id),
+    'created_at': (User.created_at, User.id)
+}
+
 @users_bp.route('', methods=['GET'])
 @jwt_required()
 def get_users():
     """Get all users with pagination and filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         role = request.args.get('role')
         search = request.args.get('search')
         
@@ -23,29 +32,20 @@ def get_users():
             query = query.filter(User.role == role)
         
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                (User.first_name.ilike(search_filter)) |
-                (User.last_name.ilike(search_filter)) |
-                (User.email.ilike(search_filter)) |
-                (User.username.ilike(search_filter))
-            )
+            query = apply_search(query, 'user', User.id, search, (
+                User.first_name, User.last_name, User.email, User.username
+            ))
         
         # Paginate results
-        users = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        users, pagination = paginate(query, USER_SORT_KEYS)
         
         return jsonify({
-            'users': [user.to_dict() for user in users.items],
-            'total': users.total,
-            'pages': users.pages,
-            'current_page': page,
-            'per_page': per_page
+            'users': [user.to_dict() for user in users],
+            **pagination
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -110,6 +110,9 @@ def create_user():
             'user': user.to_dict()
         }), 201
         
+    except PASSWORD_POOL_ERRORS:
+        db.session.rollback()
+        raise  # Answered with 503 by the app-level handler
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -119,11 +122,10 @@ def create_user():
 def update_user(user_id):
     """Update user information"""
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
+        current_user = get_current_user()
         
         # Check if user can update this profile
-        if current_user_id != user_id and current_user.role != 'admin':
+        if current_user.id != user_id and current_user.role != 'admin':
             return jsonify({'error': 'Permission denied'}), 403
         
         user = User.query.get(user_id)
@@ -195,17 +197,12 @@ def delete_user(user_id):
 def get_user_stats():
     """Get user statistics"""
     try:
-        stats = {
-            'total_users': User.query.count(),
-            'active_users': User.query.filter(User.is_active == True).count(),
-            'users_by_role': {}
-        }
-        
-        # Count users by role
-        roles = ['admin', 'coordinator', 'teacher', 'student']
-        for role in roles:
-            count = User.query.filter(User.role == role, User.is_active == True).count()
-            stats['users_by_role'][role] = count
+        active = User.is_active == True
+        stats = summarize(User, {
+            'total_users': func.count(User.id),
+            'active_users': count_where(active),
+            'users_by_role': counts_by_value(User.role, condition=active)
+        })
         
         return jsonify(stats), 200
         
@@ -0,0 +1,32 @@
+from sqlalchemy import func, select, update
+from src.models import db
+from src.models.enrollment import Enrollment
+from src.models.attendance import Attendance, ATTENDANCE_COUNTERS
+from src.utils.change_versions import bump_enrollment_versions
+
+
+def _count_attendance(status=None):
+    """Correlated count of the attendance rows of the enrollment being updated"""
+    query = select(func.count(Attendance.id)).where(Attendance.enrollment_id == Enrollment.id)
+    if status:
+        query = query.where(Attendance.status == status)
+    return query.scalar_subquery()
+
+
+def rebuild_attendance_counters(enrollment_ids=None):
+    """Recalculate the attendance counters of enrollments from the attendance table"""
+    values = {'attendance_total': _count_attendance()}
+    for status, column in ATTENDANCE_COUNTERS.items():
+        values[column] = _count_attendance(status)
+
+    statement = update(Enrollment).values(values)
+    classes = select(Enrollment.class_group_id).distinct()
+    if enrollment_ids is not None:
+        statement = statement.where(Enrollment.id.in_(enrollment_ids))
+        classes = classes.where(Enrollment.id.in_(enrollment_ids))
+
+    result = db.session.execute(statement.execution_options(synchronize_session=False))
+    bump_enrollment_versions(db.session.connection(), db.session.execute(classes).scalars())
+    db.session.commit()
+
+    return result.rowcount
@@ -0,0 +1,121 @@
+import time
+from itertools import chain
+from flask import current_app, jsonify
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy import event, inspect, select, update
+from src.models import db
+from src.models.user import User
+from src.models.teacher import Teacher
+from src.models.student import Student
+
+# user_id -> (token_version or None when inactive, monotonic expiry)
+_token_versions = {}
+
+
+def token_claims(user):
+    """Claims that let requests be authorized without loading the user"""
+    return {
+        'role': user.role,
+        'teacher_id': user.teacher.id if user.teacher else None,
+        'student_id': user.student.id if user.student else None,
+        'ver': user.token_version
+    }
+
+
+def create_access_token_for(user):
+    # The sub claim must be a string; Principal turns it back into the user id
+    return create_access_token(identity=str(user.id), additional_claims=token_claims(user))
+
+
+def create_refresh_token_for(user):
+    return create_refresh_token(identity=str(user.id), additional_claims={'ver': user.token_version})
+
+
+def token_version_statement(user_id):
+    return select(User.token_version, User.is_active).where(User.id == user_id)
+
+
+def cached_token_version(user_id):
+    """(hit, version) from this process's token version cache"""
+    cached = _token_versions.get(user_id)
+    if cached and cached[1] > time.monotonic():
+        return True, cached[0]
+    return False, None
+
+
+def remember_token_version(user_id, row, cache_seconds):
+    """Cache the version of a token_version_statement row (None for a missing or inactive user)"""
+    version = row.token_version if row and row.is_active else None
+    _token_versions[user_id] = (version, time.monotonic() + cache_seconds)
+    return version
+
+
+def current_token_version(user_id):
+    """Token version of an active user, cached for TOKEN_VERSION_CACHE_SECONDS"""
+    hit, version = cached_token_version(user_id)
+    if hit:
+        return version
+
+    row = db.session.execute(token_version_statement(user_id)).first()
+    return remember_token_version(user_id, row, current_app.config['TOKEN_VERSION_CACHE_SECONDS'])
+
+
+def forget_token_version(user_id):
+    _token_versions.pop(user_id, None)
+
+
+def token_is_revoked(jwt_header, jwt_payload):
+    """Reject tokens minted before the account's last role, status or password change"""
+    version = jwt_payload.get('ver')
+    return version is None or version != current_token_version(int(jwt_payload['sub']))
+
+
+def register_token_callbacks(jwt):
+    """Install the token version check on a JWTManager"""
+    jwt.token_in_blocklist_loader(token_is_revoked)
+
+    @jwt.revoked_token_loader
+    def revoked_token_response(jwt_header, jwt_payload):
+        return jsonify({'error': 'Token is no longer valid, please log in again'}), 401
+
+
+@event.listens_for(User, 'after_update')
+def _forget_cached_version(mapper, connection, target):
+    # Other processes pick the new version up when their cache entry expires
+    forget_token_version(target.id)
+
+
+def _profile_user_ids(session):
+    """Users that gained or lost a teacher or student profile in this flush"""
+    user_ids = set()
+    for instance in chain(session.new, session.deleted, session.dirty):
+        if isinstance(instance, (Teacher, Student)):
+            history = inspect(instance).attrs['user_id'].history
+            if instance in session.dirty and not history.has_changes():
+                continue
+            user_ids.update(chain(history.added, history.unchanged, history.deleted))
+    return user_ids - {None}
+
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_profile_token_versions(session, flush_context):
+    # Tokens carry teacher_id and student_id, so a profile change revokes them like a role change
+    user_ids = _profile_user_ids(session)
+    if not user_ids:
+        return
+
+    session.connection().execute(
+        update(User.__table__).where(User.__table__.c.id.in_(user_ids)).values(
+            token_version=User.__table__.c.token_version + 1
+        )
+    )
+    session.info.setdefault('profile_token_users', set()).update(user_ids)
+
+
+@event.listens_for(db.session, 'after_flush_postexec')
+def _expire_profile_token_versions(session, flush_context):
+    for user_id in session.info.pop('profile_token_users', ()):
+        forget_token_version(user_id)
+        user = session.identity_map.get(inspect(User).identity_key_from_primary_key((user_id,)))
+        if user is not None:
+            session.expire(user, ['token_version'])
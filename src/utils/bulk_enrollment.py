@@ -0,0 +1,95 @@
+from sqlalchemy import func, update
+from src.models import db
+from src.models.class_group import ClassGroup
+from src.models.student import Student
+from src.models.enrollment import Enrollment
+
+
+def _result(class_id, student_id, error=None):
+    result = {'class_id': class_id, 'student_id': student_id, 'status': 'error' if error else 'enrolled'}
+    if error:
+        result['error'] = error
+    return result
+
+
+def lock_class_seats(class_ids):
+    """Hold the class rows until the transaction ends, so enrolled counts read afterwards stay true
+
+    A no-op UPDATE rather than SELECT ... FOR UPDATE, which SQLite ignores: it takes the
+    row locks on PostgreSQL and the database write lock on SQLite before anything is counted.
+    """
+    classes = ClassGroup.__table__
+    db.session.execute(
+        update(classes).where(classes.c.id.in_(class_ids)).values(
+            max_students=classes.c.max_students,
+            updated_at=classes.c.updated_at
+        )
+    )
+
+
+def enroll_students(pairs, enrollment_date=None):
+    """Enroll (class_id, student_id) pairs in the current transaction and report each outcome"""
+    pairs = list(pairs)
+    class_ids = {class_id for class_id, _ in pairs}
+    student_ids = {student_id for _, student_id in pairs}
+
+    # Concurrent enrollments into the same classes queue here instead of sharing free seats
+    if class_ids:
+        lock_class_seats(class_ids)
+    classes = {
+        row.id: row for row in db.session.query(ClassGroup.id, ClassGroup.max_students)
+        .filter(ClassGroup.id.in_(class_ids))
+    } if class_ids else {}
+    enrolled_counts = dict(
+        db.session.query(Enrollment.class_group_id, func.count())
+        .filter(Enrollment.class_group_id.in_(class_ids), Enrollment.status == 'enrolled')
+        .group_by(Enrollment.class_group_id)
+    ) if class_ids else {}
+    students = {
+        student_id for (student_id,) in db.session.query(Student.id).filter(Student.id.in_(student_ids))
+    } if student_ids else set()
+    # Filtered per column so the bound parameters grow with classes + students, not their product
+    existing = {
+        (row.class_group_id, row.student_id) for row in db.session.query(Enrollment.class_group_id, Enrollment.student_id)
+        .filter(Enrollment.class_group_id.in_(class_ids), Enrollment.student_id.in_(student_ids))
+    } if pairs else set()
+
+    # Existence, duplicate and capacity checks are answered from the sets above
+    seats = {
+        class_id: (row.max_students or 0) - enrolled_counts.get(class_id, 0)
+        for class_id, row in classes.items()
+    }
+    results = []
+    accepted = set()
+    enrollments = []
+
+    for class_id, student_id in pairs:
+        if class_id not in classes:
+            results.append(_result(class_id, student_id, 'Class not found'))
+        elif student_id not in students:
+            results.append(_result(class_id, student_id, 'Student not found'))
+        elif (class_id, student_id) in existing:
+            results.append(_result(class_id, student_id, 'Student is already enrolled in this class'))
+        elif (class_id, student_id) in accepted:
+            results.append(_result(class_id, student_id, 'Duplicate entry in request'))
+        elif seats[class_id] <= 0:
+            results.append(_result(class_id, student_id, 'Class is full'))
+        else:
+            seats[class_id] -= 1
+            accepted.add((class_id, student_id))
+            enrollment = Enrollment(student_id=student_id, class_group_id=class_id)
+            if enrollment_date:
+                enrollment.enrollment_date = enrollment_date
+            enrollments.append(enrollment)
+            results.append(_result(class_id, student_id))
+
+    if enrollments:
+        # One flush batches the rows into a multi-row INSERT and keeps the flush listeners in step
+        db.session.add_all(enrollments)
+        db.session.flush()
+        enrollment_ids = iter(enrollment.id for enrollment in enrollments)
+        for result in results:
+            if result['status'] == 'enrolled':
+                result['enrollment_id'] = next(enrollment_ids)
+
+    return results
@@ -0,0 +1,284 @@
+import codecs
+import csv
+import io
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from src.models import db
+from src.models.user import User
+from src.models.student import Student
+from src.models.teacher import Teacher
+from src.models.course import Course
+from src.utils.passwords import hash_passwords
+
+USER_FIELDS = ['username', 'email', 'password', 'first_name', 'last_name', 'phone']
+
+IMPORT_KINDS = {
+    'students': {
+        'model': Student,
+        'role': 'student',
+        'number_field': 'student_number',
+        'required': ['username', 'email', 'password', 'first_name', 'last_name', 'student_number', 'course_id'],
+        'fields': ['student_number', 'course_id', 'enrollment_date', 'birth_date', 'gender', 'document_type',
+                   'document_number', 'address', 'city', 'state', 'zip_code', 'emergency_contact_name',
+                   'emergency_contact_phone']
+    },
+    'teachers': {
+        'model': Teacher,
+        'role': 'teacher',
+        'number_field': 'employee_number',
+        'required': ['username', 'email', 'password', 'first_name', 'last_name', 'employee_number', 'academic_degree'],
+        'fields': ['employee_number', 'department', 'specialization', 'academic_degree', 'hire_date', 'birth_date',
+                   'gender', 'document_type', 'document_number', 'address', 'city', 'state', 'zip_code']
+    }
+}
+
+
+# Unique columns of imported rows, as they appear in the databases' constraint violation messages
+UNIQUE_FIELDS = {
+    'username': 'Username',
+    'email': 'Email',
+    'student_number': 'Student number',
+    'employee_number': 'Employee number'
+}
+
+
+class ImportFormatError(ValueError):
+    """Raised when an uploaded file cannot be read as CSV or XLSX"""
+
+
+def integrity_error_message(error):
+    """Row error for an IntegrityError: the duplicated field for unique violations, the database error otherwise"""
+    message = str(error.orig)
+    lowered = message.lower()
+    if 'unique' in lowered or 'duplicate' in lowered:
+        for field, label in UNIQUE_FIELDS.items():
+            if field in lowered:
+                return f'{label} already exists'
+        return 'Username, email or number already exists'
+    return f'Row could not be saved: {message}'
+
+
+def _cell(value):
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheets store numeric codes as floats
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+
+def _header(value):
+    return str(value).strip().lower() if value is not None else None
+
+
+def _check_utf8(stream, chunk_size=64 * 1024):
+    """Reject a CSV that is not UTF-8 before any of its rows is imported, then rewind it"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    row_number = 1
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        try:
+            decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            row_number += chunk.count(b'\n', 0, e.start)
+            raise ImportFormatError(f'Row {row_number}: file is not UTF-8 text; save it as CSV UTF-8')
+        row_number += chunk.count(b'\n')
+    try:
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        raise ImportFormatError(f'Row {row_number}: file is not UTF-8 text; save it as CSV UTF-8')
+    stream.seek(0)
+
+
+def _csv_rows(stream):
+    _check_utf8(stream)
+    reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    headers = [_header(value) for value in next(reader, [])]
+    for values in reader:
+        yield headers, values
+
+
+def _xlsx_rows(stream):
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFormatError(f'Could not read spreadsheet: {e}')
+
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [_header(value) for value in next(rows, ())]
+        for values in rows:
+            yield headers, values
+    finally:
+        workbook.close()
+
+
+def read_rows(stream, filename):
+    """Yield (row number, {column: value}) from a CSV or XLSX file without loading it whole"""
+    extension = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+    if extension == 'csv':
+        rows = _csv_rows(stream)
+    elif extension == 'xlsx':
+        rows = _xlsx_rows(stream)
+    else:
+        raise ImportFormatError('File must be a .csv or .xlsx spreadsheet')
+
+    for row_number, (headers, values) in enumerate(rows, start=2):
+        row = {header: _cell(value) for header, value in zip(headers, values) if header}
+        if any(value is not None for value in row.values()):
+            yield row_number, row
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class _Importer:
+    """Validates rows against uniqueness sets loaded up front and inserts them in batches"""
+
+    def __init__(self, kind):
+        self.spec = IMPORT_KINDS[kind]
+        self.model = self.spec['model']
+        self.number_column = getattr(self.model, self.spec['number_field'])
+
+        # One query per uniqueness set instead of three per row
+        self.usernames = set()
+        self.emails = set()
+        for username, email in db.session.query(User.username, User.email):
+            self.usernames.add(username)
+            self.emails.add(email)
+        self.numbers = {number for (number,) in db.session.query(self.number_column)}
+        self.course_ids = {course_id for (course_id,) in db.session.query(Course.id)} if self.model is Student else None
+
+        self.columns = self.model.__table__.c
+        self.created = 0
+        self.errors = []
+
+    def validate(self, row):
+        """Return (values, errors) for one parsed row"""
+        errors = [f'{field} is required' for field in self.spec['required'] if not row.get(field)]
+        values = {field: row.get(field) for field in USER_FIELDS + self.spec['fields']}
+
+        for field in USER_FIELDS:
+            if isinstance(values[field], (date, datetime)):
+                values[field] = values[field].isoformat()
+
+        number_field = self.spec['number_field']
+        if values['username'] and values['username'] in self.usernames:
+            errors.append('Username already exists')
+        if values['email'] and values['email'] in self.emails:
+            errors.append('Email already exists')
+        if values[number_field] and values[number_field] in self.numbers:
+            errors.append(f'{UNIQUE_FIELDS[number_field]} already exists')
+
+        for field in self.spec['fields']:
+            column = self.columns[field]
+            value = values[field]
+            if value is None:
+                continue
+            if isinstance(column.type, db.Date):
+                try:
+                    values[field] = _parse_date(value)
+                except (TypeError, ValueError):
+                    errors.append(f'{field} must be a date (YYYY-MM-DD)')
+            elif isinstance(column.type, db.Enum):
+                if value not in column.type.enums:
+                    errors.append(f"{field} must be one of: {', '.join(column.type.enums)}")
+            elif isinstance(value, (date, datetime)):
+                values[field] = value.isoformat()
+
+        if self.course_ids is not None and values['course_id']:
+            try:
+                values['course_id'] = int(values['course_id'])
+            except ValueError:
+                errors.append('course_id must be an integer')
+            else:
+                if values['course_id'] not in self.course_ids:
+                    errors.append('Course not found')
+
+        if not errors:
+            # Later rows of the same file are checked against this one too
+            self.usernames.add(values['username'])
+            self.emails.add(values['email'])
+            self.numbers.add(values[number_field])
+        return values, errors
+
+    def _objects(self, values, password_hash):
+        user = User(
+            username=values['username'],
+            email=values['email'],
+            password=None,
+            first_name=values['first_name'],
+            last_name=values['last_name'],
+            role=self.spec['role'],
+            phone=values['phone'],
+            password_hash=password_hash
+        )
+        # Missing values fall back to the column defaults
+        profile = self.model(user=user, **{
+            field: values[field] for field in self.spec['fields'] if values[field] is not None
+        })
+        return [user, profile]
+
+    def insert(self, batch):
+        """Insert a batch of validated rows in one transaction, isolating rows that still conflict"""
+        if not batch:
+            return
+        hashes = hash_passwords([values['password'] for _, values in batch])
+
+        try:
+            for (_, values), password_hash in zip(batch, hashes):
+                db.session.add_all(self._objects(values, password_hash))
+            db.session.commit()
+            self.created += len(batch)
+            return
+        except IntegrityError:
+            db.session.rollback()
+
+        # Another writer took a value after the sets were loaded; retry row by row
+        for (row_number, values), password_hash in zip(batch, hashes):
+            try:
+                db.session.add_all(self._objects(values, password_hash))
+                db.session.commit()
+                self.created += 1
+            except IntegrityError as e:
+                db.session.rollback()
+                self.errors.append({'row': row_number, 'errors': [integrity_error_message(e)]})
+
+
+def import_people(kind, rows, batch_size=None):
+    """Import students or teachers from (row number, row) pairs and report per-row errors"""
+    batch_size = batch_size or current_app.config['IMPORT_BATCH_SIZE']
+    importer = _Importer(kind)
+    total = 0
+    batch = []
+
+    for row_number, row in rows:
+        total += 1
+        values, errors = importer.validate(row)
+        if errors:
+            importer.errors.append({'row': row_number, 'errors': errors})
+            continue
+
+        batch.append((row_number, values))
+        if len(batch) >= batch_size:
+            importer.insert(batch)
+            batch = []
+    importer.insert(batch)
+
+    importer.errors.sort(key=lambda error: error['row'])
+    return {
+        'total': total,
+        'created': importer.created,
+        'failed': len(importer.errors),
+        'errors': importer.errors
+    }
@@ -0,0 +1,180 @@
+import hashlib
+from datetime import datetime
+from functools import wraps
+from itertools import chain
+from flask import make_response, request
+from sqlalchemy import event, insert, inspect, or_, select, update
+from src.models import db
+from src.models.change_version import ChangeVersion
+from src.models.class_group import ClassGroup
+from src.models.enrollment import Enrollment
+from src.models.evaluation import Evaluation
+from src.models.grade import Grade
+from src.models.attendance import Attendance
+from src.utils.decorators import get_current_user
+from src.utils.upsert import dialect_insert
+
+# Conditional responses are private to the caller and revalidated on every use
+CACHE_CONTROL = 'private, no-cache'
+
+# Bookkeeping tables no response depends on
+UNVERSIONED_TABLES = {'change_versions', 'dashboard_snapshots', 'table_counters', 'jobs'}
+
+# Rows versioned per class group through their enrollment
+ENROLLMENT_SCOPED = (Grade, Attendance)
+
+# Tables whose flushes also rewrite rendered columns of another table in the same scope:
+# attendance listeners shift the enrollment counters behind attendance_percentage
+DERIVED_VERSIONS = {'attendance': ('enrollments',)}
+
+
+def table_keys(*table_names):
+    """Version keys covering whole tables"""
+    return [(table_name, 0) for table_name in table_names]
+
+
+def class_keys(class_id, *table_names):
+    """Version keys covering the rows of one class group in class-scoped tables"""
+    return [(table_name, class_id) for table_name in table_names]
+
+
+def bump_versions(connection, keys):
+    """Increment the change version of each (table_name, scope_id) key"""
+    keys = sorted(set(keys))
+    if not keys:
+        return
+
+    versions = ChangeVersion.__table__
+    now = datetime.utcnow()
+    rows = [{'table_name': table_name, 'scope_id': scope_id, 'version': 1, 'updated_at': now}
+            for table_name, scope_id in keys]
+
+    upsert = dialect_insert()
+    if upsert is not None:
+        statement = upsert(versions)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=['table_name', 'scope_id'],
+            set_={'version': versions.c.version + 1, 'updated_at': statement.excluded.updated_at}
+        ), rows)
+        return
+
+    for row in rows:
+        result = connection.execute(
+            update(versions).where(
+                versions.c.table_name == row['table_name'], versions.c.scope_id == row['scope_id']
+            ).values(version=versions.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(versions), row)
+
+
+def bump_enrollment_versions(connection, class_ids):
+    """Version enrollments rewritten by Core updates, which the flush listener does not see"""
+    bump_versions(connection, table_keys('enrollments') + [
+        key for class_id in set(class_ids) for key in class_keys(class_id, 'enrollments')
+    ])
+
+
+def versions_statement(keys):
+    """Statement reading the stored versions of a non-empty set of keys"""
+    return select(ChangeVersion.table_name, ChangeVersion.scope_id, ChangeVersion.version).where(or_(*[
+        (ChangeVersion.table_name == table_name) & (ChangeVersion.scope_id == scope_id)
+        for table_name, scope_id in keys
+    ]))
+
+
+def current_versions(keys):
+    """Versions of the given keys in one query; keys never written are at version 0"""
+    keys = set(keys)
+    versions = dict.fromkeys(keys, 0)
+    if keys:
+        for row in db.session.execute(versions_statement(keys)):
+            versions[(row.table_name, row.scope_id)] = row.version
+    return versions
+
+
+def compute_etag(full_path, principal, versions, daily=False):
+    """Strong ETag of a response rendered for principal from data at the given versions"""
+    # The same data renders differently per caller and per query string
+    parts = [full_path, principal.id if principal else None, principal.role if principal else None]
+    parts += [f'{table_name}:{scope_id}={versions[(table_name, scope_id)]}'
+              for table_name, scope_id in sorted(versions)]
+    if daily:
+        # The UTC date, matching the dashboard's recent window
+        parts.append(datetime.utcnow().date().isoformat())
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:32]
+
+
+def _class_ids(instance, attribute):
+    """Class group id of an instance before and after the flush"""
+    history = inspect(instance).attrs[attribute].history
+    return set(chain(history.added, history.unchanged, history.deleted)) - {None}
+
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_change_versions(session, flush_context):
+    keys = set()
+    by_enrollment = set()  # (table_name, enrollment_id) still to resolve to a class
+
+    for instance in chain(session.new, session.dirty, session.deleted):
+        table_name = getattr(instance, '__tablename__', None)
+        if table_name is None or table_name in UNVERSIONED_TABLES:
+            continue
+        if instance in session.dirty and not session.is_modified(instance, include_collections=False):
+            continue
+
+        keys.add((table_name, 0))
+        if isinstance(instance, ClassGroup):
+            keys.add((table_name, instance.id))
+        elif isinstance(instance, (Evaluation, Enrollment)):
+            keys.update((table_name, class_id) for class_id in _class_ids(instance, 'class_group_id'))
+        elif isinstance(instance, ENROLLMENT_SCOPED):
+            enrollment = instance.__dict__.get('enrollment')
+            if enrollment is not None and enrollment.class_group_id:
+                keys.add((table_name, enrollment.class_group_id))
+            else:
+                by_enrollment.add((table_name, instance.enrollment_id))
+
+    if not keys:
+        return
+
+    connection = session.connection()
+    if by_enrollment:
+        classes = dict(connection.execute(
+            select(Enrollment.id, Enrollment.class_group_id).where(
+                Enrollment.id.in_({enrollment_id for _, enrollment_id in by_enrollment})
+            )
+        ).all())
+        keys.update(
+            (table_name, classes[enrollment_id])
+            for table_name, enrollment_id in by_enrollment if enrollment_id in classes
+        )
+
+    keys.update(
+        (derived, scope_id) for table_name, scope_id in list(keys) for derived in DERIVED_VERSIONS.get(table_name, ())
+    )
+    bump_versions(connection, keys)
+
+
+def conditional_get(dependencies, daily=False):
+    """Decorator answering If-None-Match with 304 when none of the dependencies changed"""
+    # dependencies: (table_name, scope_id) keys, or a function of the view arguments returning them;
+    # daily=True also rolls the ETag over at midnight for responses that depend on the date
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            keys = dependencies(**kwargs) if callable(dependencies) else dependencies
+            etag = compute_etag(request.full_path, get_current_user(), current_versions(keys), daily)
+
+            if etag in request.if_none_match:
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = CACHE_CONTROL
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,174 @@
+import click
+
+
+def register_commands(app):
+    """Register maintenance commands on the Flask CLI"""
+
+    @app.cli.command('verify-final-grades')
+    @click.option('--fix', is_flag=True, help='Rewrite drifted enrollments with the recomputed values.')
+    def verify_final_grades_command(fix):
+        """Recompute final grades from scratch and report drift"""
+        from src.utils.final_grades import verify_final_grades
+
+        drift = verify_final_grades(fix=fix)
+        for item in drift:
+            click.echo(
+                f"Enrollment {item['enrollment_id']}: stored {item['stored']['final_grade']}, "
+                f"expected {item['expected']['final_grade']}"
+            )
+
+        if not drift:
+            click.echo('No drift found.')
+        elif fix:
+            click.echo(f'{len(drift)} enrollments fixed.')
+        else:
+            click.echo(f'{len(drift)} enrollments drifted. Run with --fix to correct them.')
+
+    @app.cli.command('rebuild-attendance-counters')
+    def rebuild_attendance_counters_command():
+        """Recalculate enrollment attendance counters from the attendance table"""
+        from src.utils.attendance_counters import rebuild_attendance_counters
+
+        updated = rebuild_attendance_counters()
+        click.echo(f'Attendance counters rebuilt for {updated} enrollments.')
+
+    @app.cli.command('rebuild-evaluation-stats')
+    def rebuild_evaluation_stats_command():
+        """Recalculate evaluation score statistics from the grades table"""
+        from src.utils.evaluation_stats import rebuild_evaluation_stats
+
+        updated = rebuild_evaluation_stats()
+        click.echo(f'Score statistics rebuilt for {updated} evaluations.')
+
+    @app.cli.command('rebuild-table-counters')
+    def rebuild_table_counters_command():
+        """Recount the tables behind estimated list totals"""
+        from src.utils.table_counters import rebuild_table_counters
+
+        updated = rebuild_table_counters()
+        click.echo(f'{updated} table counters rebuilt.')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Rebuild the full-text search index from the source tables"""
+        from src.utils.search_index import rebuild_search_index, search_index_enabled
+
+        if not search_index_enabled():
+            click.echo('Full-text search is not available on this database.')
+            return
+
+        indexed = rebuild_search_index()
+        click.echo(f'{indexed} documents indexed.')
+
+    @app.cli.command('rebuild-dashboard-snapshots')
+    def rebuild_dashboard_snapshots_command():
+        """Recount every dashboard snapshot from the source tables"""
+        from src.utils.dashboard import rebuild_dashboard_snapshots
+
+        rebuilt = rebuild_dashboard_snapshots()
+        click.echo(f'{rebuilt} dashboard snapshots rebuilt.')
+
+    @app.cli.command('calibrate-bcrypt')
+    @click.option('--target-ms', default=250, show_default=True, help='Longest acceptable time for one hash.')
+    def calibrate_bcrypt_command(target_ms):
+        """Suggest a BCRYPT_ROUNDS value for this machine"""
+        from src.utils.passwords import calibrate_rounds
+
+        rounds, timings = calibrate_rounds(target_ms)
+        for cost, elapsed in timings.items():
+            click.echo(f'rounds={cost}: {elapsed:.0f} ms')
+        click.echo(f"Suggested BCRYPT_ROUNDS={rounds} (current {app.config['BCRYPT_ROUNDS']}).")
+
+    @app.cli.command('bulk-import')
+    @click.argument('kind', type=click.Choice(['students', 'teachers']))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--batch-size', type=int, help='Rows committed per transaction (default IMPORT_BATCH_SIZE).')
+    def bulk_import_command(kind, path, batch_size):
+        """Import students or teachers from a CSV or XLSX file"""
+        from src.utils.bulk_import import import_people, read_rows, ImportFormatError
+
+        with open(path, 'rb') as stream:
+            try:
+                report = import_people(kind, read_rows(stream, path), batch_size)
+            except ImportFormatError as e:
+                raise click.ClickException(str(e))
+
+        for error in report['errors']:
+            click.echo(f"Row {error['row']}: {'; '.join(error['errors'])}")
+        click.echo(f"{report['created']} of {report['total']} {kind} imported, {report['failed']} rows failed.")
+
+    @app.cli.command('prerender-transcripts')
+    @click.option('--course-id', type=int, help='Only students of this course.')
+    def prerender_transcripts_command(course_id):
+        """Render the PDF transcripts that are missing or out of date"""
+        from src.models.student import Student
+        from src.utils.transcripts import prerender_transcripts
+
+        query = Student.query.order_by(Student.id)
+        if course_id:
+            query = query.filter_by(course_id=course_id)
+
+        rendered, failed = prerender_transcripts(query.yield_per(500))
+        click.echo(f'{rendered} transcripts rendered, {failed} failed.')
+
+    @app.cli.command('run-job-workers')
+    @click.option('--workers', type=int, help='Worker processes (default JOB_WORKERS).')
+    @click.option('--once', is_flag=True, help='Run queued jobs in this process and exit when the queue is empty.')
+    def run_job_workers_command(workers, once):
+        """Run background report and export jobs"""
+        from src.utils.jobs import run_worker, start_workers
+
+        if once:
+            processed = run_worker(app, once=True)
+            click.echo(f'{processed} jobs processed.')
+            return
+
+        workers = workers or app.config['JOB_WORKERS']
+        processes = start_workers(workers)
+        click.echo(f'{workers} job workers started. Press Ctrl+C to stop.')
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+
+    @app.cli.command('sweep-job-results')
+    def sweep_job_results_command():
+        """Delete job results past JOB_RESULT_RETENTION and files no job owns"""
+        from src.utils.jobs import sweep_job_results
+
+        removed = sweep_job_results()
+        click.echo(f'{removed} result files deleted.')
+
+    @app.cli.command('benchmark-serializers')
+    @click.option('--model', 'model_names', multiple=True, help='Model class name (repeatable; default all list models).')
+    @click.option('--rows', default=1000, show_default=True, help='Rows rendered per run.')
+    @click.option('--repeat', default=5, show_default=True, help='Runs per model; the best rate is reported.')
+    def benchmark_serializers_command(model_names, rows, repeat):
+        """Compare rows/second of to_dict with the generated serializers"""
+        from src.models import db
+        from src.utils.serializers import benchmark_serializer
+
+        models = {mapper.class_.__name__: mapper.class_ for mapper in db.Model.registry.mappers}
+        model_names = model_names or ('Student', 'Teacher', 'Course', 'Subject', 'ClassGroup', 'Grade')
+        unknown = [name for name in model_names if name not in models]
+        if unknown:
+            raise click.ClickException(f"Unknown models: {', '.join(unknown)}")
+
+        for name in model_names:
+            result = benchmark_serializer(models[name], rows, repeat)
+            if not result['rows']:
+                click.echo(f'{name}: no rows to benchmark.')
+                continue
+
+            rates = result['rates']
+            click.echo(
+                f"{name} ({result['rows']} rows): "
+                f"query+render+encode {rates['to_dict']:.0f} -> {rates['serializer']:.0f} rows/s "
+                f"({rates['serializer'] / rates['to_dict']:.1f}x), "
+                f"render only {rates['to_dict_only']:.0f} -> {rates['serializer_only']:.0f} rows/s "
+                f"({rates['serializer_only'] / rates['to_dict_only']:.1f}x)"
+            )
+            if result['mismatches']:
+                click.echo(f"  {result['mismatches']} rows render differently from to_dict")
@@ -0,0 +1,264 @@
+import gzip
+import zlib
+from itertools import chain
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies up to this size are compressed in one go; larger or unsized bodies are streamed
+BUFFER_LIMIT = 1024 * 1024
+
+# Streamed output is flushed to the client after this much input, so exports keep arriving
+STREAM_FLUSH_SIZE = 64 * 1024
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml'
+}
+
+
+def _compressible(content_type):
+    mimetype = content_type.split(';', 1)[0].strip().lower()
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+def negotiate_encoding(accept_encoding, available):
+    """Best of the available encodings (in preference order) acceptable to the client, or None"""
+    weights = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in available:
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def _compress(body, encoding, quality):
+    if encoding == 'br':
+        return brotli.compress(body, quality=quality)
+    return gzip.compress(body, compresslevel=quality, mtime=0)
+
+
+def _stream(chunks, encoding, quality):
+    """Compress an iterable of chunks incrementally"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=quality)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(quality, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        compress, finish = compressor.compress, compressor.flush
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    pending = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        output = compress(chunk)
+        pending += len(chunk)
+        if pending >= STREAM_FLUSH_SIZE:
+            output += flush()
+            pending = 0
+        if output:
+            yield output
+    yield finish()
+
+
+def _suffix_etag(etag, encoding):
+    # Each encoding is its own representation, so strong validators must differ
+    if etag.startswith('"') and etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+def _header(headers, name):
+    name = name.lower()
+    return next((value for key, value in headers if key.lower() == name), None)
+
+
+def _replace(headers, name, value=None):
+    headers[:] = [(key, old) for key, old in headers if key.lower() != name.lower()]
+    if value is not None:
+        headers.append((name, value))
+
+
+class CompressionMiddleware:
+    """WSGI middleware compressing text and JSON responses with Brotli or gzip per Accept-Encoding"""
+
+    def __init__(self, app, config):
+        self.app = app
+        self.min_size = config['COMPRESSION_MIN_SIZE']
+        self.routes = config['COMPRESSION_ROUTE_CLASSES']
+        self.quality = config['COMPRESSION_QUALITY']
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def route_class(self, path):
+        for prefix, route_class in self.routes:
+            if path == prefix or path.startswith(prefix.rstrip('/') + '/'):
+                return route_class
+        return 'default'
+
+    def _strip_if_none_match(self, header):
+        """If-None-Match without our encoding suffixes, and the bare validators mapped to the sent ones"""
+        # Validators we handed out carry the encoding suffix; the application only knows the bare ones
+        stripped = {}
+        tags = []
+        for tag in header.split(','):
+            tag = tag.strip()
+            for encoding in self.encodings:
+                suffix = f'-{encoding}"'
+                if tag.endswith(suffix) and not tag.startswith('W/'):
+                    bare = tag[:-len(suffix)] + '"'
+                    stripped[bare] = tag
+                    tag = bare
+                    break
+            tags.append(tag)
+        return ', '.join(tags), stripped
+
+    def _rewrite_headers(self, headers, code, method, path, encoding, stripped, length):
+        """Adjust the response headers in place; the quality to compress with, or None to send as is"""
+        if code == 304 and _header(headers, 'ETag') in stripped:
+            _replace(headers, 'ETag', stripped[_header(headers, 'ETag')])
+
+        if not _compressible(_header(headers, 'Content-Type') or '') or _header(headers, 'Content-Encoding'):
+            return None
+
+        vary = _header(headers, 'Vary')
+        if not vary or 'accept-encoding' not in vary.lower():
+            _replace(headers, 'Vary', f'{vary}, Accept-Encoding' if vary else 'Accept-Encoding')
+
+        if (encoding is None or method == 'HEAD' or code < 200 or code in (204, 206, 304)
+                or (length is not None and length < self.min_size)):
+            return None
+
+        quality = self.quality.get(self.route_class(path), self.quality['default'])[encoding]
+        etag = _header(headers, 'ETag')
+        if etag:
+            _replace(headers, 'ETag', _suffix_etag(etag, encoding))
+        _replace(headers, 'Content-Encoding', encoding)
+        _replace(headers, 'Accept-Ranges')  # Byte ranges would address the identity body
+        return quality
+
+    def __call__(self, environ, start_response):
+        encoding = negotiate_encoding(environ.get('HTTP_ACCEPT_ENCODING', ''), self.encodings)
+        stripped = {}
+        if environ.get('HTTP_IF_NONE_MATCH'):
+            environ['HTTP_IF_NONE_MATCH'], stripped = self._strip_if_none_match(environ['HTTP_IF_NONE_MATCH'])
+
+        captured = {}
+        written = []
+
+        def capture(status, headers, exc_info=None):
+            captured['status'] = status
+            captured['headers'] = headers
+            captured['exc_info'] = exc_info
+            return written.append
+
+        app_iter = self.app(environ, capture)
+        status, headers = captured['status'], captured['headers']
+        code = int(status.split(' ', 1)[0])
+
+        length = _header(headers, 'Content-Length')
+        length = int(length) if length is not None else None
+        quality = self._rewrite_headers(
+            headers, code, environ.get('REQUEST_METHOD'), environ.get('PATH_INFO', ''), encoding, stripped, length
+        )
+        if quality is None:
+            start_response(status, headers, captured['exc_info'])
+            return self._closing(chain(written, app_iter), app_iter) if written else app_iter
+
+        if length is not None and length <= BUFFER_LIMIT:
+            try:
+                body = b''.join(chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+                                for chunk in chain(written, app_iter))
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+            body = _compress(body, encoding, quality)
+            _replace(headers, 'Content-Length', str(len(body)))
+            start_response(status, headers, captured['exc_info'])
+            return [body]
+
+        _replace(headers, 'Content-Length')
+        start_response(status, headers, captured['exc_info'])
+        return self._closing(_stream(chain(written, app_iter), encoding, quality), app_iter)
+
+    @staticmethod
+    def _closing(chunks, app_iter):
+        # The server closes what we return; the application's iterable must be closed in turn
+        try:
+            yield from chunks
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+
+def _decode_headers(raw):
+    return [(key.decode('latin-1'), value.decode('latin-1')) for key, value in raw]
+
+
+def _encode_headers(headers):
+    # ASGI header names are lowercase
+    return [(key.lower().encode('latin-1'), value.encode('latin-1')) for key, value in headers]
+
+
+class AsgiCompressionMiddleware(CompressionMiddleware):
+    """CompressionMiddleware for ASGI apps answering with whole bodies, such as the async read API"""
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = _decode_headers(scope['headers'])
+        encoding = negotiate_encoding(_header(request_headers, 'Accept-Encoding') or '', self.encodings)
+        stripped = {}
+        if _header(request_headers, 'If-None-Match'):
+            if_none_match, stripped = self._strip_if_none_match(_header(request_headers, 'If-None-Match'))
+            _replace(request_headers, 'If-None-Match', if_none_match)
+            scope = dict(scope, headers=_encode_headers(request_headers))
+
+        start = None
+        chunks = []
+
+        async def compressing_send(message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                start = message
+                return
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            chunks.append(message.get('body', b''))
+            if message.get('more_body', False):
+                return
+
+            body = b''.join(chunks)
+            headers = _decode_headers(start['headers'])
+            quality = self._rewrite_headers(
+                headers, start['status'], scope['method'], scope['path'], encoding, stripped, len(body)
+            )
+            if quality is not None:
+                body = _compress(body, encoding, quality)
+                _replace(headers, 'Content-Length', str(len(body)))
+
+            await send(dict(start, headers=_encode_headers(headers)))
+            await send({'type': 'http.response.body', 'body': body})
+
+        await self.app(scope, receive, compressing_send)
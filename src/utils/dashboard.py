@@ -0,0 +1,380 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import case, event, func, inspect, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from src.models import db
+from src.models.dashboard_snapshot import DashboardSnapshot
+from src.models.student import Student
+from src.models.teacher import Teacher
+from src.models.course import Course
+from src.models.subject import Subject
+from src.models.class_group import ClassGroup
+from src.models.enrollment import Enrollment
+from src.models.evaluation import Evaluation
+from src.models.grade import Grade
+from src.utils.pending_grades import get_pending_grades
+
+RECENT_ENROLLMENT_DAYS = 30
+
+# (model, snapshot scope, attribute holding the owner id, snapshot column, attribute, counted when)
+SNAPSHOT_COUNTERS = [
+    (Student, 'global', None, 'total_students', 'status', lambda value: value == 'active'),
+    (Teacher, 'global', None, 'total_teachers', 'status', lambda value: value == 'active'),
+    (Course, 'global', None, 'total_courses', 'is_active', bool),
+    (Subject, 'global', None, 'total_subjects', 'is_active', bool),
+    (ClassGroup, 'global', None, 'active_classes', 'status', lambda value: value == 'active'),
+    (ClassGroup, 'teacher', 'teacher_id', 'active_classes', 'status', lambda value: value == 'active'),
+    (Enrollment, 'student', 'student_id', 'active_classes', 'status', lambda value: value == 'enrolled')
+]
+
+_ABSENT = object()
+
+
+def recent_window_start():
+    """First enrollment date counted as recent"""
+    return (datetime.utcnow() - timedelta(days=RECENT_ENROLLMENT_DAYS)).date()
+
+
+def _count(model, *conditions):
+    return select(func.count()).select_from(model).where(*conditions).scalar_subquery()
+
+
+def _global_values():
+    since = recent_window_start()
+    row = db.session.query(
+        _count(Student, Student.status == 'active').label('total_students'),
+        _count(Teacher, Teacher.status == 'active').label('total_teachers'),
+        _count(Course, Course.is_active == True).label('total_courses'),
+        _count(Subject, Subject.is_active == True).label('total_subjects'),
+        _count(ClassGroup, ClassGroup.status == 'active').label('active_classes'),
+        _count(Enrollment, Enrollment.enrollment_date >= since).label('recent_enrollments')
+    ).one()
+
+    values = row._asdict()
+    values['recent_since'] = since
+    values['pending_grades'] = get_pending_grades()['total']
+    return values
+
+
+def _teacher_pending(teacher_id):
+    return get_pending_grades(teacher_id=teacher_id, class_status='active')['total']
+
+
+def _teacher_values(teacher_id):
+    return {
+        'active_classes': ClassGroup.query.filter_by(teacher_id=teacher_id, status='active').count(),
+        'pending_grades': _teacher_pending(teacher_id)
+    }
+
+
+def _student_values(student_id):
+    return {
+        'active_classes': Enrollment.query.filter_by(student_id=student_id, status='enrolled').count()
+    }
+
+
+SNAPSHOT_BUILDERS = {
+    'global': lambda owner_id: _global_values(),
+    'teacher': _teacher_values,
+    'student': _student_values
+}
+
+
+def get_dashboard_snapshot(scope, owner_id=0):
+    """Read a snapshot row by primary key, building it on first use and settling stale parts"""
+    snapshot = db.session.get(DashboardSnapshot, (scope, owner_id))
+
+    if snapshot is None:
+        now = datetime.utcnow()
+        snapshot = DashboardSnapshot(
+            scope=scope, owner_id=owner_id, refreshed_at=now, updated_at=now,
+            **SNAPSHOT_BUILDERS[scope](owner_id)
+        )
+        db.session.add(snapshot)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request built the row first
+            db.session.rollback()
+            snapshot = db.session.get(DashboardSnapshot, (scope, owner_id))
+        return snapshot
+
+    changed = False
+    if snapshot.pending_stale:
+        snapshot.pending_grades = get_pending_grades()['total'] if scope == 'global' else _teacher_pending(owner_id)
+        snapshot.pending_stale = False
+        changed = True
+
+    if scope == 'global' and snapshot.recent_since != recent_window_start():
+        # The recent enrollments window slides once a day
+        snapshot.recent_since = recent_window_start()
+        snapshot.recent_enrollments = Enrollment.query.filter(
+            Enrollment.enrollment_date >= snapshot.recent_since
+        ).count()
+        changed = True
+
+    if changed:
+        snapshot.updated_at = datetime.utcnow()
+        db.session.commit()
+
+    return snapshot
+
+
+def snapshot_is_settled(snapshot):
+    """Whether a snapshot row can be served as read, without rebuilding or recounting"""
+    if snapshot is None or snapshot.pending_stale:
+        return False
+    return snapshot.scope != 'global' or snapshot.recent_since == recent_window_start()
+
+
+def dashboard_scopes(principal):
+    """Snapshot keys the dashboard of a caller reads, the global row first"""
+    scopes = [('global', 0)]
+    if principal.role == 'teacher' and principal.teacher_id:
+        scopes.append(('teacher', principal.teacher_id))
+    elif principal.role == 'student' and principal.student_id:
+        scopes.append(('student', principal.student_id))
+    return scopes
+
+
+def dashboard_stats(principal, snapshots):
+    """Dashboard statistics of a caller from the snapshots of dashboard_scopes"""
+    stats = snapshots[0].to_dict()
+    stats['pending_grades'] = 0
+
+    # Role-specific filtering
+    if principal.role == 'teacher':
+        if len(snapshots) > 1:
+            stats['active_classes'] = snapshots[-1].active_classes
+            stats['pending_grades'] = snapshots[-1].pending_grades
+
+    elif principal.role == 'student':
+        if len(snapshots) > 1:
+            stats['active_classes'] = snapshots[-1].active_classes
+            stats['total_students'] = 1  # Just this student
+
+    else:
+        # Admin/Coordinator - pending grades across all classes
+        stats['pending_grades'] = snapshots[0].pending_grades
+
+    # Oldest full recount among the rows used
+    stats['refreshed_at'] = min(snapshot.refreshed_at for snapshot in snapshots).isoformat()
+    stats['updated_at'] = max(snapshot.updated_at for snapshot in snapshots).isoformat()
+    return stats
+
+
+def rebuild_dashboard_snapshots():
+    """Recount every existing snapshot row from the source tables"""
+    snapshots = DashboardSnapshot.query.all()
+    if not snapshots:
+        return 0
+
+    global_values = _global_values()
+    pending_by_teacher = get_pending_grades(class_status='active')['by_teacher']
+    classes_by_teacher = dict(
+        db.session.query(ClassGroup.teacher_id, func.count(ClassGroup.id)).filter(
+            ClassGroup.status == 'active'
+        ).group_by(ClassGroup.teacher_id).all()
+    )
+    classes_by_student = dict(
+        db.session.query(Enrollment.student_id, func.count(Enrollment.id)).filter(
+            Enrollment.status == 'enrolled'
+        ).group_by(Enrollment.student_id).all()
+    )
+
+    now = datetime.utcnow()
+    for snapshot in snapshots:
+        if snapshot.scope == 'global':
+            for name, value in global_values.items():
+                setattr(snapshot, name, value)
+        elif snapshot.scope == 'teacher':
+            snapshot.active_classes = classes_by_teacher.get(snapshot.owner_id, 0)
+            snapshot.pending_grades = pending_by_teacher.get(snapshot.owner_id, 0)
+        else:
+            snapshot.active_classes = classes_by_student.get(snapshot.owner_id, 0)
+        snapshot.pending_stale = False
+        snapshot.refreshed_at = now
+        snapshot.updated_at = now
+
+    db.session.commit()
+    return len(snapshots)
+
+
+def start_dashboard_rebuilder(app, interval):
+    """Rebuild all snapshots every interval seconds on a daemon thread"""
+    def run():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    rebuild_dashboard_snapshots()
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception('Dashboard snapshot rebuild failed')
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=run, name='dashboard-rebuilder', daemon=True)
+    thread.start()
+    return thread
+
+
+def _before_after(instance, attribute, state):
+    """Value of an attribute before and after the flush, _ABSENT where the row did not exist"""
+    value = getattr(instance, attribute)
+    if state == 'new':
+        return _ABSENT, value
+    if state == 'deleted':
+        return value, _ABSENT
+
+    history = inspect(instance).attrs[attribute].history
+    return (history.deleted[0] if history.deleted else value), value
+
+
+def _counter_deltas(instance, state, key_attribute, attribute, predicate):
+    """Yield (owner id, delta) for one counted row"""
+    old_key, new_key = _before_after(instance, key_attribute, state) if key_attribute else (0, 0)
+    old_value, new_value = _before_after(instance, attribute, state)
+
+    if old_value is not _ABSENT and predicate(old_value):
+        yield (0 if old_key is _ABSENT else old_key), -1
+    if new_value is not _ABSENT and predicate(new_value):
+        yield (0 if new_key is _ABSENT else new_key), 1
+
+
+def _changed(instance, state, *attributes):
+    if state != 'dirty':
+        return True
+    attrs = inspect(instance).attrs
+    return any(attrs[name].history.has_changes() for name in attributes)
+
+
+def _pending_grade_deltas(connection, graded, rows):
+    # A grade row settles (or reopens) one pending grade of an enrolled student
+    enrollment_ids = {enrollment_id for enrollment_id, _ in graded}
+    owners = {
+        row.id: row for row in connection.execute(
+            select(Enrollment.id, Enrollment.status, ClassGroup.status.label('class_status'), ClassGroup.teacher_id)
+            .join(ClassGroup, ClassGroup.id == Enrollment.class_group_id)
+            .where(Enrollment.id.in_(enrollment_ids))
+        )
+    }
+    for enrollment_id, delta in graded:
+        owner = owners.get(enrollment_id)
+        if owner is None or owner.status != 'enrolled':
+            continue
+        for key in [('global', 0)] + ([('teacher', owner.teacher_id)] if owner.class_status == 'active' else []):
+            counters = rows.setdefault(key, {})
+            counters['pending_grades'] = counters.get('pending_grades', 0) + delta
+
+
+def _apply_counter_deltas(connection, rows, now):
+    snapshots = DashboardSnapshot.__table__
+    for (scope, owner_id), counters in rows.items():
+        values = {column: snapshots.c[column] + delta for column, delta in counters.items() if delta}
+        if values:
+            connection.execute(
+                update(snapshots).where(
+                    snapshots.c.scope == scope, snapshots.c.owner_id == owner_id
+                ).values(updated_at=now, **values)
+            )
+
+
+def record_grade_writes(connection, graded):
+    """Shift pending grade counters for grades written outside the ORM, as (enrollment_id, -1 inserted / 1 deleted)"""
+    if not graded:
+        return
+    rows = {}
+    _pending_grade_deltas(connection, graded, rows)
+    _apply_counter_deltas(connection, rows, datetime.utcnow())
+
+
+@event.listens_for(db.session, 'after_flush')
+def _update_dashboard_snapshots(session, flush_context):
+    rows = {}
+    recent = {}
+    stale_classes = set()
+    stale_teachers = set()
+    all_teachers_stale = False
+    global_stale = False
+    graded = []
+
+    states = [(instance, 'new') for instance in session.new]
+    states += [(instance, 'deleted') for instance in session.deleted]
+    states += [(instance, 'dirty') for instance in session.dirty]
+
+    for instance, state in states:
+        for model, scope, key_attribute, column, attribute, predicate in SNAPSHOT_COUNTERS:
+            if isinstance(instance, model):
+                for owner_id, delta in _counter_deltas(instance, state, key_attribute, attribute, predicate):
+                    counters = rows.setdefault((scope, owner_id), {})
+                    counters[column] = counters.get(column, 0) + delta
+
+        if isinstance(instance, Enrollment):
+            old_date, new_date = _before_after(instance, 'enrollment_date', state)
+            if old_date != new_date:
+                if old_date is not _ABSENT:
+                    recent[old_date] = recent.get(old_date, 0) - 1
+                if new_date is not _ABSENT:
+                    recent[new_date] = recent.get(new_date, 0) + 1
+            if _changed(instance, state, 'status', 'class_group_id'):
+                old_class, new_class = _before_after(instance, 'class_group_id', state)
+                stale_classes.update(key for key in (old_class, new_class) if key is not _ABSENT)
+                global_stale = True
+
+        elif isinstance(instance, Evaluation) and _changed(instance, state, 'class_group_id'):
+            old_class, new_class = _before_after(instance, 'class_group_id', state)
+            stale_classes.update(key for key in (old_class, new_class) if key is not _ABSENT)
+            global_stale = True
+
+        elif isinstance(instance, ClassGroup) and _changed(instance, state, 'status', 'teacher_id'):
+            old_teacher, new_teacher = _before_after(instance, 'teacher_id', state)
+            stale_teachers.update(key for key in (old_teacher, new_teacher) if key is not _ABSENT)
+
+        elif isinstance(instance, Grade):
+            if state == 'new':
+                graded.append((instance.enrollment_id, -1))
+            elif state == 'deleted':
+                graded.append((instance.enrollment_id, 1))
+            elif _changed(instance, state, 'enrollment_id', 'evaluation_id'):
+                all_teachers_stale = True
+                global_stale = True
+
+    if not (rows or recent or stale_classes or stale_teachers or all_teachers_stale or global_stale or graded):
+        return
+
+    connection = session.connection()
+    snapshots = DashboardSnapshot.__table__
+
+    if graded:
+        _pending_grade_deltas(connection, graded, rows)
+
+    now = datetime.utcnow()
+    _apply_counter_deltas(connection, rows, now)
+
+    for enrollment_date, delta in recent.items():
+        if delta:
+            connection.execute(
+                update(snapshots).where(snapshots.c.scope == 'global').values(
+                    recent_enrollments=snapshots.c.recent_enrollments + case(
+                        (snapshots.c.recent_since <= enrollment_date, delta), else_=0
+                    ),
+                    updated_at=now
+                )
+            )
+
+    # Changes that move many pending grades at once are recounted on the next read
+    conditions = []
+    if global_stale:
+        conditions.append(snapshots.c.scope == 'global')
+    if all_teachers_stale:
+        conditions.append(snapshots.c.scope == 'teacher')
+    elif stale_teachers:
+        conditions.append((snapshots.c.scope == 'teacher') & snapshots.c.owner_id.in_(stale_teachers))
+    if stale_classes:
+        conditions.append((snapshots.c.scope == 'teacher') & snapshots.c.owner_id.in_(
+            select(ClassGroup.teacher_id).where(ClassGroup.id.in_(stale_classes))
+        ))
+    if conditions:
+        connection.execute(update(snapshots).where(or_(*conditions)).values(pending_stale=True))
@@ -1,18 +1,19 @@
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
-from src.models.user import User
+from src.utils.request_identity import current_identity
+
+def current_role():
+    """Role claim of the current access token"""
+    principal = current_identity().principal
+    return principal.role if principal else None
 
 def admin_required(f):
     """Decorator to require admin role"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or user.role != 'admin':
+        if current_role() != 'admin':
             return jsonify({'error': 'Admin access required'}), 403
-        
+
         return f(*args, **kwargs)
     return decorated_function
 
@@ -20,12 +21,9 @@ def coordinator_or_admin_required(f):
     """Decorator to require coordinator or admin role"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or user.role not in ['admin', 'coordinator']:
+        if current_role() not in ['admin', 'coordinator']:
             return jsonify({'error': 'Coordinator or admin access required'}), 403
-        
+
         return f(*args, **kwargs)
     return decorated_function
 
@@ -33,17 +31,20 @@ def teacher_or_above_required(f):
     """Decorator to require teacher, coordinator or admin role"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or user.role not in ['admin', 'coordinator', 'teacher']:
+        if current_role() not in ['admin', 'coordinator', 'teacher']:
             return jsonify({'error': 'Teacher access or above required'}), 403
-        
+
         return f(*args, **kwargs)
     return decorated_function
 
 def get_current_user():
-    """Helper function to get current user"""
-    current_user_id = get_jwt_identity()
-    return User.query.get(current_user_id) if current_user_id else None
+    """Helper function to get the current user from the token claims"""
+    return current_identity().principal
+
+def get_current_teacher():
+    """Teacher profile of the current user, loaded at most once per request"""
+    return current_identity().teacher
 
+def get_current_student():
+    """Student profile of the current user, loaded at most once per request"""
+    return current_identity().student
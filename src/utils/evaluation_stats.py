@@ -0,0 +1,112 @@
+import json
+from decimal import Decimal
+from sqlalchemy import select, update
+from src.models import db
+from src.models.evaluation import Evaluation, SCORE_HISTOGRAM_BUCKETS
+from src.models.grade import Grade
+
+
+def score_bucket(score, max_score):
+    """Return the histogram bucket a score falls into"""
+    if not max_score:
+        return 0
+    bucket = int(float(score) / float(max_score) * SCORE_HISTOGRAM_BUCKETS)
+    return min(max(bucket, 0), SCORE_HISTOGRAM_BUCKETS - 1)
+
+
+def apply_score_change(evaluation, old_score=None, new_score=None):
+    """Update an evaluation's running statistics by the delta of a single grade write"""
+    apply_score_changes(evaluation, [(old_score, new_score)])
+
+
+def apply_score_changes(evaluation, changes):
+    """Update an evaluation's running statistics by the combined delta of (old, new) score pairs"""
+    changes = [(old_score, new_score) for old_score, new_score in changes if old_score != new_score]
+    if not changes:
+        return
+
+    delta_count = 0
+    delta_sum = Decimal(0)
+    delta_squares = Decimal(0)
+    bucket_deltas = [0] * SCORE_HISTOGRAM_BUCKETS
+
+    for old_score, new_score in changes:
+        if old_score is not None:
+            old_score = Decimal(str(old_score))
+            delta_count -= 1
+            delta_sum -= old_score
+            delta_squares -= old_score * old_score
+            bucket_deltas[score_bucket(old_score, evaluation.max_score)] -= 1
+
+        if new_score is not None:
+            new_score = Decimal(str(new_score))
+            delta_count += 1
+            delta_sum += new_score
+            delta_squares += new_score * new_score
+            bucket_deltas[score_bucket(new_score, evaluation.max_score)] += 1
+
+    # Counters are shifted in SQL, which also locks the row for the rest of the transaction
+    db.session.execute(
+        update(Evaluation).where(Evaluation.id == evaluation.id).values(
+            score_count=Evaluation.score_count + delta_count,
+            score_sum=Evaluation.score_sum + delta_sum,
+            score_sum_squares=Evaluation.score_sum_squares + delta_squares
+        ).execution_options(synchronize_session=False)
+    )
+
+    # so the histogram is re-read under that lock rather than taken from the loaded evaluation
+    if any(bucket_deltas):
+        stored = db.session.execute(
+            select(Evaluation.score_histogram).where(Evaluation.id == evaluation.id).with_for_update()
+        ).scalar()
+        histogram = json.loads(stored) if stored else [0] * SCORE_HISTOGRAM_BUCKETS
+        histogram = [count + delta for count, delta in zip(histogram, bucket_deltas)]
+        db.session.execute(
+            update(Evaluation).where(Evaluation.id == evaluation.id).values(
+                score_histogram=json.dumps(histogram)
+            ).execution_options(synchronize_session=False)
+        )
+    db.session.expire(evaluation, ['score_count', 'score_sum', 'score_sum_squares', 'score_histogram'])
+
+
+def rebuild_evaluation_stats(evaluation_ids=None):
+    """Recalculate evaluation score statistics from the grades table"""
+    query = db.session.query(
+        Evaluation.id,
+        Evaluation.max_score,
+        Grade.score
+    ).outerjoin(
+        Grade, (Grade.evaluation_id == Evaluation.id) & Grade.score.isnot(None)
+    )
+    if evaluation_ids is not None:
+        query = query.filter(Evaluation.id.in_(evaluation_ids))
+
+    stats = {}
+    for row in query.yield_per(1000):
+        entry = stats.setdefault(row.id, {
+            'score_count': 0,
+            'score_sum': Decimal(0),
+            'score_sum_squares': Decimal(0),
+            'histogram': [0] * SCORE_HISTOGRAM_BUCKETS
+        })
+        if row.score is None:
+            continue
+
+        score = Decimal(str(row.score))
+        entry['score_count'] += 1
+        entry['score_sum'] += score
+        entry['score_sum_squares'] += score * score
+        entry['histogram'][score_bucket(score, row.max_score)] += 1
+
+    for evaluation_id, entry in stats.items():
+        db.session.execute(
+            update(Evaluation).where(Evaluation.id == evaluation_id).values(
+                score_count=entry['score_count'],
+                score_sum=entry['score_sum'],
+                score_sum_squares=entry['score_sum_squares'],
+                score_histogram=json.dumps(entry['histogram'])
+            ).execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+
+    return len(stats)
@@ -0,0 +1,193 @@
+import csv
+import io
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Response, stream_with_context
+from src.models import db
+from src.models.user import User
+from src.models.student import Student
+from src.models.subject import Subject
+from src.models.class_group import ClassGroup
+from src.models.enrollment import Enrollment
+from src.models.evaluation import Evaluation
+from src.models.grade import Grade
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+}
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+# Bytes buffered before a chunk of the download is sent
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Leading characters that make spreadsheet applications read a text cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+ROSTER_COLUMNS = [
+    'class_id', 'class_code', 'subject_code', 'subject_name', 'semester', 'year',
+    'student_number', 'first_name', 'last_name', 'email',
+    'enrollment_date', 'status', 'final_grade', 'final_status', 'attendance_percentage'
+]
+
+GRADEBOOK_COLUMNS = [
+    'class_id', 'class_code', 'subject_code', 'semester', 'year',
+    'student_number', 'first_name', 'last_name',
+    'evaluation_id', 'evaluation', 'max_score', 'weight', 'score', 'graded_at',
+    'final_grade', 'final_status'
+]
+
+
+def _scoped(query, class_id=None, subject_id=None, semester=None, year=None, course_id=None, teacher_id=None):
+    """Restrict a query joined to ClassGroup and Subject to one class, a subject/term or a course"""
+    if class_id:
+        query = query.filter(ClassGroup.id == class_id)
+    if subject_id:
+        query = query.filter(ClassGroup.subject_id == subject_id)
+    if semester:
+        query = query.filter(ClassGroup.semester == semester)
+    if year:
+        query = query.filter(ClassGroup.year == year)
+    if course_id:
+        query = query.filter(Subject.course_id == course_id)
+    if teacher_id:
+        query = query.filter(ClassGroup.teacher_id == teacher_id)
+    return query
+
+
+def _enrollment_query(*columns):
+    return db.session.query(*columns).select_from(Enrollment).join(
+        ClassGroup, ClassGroup.id == Enrollment.class_group_id
+    ).join(
+        Subject, Subject.id == ClassGroup.subject_id
+    ).join(
+        Student, Student.id == Enrollment.student_id
+    ).join(
+        User, User.id == Student.user_id
+    )
+
+
+def roster_rows(status='enrolled', **scope):
+    """Roster rows of the scoped classes, read in batches from a server-side cursor"""
+    query = _scoped(_enrollment_query(
+        ClassGroup.id, ClassGroup.class_code, Subject.code, Subject.name, ClassGroup.semester, ClassGroup.year,
+        Student.student_number, User.first_name, User.last_name, User.email,
+        Enrollment.enrollment_date, Enrollment.status, Enrollment.final_grade, Enrollment.final_status,
+        Enrollment.attendance_total, Enrollment.attendance_present, Enrollment.attendance_late
+    ), **scope)
+    if status:
+        query = query.filter(Enrollment.status == status)
+    query = query.order_by(ClassGroup.id, User.last_name, User.first_name, Enrollment.id)
+
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        *values, total, present, late = row
+        attendance = round(((present or 0) + (late or 0)) / total * 100, 2) if total else 0
+        yield values + [attendance]
+
+
+def gradebook_rows(**scope):
+    """One row per enrolled student and evaluation of the scoped classes, streamed in batches"""
+    query = _scoped(_enrollment_query(
+        ClassGroup.id, ClassGroup.class_code, Subject.code, ClassGroup.semester, ClassGroup.year,
+        Student.student_number, User.first_name, User.last_name,
+        Evaluation.id, Evaluation.name, Evaluation.max_score, Evaluation.weight, Grade.score, Grade.graded_at,
+        Enrollment.final_grade, Enrollment.final_status
+    ).outerjoin(
+        Evaluation, Evaluation.class_group_id == Enrollment.class_group_id
+    ).outerjoin(
+        Grade, (Grade.enrollment_id == Enrollment.id) & (Grade.evaluation_id == Evaluation.id)
+    ), **scope).filter(
+        Enrollment.status == 'enrolled'
+    ).order_by(
+        ClassGroup.id, User.last_name, User.first_name, Enrollment.id, Evaluation.due_date, Evaluation.id
+    )
+
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        yield list(row)
+
+
+def _is_formula(value):
+    return isinstance(value, str) and value.startswith(FORMULA_PREFIXES)
+
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if _is_formula(value):
+        # Quoted so user-entered text such as names is never evaluated on opening the file
+        return f"'{value}"
+    return value
+
+
+def stream_csv(columns, rows):
+    """Yield a CSV document in chunks as rows arrive"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data.encode('utf-8')
+
+    # Byte order mark so spreadsheet applications detect UTF-8
+    yield '\ufeff'.encode('utf-8')
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_plain(value) for value in row])
+        if buffer.tell() >= STREAM_CHUNK_SIZE:
+            yield flush()
+    yield flush()
+
+
+def stream_xlsx(columns, rows, title='Export'):
+    """Yield an XLSX workbook written row by row in openpyxl write-only mode"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+
+    def cell(value):
+        if isinstance(value, Decimal):
+            return float(value)
+        if _is_formula(value):
+            # openpyxl stores text starting with = as a formula unless typed as a string
+            text = WriteOnlyCell(sheet, value)
+            text.data_type = 's'
+            return text
+        # Dates stay native so spreadsheet applications can format them
+        return value
+
+    sheet.append(columns)
+    for row in rows:
+        sheet.append([cell(value) for value in row])
+
+    # The zip container is only complete once saved; spool it to disk and stream it back
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def export_response(export_format, filename, columns, rows, title='Export'):
+    """Streaming download of rows as CSV or XLSX"""
+    if export_format == 'xlsx':
+        body = stream_xlsx(columns, rows, title)
+    else:
+        body = stream_csv(columns, rows)
+
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{export_format}"'}
+    )
@@ -0,0 +1,142 @@
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import func, case, update
+from src.models import db
+from src.models.enrollment import Enrollment
+from src.models.evaluation import Evaluation
+from src.models.grade import Grade
+from src.utils.change_versions import bump_enrollment_versions
+
+# Running sums are compared at the precision they are stored with
+SUM_PRECISION = Decimal('0.0001')
+
+
+def _decimal(value):
+    return Decimal(str(value)) if value is not None else Decimal(0)
+
+
+def grade_contribution(score, weight):
+    """Return the (weighted score, weight) a grade adds to its enrollment"""
+    if score is None or weight is None:
+        return Decimal(0), Decimal(0)
+
+    weight = _decimal(weight)
+    return _decimal(score) * weight, weight
+
+
+def apply_final_grade_delta(enrollment, delta_sum, delta_weight, bump=True):
+    """Shift an enrollment's running totals and final grade in the current transaction
+
+    bump=False leaves the enrollments change versions to a caller moving many at once.
+    """
+    if not delta_sum and not delta_weight:
+        return
+
+    # Computed in SQL so concurrent writers to the same enrollment compose
+    weighted_sum = Enrollment.grade_weighted_sum + delta_sum
+    total_weight = Enrollment.grade_total_weight + delta_weight
+
+    db.session.execute(
+        update(Enrollment).where(Enrollment.id == enrollment.id).values(
+            grade_weighted_sum=weighted_sum,
+            grade_total_weight=total_weight,
+            final_grade=case(
+                (total_weight > 0, func.round(weighted_sum / total_weight, 2)),
+                else_=None
+            )
+        ).execution_options(synchronize_session=False)
+    )
+    db.session.expire(enrollment, ['grade_weighted_sum', 'grade_total_weight', 'final_grade'])
+    if bump:
+        bump_enrollment_versions(db.session.connection(), [enrollment.class_group_id])
+
+
+def apply_grade_change(enrollment, weight, old_score=None, new_score=None):
+    """Update an enrollment's final grade by the delta of a single grade write"""
+    old_sum, old_weight = grade_contribution(old_score, weight)
+    new_sum, new_weight = grade_contribution(new_score, weight)
+    apply_final_grade_delta(enrollment, new_sum - old_sum, new_weight - old_weight)
+
+
+def compute_final_grade_totals(enrollment_ids=None):
+    """Recompute (weighted sum, total weight) per enrollment from the grades table"""
+    query = db.session.query(
+        Grade.enrollment_id,
+        func.sum(Grade.score * Evaluation.weight).label('weighted_sum'),
+        func.sum(Evaluation.weight).label('total_weight')
+    ).join(
+        Evaluation, Evaluation.id == Grade.evaluation_id
+    ).filter(
+        Grade.score.isnot(None)
+    )
+
+    if enrollment_ids is not None:
+        query = query.filter(Grade.enrollment_id.in_(enrollment_ids))
+
+    return {
+        row.enrollment_id: (_decimal(row.weighted_sum), _decimal(row.total_weight))
+        for row in query.group_by(Grade.enrollment_id).all()
+    }
+
+
+def _final_grade(weighted_sum, total_weight):
+    # Rounds half away from zero, like SQL round()
+    if total_weight > 0:
+        return (weighted_sum / total_weight).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    return None
+
+
+def verify_final_grades(fix=False, enrollment_ids=None):
+    """Recompute final grades from scratch and report enrollments that drifted"""
+    expected = compute_final_grade_totals(enrollment_ids)
+
+    query = db.session.query(
+        Enrollment.id,
+        Enrollment.class_group_id,
+        Enrollment.grade_weighted_sum,
+        Enrollment.grade_total_weight,
+        Enrollment.final_grade
+    )
+    if enrollment_ids is not None:
+        query = query.filter(Enrollment.id.in_(enrollment_ids))
+
+    drift = []
+    corrections = {}
+    for row in query.yield_per(1000):
+        weighted_sum, total_weight = expected.get(row.id, (Decimal(0), Decimal(0)))
+        final_grade = _final_grade(weighted_sum, total_weight)
+
+        stored_sum = _decimal(row.grade_weighted_sum).quantize(SUM_PRECISION)
+        stored_weight = _decimal(row.grade_total_weight).quantize(SUM_PRECISION)
+        stored_final = _decimal(row.final_grade).quantize(Decimal('0.01')) if row.final_grade is not None else None
+
+        if (stored_sum != weighted_sum.quantize(SUM_PRECISION) or
+                stored_weight != total_weight.quantize(SUM_PRECISION) or
+                stored_final != final_grade):
+            corrections[row.id] = (row.class_group_id, weighted_sum, total_weight, final_grade)
+            drift.append({
+                'enrollment_id': row.id,
+                'stored': {
+                    'weighted_sum': float(stored_sum),
+                    'total_weight': float(stored_weight),
+                    'final_grade': float(stored_final) if stored_final is not None else None
+                },
+                'expected': {
+                    'weighted_sum': float(weighted_sum),
+                    'total_weight': float(total_weight),
+                    'final_grade': float(final_grade) if final_grade is not None else None
+                }
+            })
+
+    if fix and corrections:
+        for enrollment_id, (_, weighted_sum, total_weight, final_grade) in corrections.items():
+            db.session.execute(
+                update(Enrollment).where(Enrollment.id == enrollment_id).values(
+                    grade_weighted_sum=weighted_sum,
+                    grade_total_weight=total_weight,
+                    final_grade=final_grade
+                ).execution_options(synchronize_session=False)
+            )
+        bump_enrollment_versions(db.session.connection(), [class_id for class_id, *_ in corrections.values()])
+        db.session.commit()
+
+    return drift
@@ -0,0 +1,172 @@
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import insert, tuple_, update
+from src.models import db
+from src.models.grade import Grade
+from src.models.evaluation import Evaluation
+from src.models.enrollment import Enrollment
+from src.models.class_group import ClassGroup
+from src.utils.final_grades import grade_contribution, apply_final_grade_delta
+from src.utils.evaluation_stats import apply_score_changes
+from src.utils.dashboard import record_grade_writes
+from src.utils.upsert import dialect_insert
+from src.utils.change_versions import bump_versions, table_keys, class_keys
+
+REQUIRED_FIELDS = ['enrollment_id', 'evaluation_id', 'score']
+
+
+def _locked_grades(pairs):
+    """Current grade rows of (enrollment_id, evaluation_id) pairs, locked until the transaction ends"""
+    if not pairs:
+        return {}
+    return {
+        (row.enrollment_id, row.evaluation_id): row
+        for row in db.session.query(Grade.id, Grade.enrollment_id, Grade.evaluation_id, Grade.score)
+        .filter(tuple_(Grade.enrollment_id, Grade.evaluation_id).in_(list(pairs)))
+        .with_for_update()
+    }
+
+
+def _write_grades(rows, existing):
+    """Write rows keyed by pair; returns the pairs inserted and the scores the other pairs held before
+
+    existing holds the rows prefetched under lock. A pair another transaction inserted since
+    then is skipped by the insert, re-read under lock and updated from its real score.
+    """
+    grades = Grade.__table__
+    new_rows = [dict(row, created_at=row['updated_at']) for key, row in rows.items() if key not in existing]
+    inserted = set()
+
+    if new_rows:
+        upsert = dialect_insert()
+        if upsert is None:
+            # Without ON CONFLICT a concurrent insert fails the batch on _enrollment_evaluation_uc
+            db.session.execute(insert(grades), new_rows)
+            inserted = {(row['enrollment_id'], row['evaluation_id']) for row in new_rows}
+        else:
+            statement = upsert(grades).on_conflict_do_nothing(
+                index_elements=['enrollment_id', 'evaluation_id']
+            ).returning(grades.c.enrollment_id, grades.c.evaluation_id)
+            inserted = {tuple(row) for row in db.session.execute(statement, new_rows)}
+            conflicting = [
+                (row['enrollment_id'], row['evaluation_id']) for row in new_rows
+                if (row['enrollment_id'], row['evaluation_id']) not in inserted
+            ]
+            existing = {**existing, **_locked_grades(conflicting)}
+
+    updated_rows = [dict(row, id=existing[key].id) for key, row in rows.items() if key not in inserted]
+    if updated_rows:
+        db.session.execute(update(Grade), updated_rows)
+
+    return inserted, {key: existing[key].score for key in rows if key not in inserted}
+
+
+def upsert_grades(items, teacher_id=None):
+    """Validate and write a batch of grades in the current transaction
+
+    Returns (created, updated, errors); nothing is written when errors is not empty.
+    """
+    errors = []
+    batch = {}
+    for i, grade_data in enumerate(items):
+        if not isinstance(grade_data, dict):
+            errors.append(f'Grade {i+1}: must be an object')
+            continue
+        missing = [field for field in REQUIRED_FIELDS if field not in grade_data]
+        if missing:
+            errors.extend(f'Grade {i+1}: {field} is required' for field in missing)
+            continue
+        # A pair listed twice keeps its last entry
+        batch[(grade_data['enrollment_id'], grade_data['evaluation_id'])] = (i, grade_data)
+
+    enrollment_ids = {enrollment_id for enrollment_id, _ in batch}
+    evaluation_ids = {evaluation_id for _, evaluation_id in batch}
+
+    # Every row the batch depends on is loaded with one IN query per table
+    enrollments = {
+        enrollment.id: enrollment
+        for enrollment in Enrollment.query.filter(Enrollment.id.in_(enrollment_ids))
+    } if enrollment_ids else {}
+    evaluations = {
+        evaluation.id: (evaluation, owner_id)
+        for evaluation, owner_id in db.session.query(Evaluation, ClassGroup.teacher_id)
+        .join(ClassGroup, ClassGroup.id == Evaluation.class_group_id)
+        .filter(Evaluation.id.in_(evaluation_ids))
+    } if evaluation_ids else {}
+    existing = _locked_grades(batch)
+
+    now = datetime.utcnow()
+    rows = {}
+    scores = {}
+
+    for key, (i, grade_data) in sorted(batch.items(), key=lambda entry: entry[1][0]):
+        enrollment_id, evaluation_id = key
+        enrollment = enrollments.get(enrollment_id)
+        if not enrollment:
+            errors.append(f'Grade {i+1}: Enrollment not found')
+            continue
+
+        if evaluation_id not in evaluations:
+            errors.append(f'Grade {i+1}: Evaluation not found')
+            continue
+        evaluation, owner_id = evaluations[evaluation_id]
+
+        if teacher_id and owner_id != teacher_id:
+            errors.append(f'Grade {i+1}: Permission denied')
+            continue
+
+        score = grade_data['score']
+        if score is not None:
+            if isinstance(score, bool) or not isinstance(score, (int, float)):
+                errors.append(f'Grade {i+1}: score must be a number')
+                continue
+            if score < 0 or score > float(evaluation.max_score):
+                errors.append(f'Grade {i+1}: Score must be between 0 and {evaluation.max_score}')
+                continue
+
+        rows[key] = {
+            'enrollment_id': enrollment_id,
+            'evaluation_id': evaluation_id,
+            'score': Decimal(str(score)) if score is not None else None,
+            'comments': grade_data.get('comments'),
+            'graded_by': teacher_id,
+            'graded_at': now,
+            'updated_at': now
+        }
+        scores[key] = score
+
+    if errors:
+        return 0, 0, errors
+
+    inserted, old_scores = _write_grades(rows, existing)
+
+    # Deltas are taken against the scores the write actually replaced
+    final_grade_deltas = {}
+    score_changes = {}
+    for key, score in scores.items():
+        enrollment_id, evaluation_id = key
+        old_score = old_scores.get(key)
+        weight = evaluations[evaluation_id][0].weight
+        old_sum, old_weight = grade_contribution(old_score, weight)
+        new_sum, new_weight = grade_contribution(score, weight)
+        delta_sum, delta_weight = final_grade_deltas.get(enrollment_id, (Decimal(0), Decimal(0)))
+        final_grade_deltas[enrollment_id] = (delta_sum + new_sum - old_sum, delta_weight + new_weight - old_weight)
+        score_changes.setdefault(evaluation_id, []).append((old_score, score))
+
+    # Derived totals move once per enrollment and evaluation rather than once per grade
+    for enrollment_id, (delta_sum, delta_weight) in final_grade_deltas.items():
+        apply_final_grade_delta(enrollments[enrollment_id], delta_sum, delta_weight, bump=False)
+    for evaluation_id, changes in score_changes.items():
+        apply_score_changes(evaluations[evaluation_id][0], changes)
+
+    # Core inserts bypass the flush listener that maintains the pending grade counters
+    connection = db.session.connection()
+    record_grade_writes(connection, [(enrollment_id, -1) for enrollment_id, _ in inserted])
+    # Final grades and evaluation statistics changed with them
+    versioned = ('grades', 'enrollments', 'evaluations')
+    class_ids = {enrollments[enrollment_id].class_group_id for enrollment_id in final_grade_deltas}
+    bump_versions(connection, table_keys(*versioned) + [
+        key for class_id in class_ids for key in class_keys(class_id, *versioned)
+    ])
+
+    return len(inserted), len(rows) - len(inserted), errors
@@ -0,0 +1,57 @@
+from sqlalchemy.orm import joinedload, selectinload
+from src.models.enrollment import Enrollment
+from src.models.evaluation import Evaluation
+from src.models.student import Student
+from src.utils.serialization import with_graph, render_graph
+
+
+def build_class_gradebook(class_group):
+    """Build the student x evaluation gradebook of a class in a fixed number of queries"""
+    # Evaluations with all of their grades (2 statements)
+    evaluations = Evaluation.query.options(
+        joinedload(Evaluation.evaluation_type),
+        selectinload(Evaluation.grades)
+    ).filter_by(class_group_id=class_group.id).all()
+
+    # Enrolled students with user, course and institution (1 statement)
+    enrollments = with_graph(
+        Enrollment.query.filter_by(class_group_id=class_group.id, status='enrolled'),
+        Enrollment,
+        *render_graph(Student, 'student')
+    ).all()
+
+    # Pivot grades by (enrollment, evaluation)
+    grades = {}
+    for evaluation in evaluations:
+        for grade in evaluation.grades:
+            grades[(grade.enrollment_id, evaluation.id)] = grade
+
+    gradebook = {
+        'class': class_group.to_dict(),
+        'evaluations': [evaluation.to_dict() for evaluation in evaluations],
+        'students': []
+    }
+
+    for enrollment in enrollments:
+        student_data = {
+            'student': enrollment.student.to_dict(),
+            'enrollment': {
+                'id': enrollment.id,
+                'final_grade': float(enrollment.final_grade) if enrollment.final_grade else None,
+                'final_status': enrollment.final_status,
+                'attendance_percentage': enrollment.attendance_percentage
+            },
+            'grades': {}
+        }
+
+        for evaluation in evaluations:
+            grade = grades.get((enrollment.id, evaluation.id))
+            student_data['grades'][evaluation.id] = {
+                'score': float(grade.score) if grade and grade.score else None,
+                'comments': grade.comments if grade else None,
+                'graded_at': grade.graded_at.isoformat() if grade and grade.graded_at else None
+            }
+
+        gradebook['students'].append(student_data)
+
+    return gradebook
@@ -0,0 +1,301 @@
+import os
+import re
+import socket
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, jsonify, request
+from sqlalchemy import and_, or_, select, update
+from src.models import db
+from src.models.job import Job, FINISHED_STATUSES
+from src.models.user import User
+from src.utils.decorators import get_current_user
+
+# Query argument that turns a report or export request into a background job
+ASYNC_ARGUMENT = 'async'
+ASYNC_VALUES = ('1', 'true', 'yes')
+
+_FILENAME = re.compile(r'filename="?([^";]+)"?')
+_RESULT_FILE = re.compile(r'^job-(\d+)-')
+
+
+def _wants_async():
+    return request.args.get(ASYNC_ARGUMENT, '').lower() in ASYNC_VALUES
+
+
+def enqueue_current_request():
+    """Store the current request as a job the workers will replay for the same user"""
+    arguments = [(key, value) for key, value in request.args.items(multi=True) if key != ASYNC_ARGUMENT]
+    job = Job(
+        user_id=get_current_user().id,
+        method=request.method,
+        path=request.path,
+        query_string=urlencode(arguments),
+        max_attempts=current_app.config['JOB_MAX_ATTEMPTS']
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def async_job(f):
+    """Decorator letting a report or export run in the background with ?async=1"""
+    # Goes below the auth and role decorators, so the caller is checked before anything is queued
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not _wants_async():
+            return f(*args, **kwargs)
+
+        job = enqueue_current_request()
+        response = jsonify({'message': 'Job queued', 'job': job.to_dict()})
+        response.headers['Location'] = f'/api/jobs/{job.id}'
+        return response, 202
+    return decorated_function
+
+
+def result_path(job_id, started_at):
+    """Result file of one claim of a job; a reclaimed or retried job writes a new one"""
+    return os.path.join(current_app.config['JOB_RESULT_DIR'], f"job-{job_id}-{started_at:%Y%m%d%H%M%S%f}.result")
+
+
+def remove_job_results(job_id):
+    """Delete every result file written for a job"""
+    directory = current_app.config['JOB_RESULT_DIR']
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        match = _RESULT_FILE.match(name)
+        if match and int(match.group(1)) == job_id:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def sweep_job_results():
+    """Delete results of jobs finished more than JOB_RESULT_RETENTION ago and files no claim owns
+
+    Unowned files (from reclaimed attempts, deleted jobs or crashed writers) are kept for
+    JOB_TIMEOUT, so a worker still writing one is left alone. Returns the files deleted.
+    """
+    directory = current_app.config['JOB_RESULT_DIR']
+    if not os.path.isdir(directory):
+        return 0
+
+    files = {}
+    for name in os.listdir(directory):
+        match = _RESULT_FILE.match(name)
+        if match:
+            files[name] = int(match.group(1))
+    if not files:
+        return 0
+
+    now = datetime.utcnow()
+    retained_after = now - timedelta(seconds=current_app.config['JOB_RESULT_RETENTION'])
+    orphaned_before = time.time() - current_app.config['JOB_TIMEOUT']
+    owners = {}
+    for job in db.session.query(Job.id, Job.status, Job.started_at, Job.finished_at).filter(
+            Job.id.in_(set(files.values())), Job.started_at.isnot(None)):
+        owners[os.path.basename(result_path(job.id, job.started_at))] = job
+
+    removed = 0
+    for name in files:
+        path = os.path.join(directory, name)
+        job = owners.get(name)
+        try:
+            if job is not None:
+                expired = job.status in FINISHED_STATUSES and job.finished_at and job.finished_at < retained_after
+            else:
+                expired = os.path.getmtime(path) < orphaned_before
+            if expired:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_next_job(worker):
+    """Atomically move the oldest runnable job to running and return it, or None"""
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=current_app.config['JOB_TIMEOUT'])
+    runnable = or_(
+        and_(Job.status == 'queued', Job.run_after <= now),
+        # A worker that died mid-job leaves it running; it is picked up again after JOB_TIMEOUT
+        and_(Job.status == 'running', Job.started_at < stale_before)
+    )
+
+    for _ in range(5):
+        candidate = db.session.execute(
+            select(Job.id, Job.status, Job.started_at).where(runnable).order_by(Job.run_after, Job.id).limit(1)
+        ).first()
+        if candidate is None:
+            return None
+
+        # Conditioned on the state just read, so two workers cannot claim the same job
+        claimed = db.session.execute(
+            update(Job).where(
+                Job.id == candidate.id,
+                Job.status == candidate.status,
+                Job.started_at.is_(None) if candidate.started_at is None else Job.started_at == candidate.started_at
+            ).values(
+                status='running', worker=worker, started_at=now, progress=0, attempts=Job.attempts + 1
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if claimed.rowcount == 1:
+            return db.session.get(Job, candidate.id)
+    return None
+
+
+def _claimed(claim):
+    """Condition matching a job only while claim, its (id, worker, started_at), still holds it"""
+    job_id, worker, started_at = claim
+    return and_(Job.id == job_id, Job.status == 'running', Job.worker == worker, Job.started_at == started_at)
+
+
+def _set_progress(app, claim, progress):
+    with app.app_context():
+        db.session.execute(
+            update(Job).where(_claimed(claim)).values(progress=progress).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+
+def _finish(app, claim, retryable=False, error=None, **values):
+    """Record the outcome of a claim; a claim lost to JOB_TIMEOUT or a retry records nothing"""
+    job_id = claim[0]
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        if (job.status, job.worker, job.started_at) != ('running',) + tuple(claim[1:]):
+            return None
+
+        now = datetime.utcnow()
+        if error and retryable and job.attempts < job.max_attempts:
+            # Exponential backoff between attempts
+            delay = app.config['JOB_RETRY_DELAY'] * 2 ** (job.attempts - 1)
+            values.update(status='queued', run_after=now + timedelta(seconds=delay))
+        else:
+            values.update(status='failed' if error else 'succeeded', progress=100, finished_at=now)
+        values['error'] = error
+
+        finished = db.session.execute(
+            update(Job).where(_claimed(claim)).values(**values).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return values['status'] if finished.rowcount == 1 else None
+
+
+def run_job(app, claim):
+    """Replay a claimed job's request in-process and store the response as its result
+
+    claim is the job's (id, worker, started_at) as claimed; returns the status recorded,
+    or None when the job was claimed again meanwhile and this run's outcome was dropped.
+    """
+    job_id, _, started_at = claim
+    # Called outside any application context so the replayed request gets a session of its own
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        user = db.session.get(User, job.user_id)
+        if user is None or not user.is_active:
+            return _finish(app, claim, error='Job owner is no longer active')
+
+        from src.utils.auth_tokens import create_access_token_for
+        token = create_access_token_for(user)
+        method, path, query_string = job.method, job.path, job.query_string
+        path_on_disk = result_path(job_id, started_at)
+
+    os.makedirs(os.path.dirname(path_on_disk), exist_ok=True)
+    partial = f'{path_on_disk}.partial'
+    try:
+        response = app.test_client().open(
+            path, method=method, query_string=query_string,
+            headers={'Authorization': f'Bearer {token}'}, buffered=False
+        )
+        _set_progress(app, claim, 50)
+
+        size = 0
+        try:
+            with open(partial, 'wb') as output:
+                for chunk in response.response:
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode('utf-8')
+                    output.write(chunk)
+                    size += len(chunk)
+        finally:
+            response.close()
+        os.replace(partial, path_on_disk)
+    except Exception as e:
+        if os.path.exists(partial):
+            os.remove(partial)
+        return _finish(app, claim, retryable=True, error=f'{type(e).__name__}: {e}')
+
+    disposition = _FILENAME.search(response.headers.get('Content-Disposition', ''))
+    values = {
+        'result_status': response.status_code,
+        'result_mimetype': response.mimetype,
+        'result_filename': disposition.group(1) if disposition else f'job-{job_id}.json',
+        'result_size': size
+    }
+    if response.status_code >= 400:
+        # Client errors repeat on every attempt; server errors may be transient
+        with open(path_on_disk, 'rb') as body:
+            error = body.read(1000).decode('utf-8', 'replace')
+        status = _finish(app, claim, retryable=response.status_code >= 500, error=error, **values)
+    else:
+        status = _finish(app, claim, **values)
+
+    if status in (None, 'queued'):
+        # A retry, or the claim that replaced this one, writes the job's result
+        os.remove(path_on_disk)
+    return status
+
+
+def run_worker(app, poll_interval=None, once=False):
+    """Claim and run jobs until stopped; with once=True, drain the queue and return"""
+    poll_interval = poll_interval or app.config['JOB_POLL_INTERVAL']
+    worker = worker_name()
+    processed = 0
+    swept_at = None
+    while True:
+        with app.app_context():
+            job = claim_next_job(worker)
+            claim = (job.id, job.worker, job.started_at) if job else None
+
+            # Old results are swept while the queue is idle
+            if claim is None and (swept_at is None or time.monotonic() - swept_at >= app.config['JOB_SWEEP_INTERVAL']):
+                sweep_job_results()
+                swept_at = time.monotonic()
+
+        if claim is None:
+            if once:
+                return processed
+            time.sleep(poll_interval)
+            continue
+
+        run_job(app, claim)
+        processed += 1
+
+
+def _worker_process(poll_interval):
+    # Spawned interpreters build their own app, engine and connections
+    from src.main import app
+    run_worker(app, poll_interval)
+
+
+def start_workers(count, poll_interval=None):
+    """Start count worker processes and return them"""
+    import multiprocessing
+
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    for _ in range(count):
+        process = context.Process(target=_worker_process, args=(poll_interval,), daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
@@ -0,0 +1,189 @@
+import base64
+import json
+import math
+from datetime import datetime, date
+from flask import request
+from sqlalchemy import func, tuple_, Date, DateTime, Join, Table
+from src.utils.table_counters import estimated_count
+
+# How list endpoints may obtain their total
+TOTAL_MODES = ('exact', 'estimate', 'none')
+
+# Largest page a client may ask for
+MAX_PER_PAGE = 100
+
+
+class PaginationError(ValueError):
+    """Raised for an unknown sort key, a malformed cursor or an out of range page size"""
+
+
+def encode_cursor(sort, values):
+    """Encode the ordering key of the last row of a page as an opaque cursor"""
+    payload = {
+        's': sort,
+        'v': [value.isoformat() if isinstance(value, (datetime, date)) else value for value in values]
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, sort, columns):
+    """Decode a cursor back into ordering key values for the given columns"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        values = payload['v']
+    except (ValueError, KeyError, TypeError):
+        raise PaginationError('Invalid cursor')
+
+    if payload.get('s') != sort or len(values) != len(columns):
+        raise PaginationError('Cursor does not match the requested sort')
+
+    decoded = []
+    for column, value in zip(columns, values):
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(column.type, Date):
+            value = date.fromisoformat(value)
+        decoded.append(value)
+    return decoded
+
+
+def _keyset_filter(columns, values, descending):
+    if len(columns) == 1:
+        return columns[0] < values[0] if descending else columns[0] > values[0]
+
+    key = tuple_(*columns)
+    return key < tuple_(*values) if descending else key > tuple_(*values)
+
+
+def _page_items(rows, serializer):
+    if serializer is None:
+        return [row[0] for row in rows]
+    return serializer.all(rows)
+
+
+def keyset_paginate(query, sort_keys, sort, cursor, per_page, serializer=None):
+    """Fetch the page that follows cursor in the order given by sort"""
+    descending = sort.startswith('-')
+    name = sort.lstrip('-')
+    if name not in sort_keys:
+        raise PaginationError(f"Invalid sort '{sort}'. Use one of: {', '.join(sorted(sort_keys))}")
+
+    # The last column of every sort key is unique, so the order is total
+    columns = sort_keys[name]
+    query = query.order_by(None).order_by(*[column.desc() if descending else column.asc() for column in columns])
+
+    if cursor:
+        query = query.filter(_keyset_filter(columns, decode_cursor(cursor, sort, columns), descending))
+
+    if serializer is not None:
+        query = serializer.apply(query)
+    width = serializer.width if serializer is not None else 1
+
+    # Key values travel with each row so the next cursor needs no extra lookups
+    rows = query.add_columns(*columns).limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    next_cursor = encode_cursor(sort, list(rows[-1][width:])) if has_more else None
+    return _page_items(rows, serializer), next_cursor
+
+
+def _primary_model(query):
+    return query.column_descriptions[0]['entity']
+
+
+def _joins_subquery(from_clause):
+    if isinstance(from_clause, Join):
+        return _joins_subquery(from_clause.left) or _joins_subquery(from_clause.right)
+    return not isinstance(from_clause, Table)
+
+
+def _is_filtered(query):
+    """Whether the query reads a subset of its table: a WHERE clause or a join to a subquery (search)"""
+    statement = query.statement
+    return statement.whereclause is not None or any(map(_joins_subquery, statement.get_final_froms()))
+
+
+def _total(query, include_total):
+    """Count a query for modes that do not get the total from the page statement"""
+    if include_total == 'exact':
+        return query.order_by(None).count(), False
+    if include_total == 'estimate':
+        return estimated_count(_primary_model(query)), True
+    return None, False
+
+
+def offset_paginate(query, order_by, page, per_page, include_total, serializer=None):
+    """Fetch one OFFSET page, counting with a window function when asked for an exact total"""
+    page = max(page, 1)
+    # Joins must go in before ORDER BY/OFFSET/LIMIT; totals keep counting the plain query
+    page_query = serializer.apply(query) if serializer is not None else query
+    page_query = page_query.order_by(*order_by).offset((page - 1) * per_page).limit(per_page)
+
+    if include_total != 'exact':
+        items = page_query.all() if serializer is None else serializer.all(page_query.all())
+        total, is_estimate = _total(query, include_total)
+        return items, total, is_estimate
+
+    rows = page_query.add_columns(func.count().over()).all()
+    if rows:
+        return _page_items(rows, serializer), rows[0][-1], False
+
+    # Past the last page there is no row to carry the window count
+    total = query.order_by(None).count() if page > 1 else 0
+    return [], total, False
+
+
+def paginate(query, sort_keys, default_sort='id', serializer=None):
+    """Paginate a list query from the request arguments.
+
+    Offset pagination (page/per_page) stays the default. Passing cursor= or
+    sort= switches to keyset pagination over the indexed columns declared in
+    sort_keys, which costs the same on every page. include_total selects how
+    the total is obtained: exact, estimate (maintained table counter, unfiltered
+    lists only) or none.
+    With a serializer the page is read as its columns and returned serialized.
+    """
+    per_page = request.args.get('per_page', 20, type=int)
+    if not 1 <= per_page <= MAX_PER_PAGE:
+        raise PaginationError(f'per_page must be between 1 and {MAX_PER_PAGE}')
+    
+    cursor = request.args.get('cursor')
+    sort = request.args.get('sort')
+    keyset = cursor is not None or sort is not None
+
+    include_total = request.args.get('include_total', 'none' if keyset else 'exact')
+    if include_total not in TOTAL_MODES:
+        raise PaginationError(f"Invalid include_total '{include_total}'. Use one of: {', '.join(TOTAL_MODES)}")
+    
+    # Table counters count every row, so filtered, searched or role-scoped lists are counted exactly
+    if include_total == 'estimate' and _is_filtered(query):
+        include_total = 'exact'
+
+    if not keyset:
+        page = request.args.get('page', 1, type=int)
+        items, total, is_estimate = offset_paginate(
+            query, sort_keys[default_sort], page, per_page, include_total, serializer
+        )
+        pagination = {
+            'total': total,
+            'pages': math.ceil(total / per_page) if total is not None else None,
+            'current_page': page,
+            'per_page': per_page
+        }
+    else:
+        sort = sort or default_sort
+        total, is_estimate = _total(query, include_total)
+        items, next_cursor = keyset_paginate(query, sort_keys, sort, cursor, per_page, serializer)
+        pagination = {
+            'next_cursor': next_cursor,
+            'sort': sort,
+            'per_page': per_page
+        }
+        if include_total != 'none':
+            pagination['total'] = total
+
+    if is_estimate:
+        pagination['total_is_estimate'] = True
+
+    return items, pagination
@@ -0,0 +1,132 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from flask import current_app, has_app_context, jsonify
+
+# Defaults used outside an application context (scripts, shells)
+DEFAULT_ROUNDS = 12
+
+# Seconds clients are asked to wait when hashing is saturated
+RETRY_AFTER_SECONDS = 2
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Raised when the hashing queue is full and the request should be retried later"""
+
+
+# Raised by hashing and verification when the pool cannot take the work or finish it in time
+PASSWORD_POOL_ERRORS = (PasswordPoolBusy, FutureTimeoutError)
+
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(password, password_hash):
+    return bcrypt.checkpw(password, password_hash)
+
+
+def configured_rounds():
+    """bcrypt cost factor new hashes are created with"""
+    if has_app_context():
+        return current_app.config['BCRYPT_ROUNDS']
+    return DEFAULT_ROUNDS
+
+
+def hash_rounds(password_hash):
+    """Cost factor recorded in a bcrypt hash ($2b$<rounds>$...)"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(password_hash):
+    return hash_rounds(password_hash) != configured_rounds()
+
+
+def _get_pool():
+    global _pool, _slots
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = current_app.config
+                executor = ProcessPoolExecutor if config['PASSWORD_HASH_EXECUTOR'] == 'process' else ThreadPoolExecutor
+                _slots = threading.BoundedSemaphore(config['PASSWORD_HASH_WORKERS'] + config['PASSWORD_HASH_QUEUE_SIZE'])
+                _pool = executor(max_workers=config['PASSWORD_HASH_WORKERS'])
+    return _pool
+
+
+def _run(function, *args):
+    """Run a bcrypt call on the pool, refusing work once the queue is full"""
+    if not has_app_context():
+        return function(*args)
+
+    pool = _get_pool()
+    if not _slots.acquire(blocking=False):
+        raise PasswordPoolBusy('Password hashing queue is full')
+
+    try:
+        future = pool.submit(function, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future.result(timeout=current_app.config['PASSWORD_HASH_TIMEOUT'])
+
+
+def hash_password(password, rounds=None):
+    """Hash a password with the configured (or given) bcrypt cost"""
+    rounds = rounds or configured_rounds()
+    return _run(_hashpw, password.encode('utf-8'), rounds).decode('utf-8')
+
+
+def hash_passwords(passwords, rounds=None):
+    """Hash many passwords in parallel on a pool of their own, leaving the login queue free"""
+    rounds = rounds or configured_rounds()
+    if has_app_context():
+        config = current_app.config
+        executor = ProcessPoolExecutor if config['PASSWORD_HASH_EXECUTOR'] == 'process' else ThreadPoolExecutor
+        workers = config['IMPORT_HASH_WORKERS']
+    else:
+        executor, workers = ThreadPoolExecutor, 1
+
+    encoded = [password.encode('utf-8') for password in passwords]
+    with executor(max_workers=workers) as pool:
+        return [hashed.decode('utf-8') for hashed in pool.map(_hashpw, encoded, [rounds] * len(encoded))]
+
+
+def verify_password(password, password_hash):
+    """Check a password against a bcrypt hash"""
+    return _run(_checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def register_password_pool_errors(app):
+    """Answer requests that hit a saturated hashing pool with 503 and Retry-After"""
+    def password_pool_saturated(error):
+        response = jsonify({'error': 'Password hashing is busy, please retry shortly'})
+        response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+        return response, 503
+
+    for error in PASSWORD_POOL_ERRORS:
+        app.register_error_handler(error, password_pool_saturated)
+
+
+def calibrate_rounds(target_ms, min_rounds=10, max_rounds=16):
+    """Highest cost whose hash time stays within target_ms on this machine"""
+    best = min_rounds
+    timings = {}
+    for rounds in range(min_rounds, max_rounds + 1):
+        started = time.perf_counter()
+        _hashpw(b'calibration-password', rounds)
+        elapsed = (time.perf_counter() - started) * 1000
+        timings[rounds] = elapsed
+        if elapsed > target_ms:
+            break
+        best = rounds
+    return best, timings
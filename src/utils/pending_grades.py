@@ -0,0 +1,77 @@
+from sqlalchemy import func, and_
+from src.models import db
+from src.models.class_group import ClassGroup
+from src.models.subject import Subject
+from src.models.course import Course
+from src.models.enrollment import Enrollment
+from src.models.evaluation import Evaluation
+from src.models.grade import Grade
+
+
+def pending_grades_query(teacher_id=None, class_group_ids=None, class_status=None, semester=None, year=None):
+    """Build the grouped anti-join counting missing grades per class group"""
+    # Evaluation x enrolled enrollment pairs without a grade row are pending
+    query = db.session.query(
+        Evaluation.class_group_id.label('class_group_id'),
+        ClassGroup.teacher_id.label('teacher_id'),
+        Course.institution_id.label('institution_id'),
+        func.count().label('pending')
+    ).join(
+        Enrollment, and_(
+            Enrollment.class_group_id == Evaluation.class_group_id,
+            Enrollment.status == 'enrolled'
+        )
+    ).join(
+        ClassGroup, ClassGroup.id == Evaluation.class_group_id
+    ).join(
+        Subject, Subject.id == ClassGroup.subject_id
+    ).join(
+        Course, Course.id == Subject.course_id
+    ).outerjoin(
+        Grade, and_(
+            Grade.enrollment_id == Enrollment.id,
+            Grade.evaluation_id == Evaluation.id
+        )
+    ).filter(
+        Grade.id.is_(None)
+    )
+
+    # Apply filters
+    if teacher_id:
+        query = query.filter(ClassGroup.teacher_id == teacher_id)
+
+    if class_group_ids is not None:
+        query = query.filter(ClassGroup.id.in_(class_group_ids))
+
+    if class_status:
+        query = query.filter(ClassGroup.status == class_status)
+
+    if semester:
+        query = query.filter(ClassGroup.semester == semester)
+
+    if year:
+        query = query.filter(ClassGroup.year == year)
+
+    return query.group_by(
+        Evaluation.class_group_id,
+        ClassGroup.teacher_id,
+        Course.institution_id
+    )
+
+
+def get_pending_grades(**filters):
+    """Count pending grades per class, teacher and institution in one statement"""
+    pending = {
+        'total': 0,
+        'by_class': {},
+        'by_teacher': {},
+        'by_institution': {}
+    }
+
+    for row in pending_grades_query(**filters).all():
+        pending['total'] += row.pending
+        pending['by_class'][row.class_group_id] = row.pending
+        pending['by_teacher'][row.teacher_id] = pending['by_teacher'].get(row.teacher_id, 0) + row.pending
+        pending['by_institution'][row.institution_id] = pending['by_institution'].get(row.institution_id, 0) + row.pending
+
+    return pending
@@ -0,0 +1,166 @@
+from sqlalchemy import select
+from src.models.student import Student
+from src.models.course import Course
+from src.models.subject import Subject
+from src.models.class_group import ClassGroup
+from src.models.enrollment import Enrollment
+from src.models.attendance import Attendance
+
+# Statements and summaries shared by the Flask report routes and the async read API
+
+
+def academic_performance_statement(principal, course_id=None, semester=None, year=None):
+    """Completed, graded enrollments visible to the caller"""
+    statement = select(
+        Enrollment.final_grade,
+        Enrollment.final_status,
+        Student.id.label('student_id'),
+        ClassGroup.semester,
+        ClassGroup.year,
+        Subject.name.label('subject_name'),
+        Course.name.label('course_name')
+    ).select_from(Enrollment).join(Student).join(ClassGroup).join(Subject).join(Course)
+
+    # Apply role-based filtering
+    if principal.role == 'teacher':
+        if principal.teacher_id:
+            statement = statement.where(ClassGroup.teacher_id == principal.teacher_id)
+
+    # Apply filters
+    if course_id:
+        statement = statement.where(Course.id == course_id)
+
+    if semester:
+        statement = statement.where(ClassGroup.semester == semester)
+
+    if year:
+        statement = statement.where(ClassGroup.year == year)
+
+    # Only completed enrollments with grades
+    return statement.where(
+        Enrollment.final_grade.isnot(None),
+        Enrollment.final_status.in_(['approved', 'failed'])
+    )
+
+
+def summarize_academic_performance(results):
+    """Grade and status statistics of academic_performance_statement rows"""
+    if not results:
+        return {
+            'total_enrollments': 0,
+            'average_grade': 0,
+            'highest_grade': 0,
+            'lowest_grade': 0,
+            'approval_rate': 0,
+            'grade_distribution': {},
+            'status_distribution': {}
+        }
+
+    grades = [float(r.final_grade) for r in results if r.final_grade]
+
+    performance_stats = {
+        'total_enrollments': len(results),
+        'average_grade': round(sum(grades) / len(grades), 2) if grades else 0,
+        'highest_grade': max(grades) if grades else 0,
+        'lowest_grade': min(grades) if grades else 0,
+        'approval_rate': 0,
+        'grade_distribution': {
+            '9.0-10.0': 0,
+            '8.0-8.9': 0,
+            '7.0-7.9': 0,
+            '6.0-6.9': 0,
+            '5.0-5.9': 0,
+            '0.0-4.9': 0
+        },
+        'status_distribution': {
+            'approved': 0,
+            'failed': 0
+        }
+    }
+
+    # Calculate approval rate
+    approved_count = len([r for r in results if r.final_status == 'approved'])
+    performance_stats['approval_rate'] = round((approved_count / len(results)) * 100, 2)
+
+    # Calculate grade distribution
+    for grade in grades:
+        if grade >= 9.0:
+            performance_stats['grade_distribution']['9.0-10.0'] += 1
+        elif grade >= 8.0:
+            performance_stats['grade_distribution']['8.0-8.9'] += 1
+        elif grade >= 7.0:
+            performance_stats['grade_distribution']['7.0-7.9'] += 1
+        elif grade >= 6.0:
+            performance_stats['grade_distribution']['6.0-6.9'] += 1
+        elif grade >= 5.0:
+            performance_stats['grade_distribution']['5.0-5.9'] += 1
+        else:
+            performance_stats['grade_distribution']['0.0-4.9'] += 1
+
+    # Calculate status distribution
+    for result in results:
+        performance_stats['status_distribution'][result.final_status] += 1
+
+    return performance_stats
+
+
+def attendance_statement(principal, class_id=None, student_id=None):
+    """Attendance records visible to the caller"""
+    statement = select(
+        Attendance.status,
+        Enrollment.id.label('enrollment_id'),
+        Student.id.label('student_id'),
+        ClassGroup.id.label('class_id'),
+        Subject.name.label('subject_name')
+    ).select_from(Attendance).join(Enrollment).join(Student).join(ClassGroup).join(Subject)
+
+    # Apply role-based filtering
+    if principal.role == 'teacher':
+        if principal.teacher_id:
+            statement = statement.where(ClassGroup.teacher_id == principal.teacher_id)
+    elif principal.role == 'student':
+        if principal.student_id:
+            statement = statement.where(Student.id == principal.student_id)
+
+    # Apply filters
+    if class_id:
+        statement = statement.where(ClassGroup.id == class_id)
+
+    if student_id and principal.role in ['admin', 'coordinator', 'teacher']:
+        statement = statement.where(Student.id == student_id)
+
+    return statement
+
+
+def summarize_attendance(results):
+    """Attendance statistics of attendance_statement rows"""
+    if not results:
+        return {
+            'total_records': 0,
+            'present_count': 0,
+            'absent_count': 0,
+            'justified_count': 0,
+            'attendance_rate': 0,
+            'absence_rate': 0,
+            'status_distribution': {}
+        }
+
+    total_records = len(results)
+    present_count = len([r for r in results if r.status in ['present', 'late']])
+    absent_count = len([r for r in results if r.status == 'absent'])
+    justified_count = len([r for r in results if r.status == 'justified'])
+
+    return {
+        'total_records': total_records,
+        'present_count': present_count,
+        'absent_count': absent_count,
+        'justified_count': justified_count,
+        'attendance_rate': round((present_count / total_records) * 100, 2) if total_records > 0 else 0,
+        'absence_rate': round((absent_count / total_records) * 100, 2) if total_records > 0 else 0,
+        'status_distribution': {
+            'present': len([r for r in results if r.status == 'present']),
+            'absent': absent_count,
+            'late': len([r for r in results if r.status == 'late']),
+            'justified': justified_count
+        }
+    }
@@ -0,0 +1,82 @@
+from collections import namedtuple
+from flask import g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from src.models import db
+from src.models.user import User
+from src.models.teacher import Teacher
+from src.models.student import Student
+
+# The caller as described by the access token claims
+Principal = namedtuple('Principal', ['id', 'role', 'teacher_id', 'student_id'])
+
+
+class RequestIdentity:
+    """The caller of the current request, with each profile resolved at most once"""
+
+    def __init__(self):
+        self.lookups = 0  # Database lookups performed
+        self.saved = 0    # Resolutions answered by the token claims or this cache
+        self._resolved = {}
+
+    def _resolve(self, key, loader):
+        if key in self._resolved:
+            self.saved += 1
+            return self._resolved[key]
+
+        value = loader()
+        self._resolved[key] = value
+        return value
+
+    def _load(self, model, pk):
+        if pk is None:
+            return None
+        self.lookups += 1
+        return db.session.get(model, pk)
+
+    @property
+    def principal(self):
+        """Id, role and profile ids straight from the access token"""
+        def load():
+            current_user_id = get_jwt_identity()
+            if not current_user_id:
+                return None
+            claims = get_jwt()
+            # Each claim read replaces a user lookup the handlers used to make
+            self.saved += 1
+            return Principal(
+                id=int(current_user_id),
+                role=claims.get('role'),
+                teacher_id=claims.get('teacher_id'),
+                student_id=claims.get('student_id')
+            )
+
+        return self._resolve('principal', load)
+
+    @property
+    def user(self):
+        return self._resolve('user', lambda: self._load(User, self.principal and self.principal.id))
+
+    @property
+    def teacher(self):
+        return self._resolve('teacher', lambda: self._load(Teacher, self.principal and self.principal.teacher_id))
+
+    @property
+    def student(self):
+        return self._resolve('student', lambda: self._load(Student, self.principal and self.principal.student_id))
+
+
+def current_identity():
+    """RequestIdentity of the current request, created on first use"""
+    if 'identity' not in g:
+        g.identity = RequestIdentity()
+    return g.identity
+
+
+def register_request_identity(app):
+    """Report per-request identity lookups in response headers when IDENTITY_LOOKUP_HEADERS is set"""
+    @app.after_request
+    def add_identity_headers(response):
+        if app.config['IDENTITY_LOOKUP_HEADERS'] and 'identity' in g:
+            response.headers['X-Identity-Lookups'] = str(g.identity.lookups)
+            response.headers['X-Identity-Lookups-Saved'] = str(g.identity.saved)
+        return response
@@ -0,0 +1,227 @@
+import re
+from flask import current_app, has_app_context
+from sqlalchemy import delete, event, insert, inspect, literal_column, select, text, Integer
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql import column, table
+from src.models import db
+from src.models.user import User
+from src.models.student import Student
+from src.models.teacher import Teacher
+from src.models.subject import Subject
+from src.models.course import Course
+from src.models.class_group import ClassGroup
+
+# Every entity type owns one residue of the index rowid: rowid = id * ENTITY_SLOTS + code
+ENTITY_SLOTS = 8
+ENTITY_CODES = {
+    'user': 1,
+    'student': 2,
+    'teacher': 3,
+    'subject': 4,
+    'course': 5,
+    'class_group': 6
+}
+
+# unicode61 with remove_diacritics folds "João" and "Joao" into the same token
+CREATE_SEARCH_INDEX = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "content, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+search_index = table('search_index', column('rowid', Integer), column('content'))
+_rowid = literal_column('search_index.rowid', Integer)
+_rank = literal_column('search_index.rank')
+
+
+def _document(*columns):
+    """Concatenate nullable text columns into one indexed document"""
+    content = db.func.coalesce(columns[0], '')
+    for col in columns[1:]:
+        content = content + ' ' + db.func.coalesce(col, '')
+    return content
+
+
+def _source(entity_type):
+    """Return the SELECT producing (id, content) for an entity type"""
+    if entity_type == 'user':
+        return select(User.id, _document(User.first_name, User.last_name, User.email, User.username))
+    if entity_type == 'student':
+        return select(
+            Student.id,
+            _document(User.first_name, User.last_name, User.email, Student.student_number)
+        ).join(User, Student.user_id == User.id)
+    if entity_type == 'teacher':
+        return select(
+            Teacher.id,
+            _document(User.first_name, User.last_name, User.email, Teacher.employee_number)
+        ).join(User, Teacher.user_id == User.id)
+    if entity_type == 'subject':
+        return select(Subject.id, _document(Subject.name, Subject.code, Subject.description))
+    if entity_type == 'course':
+        return select(Course.id, _document(Course.name, Course.code, Course.description))
+    if entity_type == 'class_group':
+        return select(
+            ClassGroup.id,
+            _document(ClassGroup.class_code, Subject.name, Subject.code)
+        ).join(Subject, ClassGroup.subject_id == Subject.id)
+    raise ValueError(f'Unknown search entity {entity_type}')
+
+
+# Model -> (indexed attributes, [(entity type, attribute linking it to the changed row)])
+SEARCH_DEPENDENCIES = {
+    User: (
+        ('first_name', 'last_name', 'email', 'username'),
+        [('user', 'id'), ('student', 'user_id'), ('teacher', 'user_id')]
+    ),
+    Student: (('student_number', 'user_id'), [('student', 'id')]),
+    Teacher: (('employee_number', 'user_id'), [('teacher', 'id')]),
+    Subject: (
+        ('name', 'code', 'description'),
+        [('subject', 'id'), ('class_group', 'subject_id')]
+    ),
+    Course: (('name', 'code', 'description'), [('course', 'id')]),
+    ClassGroup: (('class_code', 'subject_id'), [('class_group', 'id')])
+}
+
+_ENTITY_MODELS = {'user': User, 'student': Student, 'teacher': Teacher,
+                  'subject': Subject, 'course': Course, 'class_group': ClassGroup}
+
+
+def search_index_enabled():
+    """Whether the FTS5 index is available for the current app"""
+    return has_app_context() and current_app.extensions.get('search_index', False)
+
+
+def init_search_index(app):
+    """Create the FTS5 index when the database supports it, filling it on first use"""
+    app.extensions['search_index'] = False
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    with db.engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'search_index'")
+        ).first() is not None
+        try:
+            connection.execute(text(CREATE_SEARCH_INDEX))
+        except OperationalError:
+            # SQLite built without FTS5: searches fall back to LIKE filters
+            return
+
+    app.extensions['search_index'] = True
+    if not exists:
+        rebuild_search_index()
+
+
+def _reindex(connection, entity_type, ids):
+    """Replace the index documents of the given entities"""
+    if not ids:
+        return
+
+    code = ENTITY_CODES[entity_type]
+    model = _ENTITY_MODELS[entity_type]
+    rowids = [entity_id * ENTITY_SLOTS + code for entity_id in ids]
+    connection.execute(delete(search_index).where(_rowid.in_(rowids)))
+
+    source = _source(entity_type).where(model.id.in_(ids)).subquery()
+    connection.execute(
+        insert(search_index).from_select(
+            ['rowid', 'content'],
+            select(source.c[0] * ENTITY_SLOTS + code, source.c[1])
+        )
+    )
+
+
+def rebuild_search_index():
+    """Rebuild the whole search index from the source tables"""
+    connection = db.session.connection()
+    connection.execute(delete(search_index))
+
+    for entity_type, code in ENTITY_CODES.items():
+        source = _source(entity_type).subquery()
+        connection.execute(
+            insert(search_index).from_select(
+                ['rowid', 'content'],
+                select(source.c[0] * ENTITY_SLOTS + code, source.c[1])
+            )
+        )
+
+    indexed = connection.execute(select(db.func.count()).select_from(search_index)).scalar()
+    db.session.commit()
+    return indexed
+
+
+def _changed(instance, attributes):
+    state = inspect(instance)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _sync_search_index(session, flush_context):
+    if not search_index_enabled():
+        return
+
+    removed = {}
+    changed = {}
+    for instance in session.deleted:
+        dependency = SEARCH_DEPENDENCIES.get(type(instance))
+        if dependency:
+            entity_type = dependency[1][0][0]
+            removed.setdefault(entity_type, set()).add(instance.id)
+
+    for instance in list(session.new) + list(session.dirty):
+        dependency = SEARCH_DEPENDENCIES.get(type(instance))
+        if not dependency:
+            continue
+        attributes, targets = dependency
+        if instance not in session.new and not _changed(instance, attributes):
+            continue
+        for entity_type, link in targets:
+            changed.setdefault((entity_type, link), set()).add(instance.id)
+
+    if not removed and not changed:
+        return
+
+    connection = session.connection()
+    for entity_type, ids in removed.items():
+        code = ENTITY_CODES[entity_type]
+        connection.execute(
+            delete(search_index).where(_rowid.in_([entity_id * ENTITY_SLOTS + code for entity_id in ids]))
+        )
+
+    for (entity_type, link), ids in changed.items():
+        model = _ENTITY_MODELS[entity_type]
+        if link != 'id':
+            ids = connection.execute(select(model.id).where(getattr(model, link).in_(ids))).scalars().all()
+        _reindex(connection, entity_type, list(ids))
+
+
+def match_expression(term):
+    """Turn free text into an FTS5 query matching every word as a prefix"""
+    words = re.findall(r'\w+', term)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def apply_search(query, entity_type, id_column, term, fallback_columns):
+    """Filter a query by a search term, ranked by relevance when the index is available"""
+    expression = match_expression(term)
+    if not expression:
+        return query
+
+    if not search_index_enabled():
+        search_filter = f"%{term}%"
+        condition = fallback_columns[0].ilike(search_filter)
+        for col in fallback_columns[1:]:
+            condition = condition | col.ilike(search_filter)
+        return query.filter(condition)
+
+    code = ENTITY_CODES[entity_type]
+    matches = select(
+        (_rowid // ENTITY_SLOTS).label('entity_id'),
+        _rank.label('rank')
+    ).select_from(search_index).where(
+        text('search_index MATCH :search_match').bindparams(search_match=expression),
+        _rowid % ENTITY_SLOTS == code
+    ).subquery()
+
+    return query.join(matches, matches.c.entity_id == id_column).order_by(matches.c.rank)
@@ -0,0 +1,80 @@
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+# Relationships serialized (recursively) by each model's to_dict
+RENDERED_RELATIONSHIPS = {
+    'User': (),
+    'Institution': (),
+    'Course': ('institution',),
+    'Subject': ('course',),
+    'Teacher': ('user',),
+    'Student': ('user', 'course'),
+    'ClassGroup': ('subject', 'teacher'),
+    'Enrollment': ('student', 'class_group'),
+    'EvaluationType': (),
+    'Evaluation': ('class_group', 'evaluation_type'),
+    'Grade': ('enrollment', 'evaluation', 'grader'),
+    'Attendance': ('enrollment', 'recorder')
+}
+
+# Collections only read by to_dict to compute derived fields (counts, averages)
+READ_RELATIONSHIPS = {
+    'ClassGroup': ('enrollments',)
+}
+
+
+def _relationship(model, name):
+    """Return the relationship property called name on model"""
+    return inspect(model).relationships[name]
+
+
+def render_graph(model, prefix=None):
+    """Return the dotted relationship paths touched by model.to_dict()"""
+    paths = []
+    base = f'{prefix}.' if prefix else ''
+
+    for name in READ_RELATIONSHIPS.get(model.__name__, ()):
+        paths.append(base + name)
+
+    for name in RENDERED_RELATIONSHIPS.get(model.__name__, ()):
+        target = _relationship(model, name).mapper.class_
+        nested = render_graph(target, base + name)
+        # Leaf relationships are loaded on their own; others through their children
+        paths.extend(nested if nested else [base + name])
+
+    return paths
+
+
+def eager_options(model, paths):
+    """Translate dotted relationship paths into loader options"""
+    options = []
+
+    for path in paths:
+        current_model = model
+        option = None
+
+        for name in path.split('.'):
+            relationship = _relationship(current_model, name)
+            attribute = getattr(current_model, name)
+
+            # Collections are loaded with one IN query, scalars joined in place
+            if relationship.uselist:
+                option = option.selectinload(attribute) if option is not None else selectinload(attribute)
+            else:
+                option = option.joinedload(attribute) if option is not None else joinedload(attribute)
+
+            current_model = relationship.mapper.class_
+
+        options.append(option)
+
+    return options
+
+
+def with_graph(query, model, *paths):
+    """Eager load the relationship graph an endpoint renders.
+
+    Without explicit paths the full graph of model.to_dict() is loaded.
+    """
+    if not paths:
+        paths = render_graph(model)
+    return query.options(*eager_options(model, paths))
@@ -0,0 +1,274 @@
+import json
+import math
+import time
+from flask import current_app
+from sqlalchemy import Date, DateTime, Float, Numeric, cast, func, inspect, select
+from sqlalchemy.orm import aliased, configure_mappers
+from src.models import db
+from src.models.enrollment import Enrollment
+from src.models.evaluation import SCORE_HISTOGRAM_BUCKETS
+from src.utils.serialization import RENDERED_RELATIONSHIPS, with_graph
+
+# Responses built from serializer output hold only JSON-native values, so the C encoder
+# runs without the default hook, key sorting or the circular reference check
+_encoder = json.JSONEncoder(ensure_ascii=False, check_circular=False, separators=(',', ':'))
+
+
+def _percentage(score, max_score):
+    if score is not None and max_score:
+        return round(score / max_score * 100, 2)
+    return None
+
+
+def _attendance_percentage(total, present, late):
+    total = total or 0
+    return round(((present or 0) + (late or 0)) / total * 100, 2) if total > 0 else 0
+
+
+def _average(score_sum, score_count):
+    return round(score_sum / score_count, 2) if score_count else None
+
+
+def _std_dev(score_sum, score_sum_squares, score_count):
+    if not score_count:
+        return None
+    mean = score_sum / score_count
+    return round(math.sqrt(max(score_sum_squares / score_count - mean ** 2, 0)), 2)
+
+
+def _distribution(histogram):
+    return json.loads(histogram) if histogram else [0] * SCORE_HISTOGRAM_BUCKETS
+
+
+def _enrolled_students_count(class_group):
+    return select(func.count(Enrollment.id)).where(
+        Enrollment.class_group_id == class_group.id, Enrollment.status == 'enrolled'
+    ).correlate_except(Enrollment).scalar_subquery()
+
+
+HELPERS = {
+    '_percentage': _percentage,
+    '_attendance_percentage': _attendance_percentage,
+    '_average': _average,
+    '_std_dev': _std_dev,
+    '_distribution': _distribution
+}
+
+# Properties rendered by to_dict: the columns (dotted paths for related rows, or SQL
+# expressions of the entity) they read, and the Python expression computing them
+COMPUTED_FIELDS = {
+    'User': {
+        'full_name': (('first_name', 'last_name'), "{0} + ' ' + {1}")
+    },
+    'ClassGroup': {
+        'enrolled_students_count': ((_enrolled_students_count,), '{0}')
+    },
+    'Enrollment': {
+        'attendance_percentage': (
+            ('attendance_total', 'attendance_present', 'attendance_late'), '_attendance_percentage({0}, {1}, {2})'
+        )
+    },
+    'Evaluation': {
+        'grades_count': (('score_count',), '({0} or 0)'),
+        'average_score': (('score_sum', 'score_count'), '_average({0}, {1})'),
+        'score_std_dev': (('score_sum', 'score_sum_squares', 'score_count'), '_std_dev({0}, {1}, {2})'),
+        'score_distribution': (('score_histogram',), '_distribution({0})')
+    },
+    'Grade': {
+        'percentage_score': (('score', 'evaluation.max_score'), '_percentage({0}, {1})')
+    }
+}
+
+_registry = {}  # (model, fields) -> Serializer
+_field_names = {}  # model -> keys of to_dict, in order
+
+
+def model_fields(model):
+    """Keys rendered by model.to_dict(), in order"""
+    if model not in _field_names:
+        # A transient instance renders every key without touching the database
+        configure_mappers()
+        _field_names[model] = tuple(inspect(model).class_manager.new_instance().to_dict())
+    return _field_names[model]
+
+
+class Serializer:
+    """Generated serializer of one model and field set, reading rows of its columns"""
+
+    def __init__(self, model, fields, columns, joins, function, source):
+        self.model = model
+        self.fields = fields
+        self.columns = columns
+        self.joins = joins
+        self.function = function
+        self.source = source
+
+    @property
+    def width(self):
+        return len(self.columns)
+
+    def apply(self, query):
+        """Turn an ORM query of the model into a query of the serializer's columns"""
+        for alias, onclause in self.joins:
+            query = query.outerjoin(alias, onclause)
+        return query.with_entities(*self.columns)
+
+    def select(self):
+        """A statement reading the serializer's columns for every row of the model"""
+        statement = select(*self.columns).select_from(self.model)
+        for alias, onclause in self.joins:
+            statement = statement.outerjoin(alias, onclause)
+        return statement
+
+    def __call__(self, row):
+        return self.function(row)
+
+    def all(self, rows):
+        return list(map(self.function, rows))
+
+
+class _Compiler:
+    """Collects the columns and joins a serializer needs and writes its source"""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes = {(): model}
+        self.entities = {(): model}
+        self.columns = []
+        self.positions = {}
+        self.joins = []
+
+    def entity(self, path):
+        if path not in self.entities:
+            parent = self.entity(path[:-1])
+            target = inspect(self.classes[path[:-1]]).relationships[path[-1]].mapper.class_
+            alias = aliased(target)
+            self.joins.append((alias, getattr(parent, path[-1]).of_type(alias)))
+            self.classes[path] = target
+            self.entities[path] = alias
+        return self.entities[path]
+
+    def _position(self, key, expression):
+        if key not in self.positions:
+            self.positions[key] = len(self.columns)
+            self.columns.append(expression)
+        return f'r[{self.positions[key]}]'
+
+    def column(self, path, name):
+        *relationships, name = name.split('.')
+        path = path + tuple(relationships)
+        attribute = getattr(self.entity(path), name)
+        column_type = inspect(self.classes[path]).columns[name].type
+        # Numeric comes back as float straight from the database instead of through Decimal
+        if isinstance(column_type, Numeric) and not isinstance(column_type, Float):
+            attribute = cast(attribute, Float)
+        return self._position((path, name), attribute)
+
+    def field(self, path, name):
+        model = self.classes[path]
+        mapper = inspect(model)
+        if name in mapper.column_attrs:
+            value = self.column(path, name)
+            column_type = mapper.columns[name].type
+            if isinstance(column_type, (Date, DateTime)):
+                return f'(None if {value} is None else {value}.isoformat())'
+            if isinstance(column_type, Numeric):
+                return f'({value} or None)'  # to_dict renders zero as None too
+            return value
+
+        if name in RENDERED_RELATIONSHIPS.get(model.__name__, ()):
+            return self.nested(path + (name,))
+
+        computed = COMPUTED_FIELDS.get(model.__name__, {}).get(name)
+        if computed is None:
+            raise LookupError(f'No serializer rule for {model.__name__}.{name}')
+        dependencies, template = computed
+        values = [
+            self.column(path, dependency) if isinstance(dependency, str)
+            else self._position((path, f'#{name}'), dependency(self.entity(path)))
+            for dependency in dependencies
+        ]
+        return template.format(*values)
+
+    def mapping(self, path, fields):
+        items = ', '.join(f'{name!r}: {self.field(path, name)}' for name in fields)
+        return f'{{{items}}}'
+
+    def nested(self, path):
+        self.entity(path)
+        primary_key = inspect(self.classes[path]).primary_key[0].key
+        present = self.column(path, primary_key)
+        return f'(None if {present} is None else {self.mapping(path, model_fields(self.classes[path]))})'
+
+
+def serializer_for(model, fields=None):
+    """Serializer for model rendering fields (default: everything to_dict renders)"""
+    fields = tuple(fields) if fields else model_fields(model)
+    key = (model, fields)
+    if key not in _registry:
+        unknown = set(fields) - set(model_fields(model))
+        if unknown:
+            raise ValueError(f"Unknown {model.__name__} fields: {', '.join(sorted(unknown))}")
+
+        compiler = _Compiler(model)
+        source = f'def serialize(r):\n    return {compiler.mapping((), fields)}\n'
+        namespace = dict(HELPERS)
+        exec(compile(source, f'<serializer {model.__name__}>', 'exec'), namespace)
+        _registry[key] = Serializer(
+            model, fields, compiler.columns, compiler.joins, namespace['serialize'], source
+        )
+    return _registry[key]
+
+
+def dumps(payload):
+    """Encode serializer output as compact JSON"""
+    return _encoder.encode(payload)
+
+
+def json_response(payload):
+    """JSON response for payloads of serializer output, skipping Flask's generic encoder"""
+    return current_app.response_class(dumps(payload), mimetype='application/json')
+
+
+def _rate(count, elapsed):
+    return count / elapsed if elapsed > 0 else float('inf')
+
+
+def benchmark_serializer(model, rows=1000, repeat=5):
+    """Rows per second of to_dict versus the generated serializer on the first rows of model"""
+    serializer = serializer_for(model)
+    primary_key = inspect(model).primary_key[0]
+    best = {}
+
+    def measure(name, function):
+        start = time.perf_counter()
+        count = function()
+        elapsed = time.perf_counter() - start
+        best[name] = max(best.get(name, 0), _rate(count, elapsed))
+
+    for _ in range(repeat):
+        db.session.expunge_all()
+        objects = []
+
+        def orm_end_to_end():
+            objects[:] = with_graph(model.query.order_by(primary_key), model).limit(rows).all()
+            current_app.json.dumps([instance.to_dict() for instance in objects])
+            return len(objects)
+
+        def serializer_end_to_end():
+            result = db.session.execute(serializer.select().order_by(primary_key).limit(rows)).all()
+            dumps(serializer.all(result))
+            return len(result)
+
+        measure('to_dict', orm_end_to_end)
+        measure('serializer', serializer_end_to_end)
+
+        # Serialization alone, with the objects and rows already in memory
+        result = db.session.execute(serializer.select().order_by(primary_key).limit(rows)).all()
+        measure('to_dict_only', lambda: len([instance.to_dict() for instance in objects]))
+        measure('serializer_only', lambda: len(serializer.all(result)))
+
+    # Both paths must render the same documents
+    expected = [instance.to_dict() for instance in objects]
+    mismatches = sum(1 for a, b in zip(expected, serializer.all(result)) if a != b)
+    return {'rows': len(objects), 'rates': best, 'mismatches': mismatches}
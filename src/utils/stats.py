@@ -0,0 +1,58 @@
+from sqlalchemy import case, func
+from src.models import db
+
+
+def count_where(condition):
+    """COUNT of the rows matching condition (portable form of COUNT(*) FILTER (WHERE ...))"""
+    return func.count(case((condition, 1)))
+
+
+def avg_where(column, condition):
+    """AVG of column over the rows matching condition"""
+    return func.avg(case((condition, column)))
+
+
+def counts_by_value(column, values=None, condition=None):
+    """One count_where measure per value of a column, defaulting to its enum values"""
+    values = values if values is not None else column.type.enums
+    return {
+        value: count_where(column == value if condition is None else (column == value) & condition)
+        for value in values
+    }
+
+
+def _flatten(measures, prefix=()):
+    for name, measure in measures.items():
+        if isinstance(measure, dict):
+            yield from _flatten(measure, prefix + (name,))
+        else:
+            yield prefix + (name,), measure
+
+
+def summarize(select_from, measures, *filters):
+    """Evaluate a (possibly nested) dict of aggregate expressions in a single statement"""
+    flat = list(_flatten(measures))
+    query = db.session.query(
+        *[measure.label(f'm{index}') for index, (_, measure) in enumerate(flat)]
+    ).select_from(select_from)
+    if filters:
+        query = query.filter(*filters)
+    row = query.one()
+
+    result = {}
+    for (path, _), value in zip(flat, row):
+        target = result
+        for name in path[:-1]:
+            target = target.setdefault(name, {})
+        target[path[-1]] = value
+    return result
+
+
+def totals_by(query):
+    """Collect a (key, aggregate) grouped query into a dict"""
+    return {key: value for key, value in query.all() if key is not None}
+
+
+def rounded(value, digits=2):
+    """Round an aggregate that may be NULL (empty group) or Decimal"""
+    return round(float(value), digits) if value is not None else 0
@@ -0,0 +1,25 @@
+from sqlalchemy import func
+from src.models import db
+from src.models.table_counter import TableCounter, COUNTED_TABLES, counter_triggers_supported, recount_table
+
+
+def estimated_count(model):
+    """Return the trigger-maintained row count of a model's table, or an exact count without one"""
+    counter = db.session.get(TableCounter, model.__tablename__)
+    if counter is not None:
+        return counter.row_count
+
+    # Counters are seeded by migrations and `flask rebuild-table-counters`, never from a read
+    return db.session.query(func.count()).select_from(model).scalar()
+
+
+def rebuild_table_counters():
+    """Recount every counted table, seeding the counters that are missing"""
+    connection = db.session.connection()
+    if not counter_triggers_supported(connection.dialect.name):
+        return 0
+
+    for table_name in COUNTED_TABLES:
+        recount_table(connection, table_name)
+    db.session.commit()
+    return len(COUNTED_TABLES)
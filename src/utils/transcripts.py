@@ -0,0 +1,270 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from src.models.enrollment import Enrollment
+from src.models.class_group import ClassGroup
+from src.models.teacher import Teacher
+
+_pool = None
+_pool_lock = threading.Lock()
+_rendering = {}  # cache path -> Future of the render writing it
+_rendering_lock = threading.Lock()
+_resolved = OrderedDict()  # student id -> (change versions, cache path), least recently used first
+_resolved_lock = threading.Lock()
+
+
+def build_transcript(student):
+    """Transcript of a student grouped by term, with credit and GPA totals"""
+    enrollments = Enrollment.query.options(
+        joinedload(Enrollment.class_group).joinedload(ClassGroup.subject),
+        joinedload(Enrollment.class_group).joinedload(ClassGroup.teacher).joinedload(Teacher.user)
+    ).filter_by(student_id=student.id).all()
+
+    # Organize by semester/year
+    transcript_data = {
+        'student': student.to_dict(),
+        'course': student.course.to_dict() if student.course else None,
+        'semesters': {},
+        'summary': {
+            'total_credits_attempted': 0,
+            'total_credits_earned': 0,
+            'gpa': 0,
+            'total_subjects': len(enrollments),
+            'approved_subjects': 0,
+            'failed_subjects': 0
+        }
+    }
+
+    total_grade_points = 0
+    total_credits_for_gpa = 0
+
+    for enrollment in enrollments:
+        class_group = enrollment.class_group
+        subject = class_group.subject
+        semester_key = f"{class_group.year}.{class_group.semester}"
+
+        if semester_key not in transcript_data['semesters']:
+            transcript_data['semesters'][semester_key] = []
+
+        # Calculate grade points for GPA
+        if enrollment.final_grade and subject.credits:
+            total_grade_points += float(enrollment.final_grade) * subject.credits
+            total_credits_for_gpa += subject.credits
+
+        # Count credits
+        transcript_data['summary']['total_credits_attempted'] += subject.credits
+        if enrollment.final_status == 'approved':
+            transcript_data['summary']['total_credits_earned'] += subject.credits
+            transcript_data['summary']['approved_subjects'] += 1
+        elif enrollment.final_status == 'failed':
+            transcript_data['summary']['failed_subjects'] += 1
+
+        # Add to semester data
+        transcript_data['semesters'][semester_key].append({
+            'subject': subject.to_dict(),
+            'class_code': class_group.class_code,
+            'teacher': class_group.teacher.user.full_name if class_group.teacher else 'N/A',
+            'final_grade': float(enrollment.final_grade) if enrollment.final_grade else None,
+            'final_status': enrollment.final_status,
+            'credits': subject.credits
+        })
+
+    # Calculate GPA
+    if total_credits_for_gpa > 0:
+        transcript_data['summary']['gpa'] = round(total_grade_points / total_credits_for_gpa, 2)
+
+    return transcript_data
+
+
+def printable_transcript(transcript):
+    """The parts of a transcript that appear on the PDF; its hash is the cache version"""
+    student = transcript['student']
+    user = student.get('user') or {}
+    course = transcript['course'] or {}
+    return {
+        'student_id': student['id'],
+        'name': user.get('full_name'),
+        'student_number': student['student_number'],
+        'course': course.get('name'),
+        'semesters': [
+            {
+                'term': term,
+                'subjects': [
+                    {
+                        'code': entry['subject']['code'],
+                        'name': entry['subject']['name'],
+                        'class_code': entry['class_code'],
+                        'teacher': entry['teacher'],
+                        'credits': entry['credits'],
+                        'final_grade': entry['final_grade'],
+                        'final_status': entry['final_status']
+                    }
+                    for entry in sorted(entries, key=lambda entry: entry['subject']['code'])
+                ]
+            }
+            for term, entries in sorted(transcript['semesters'].items())
+        ],
+        'summary': transcript['summary']
+    }
+
+
+def transcript_version(printable):
+    """Content hash that changes only when something printed on the transcript changes"""
+    encoded = json.dumps(printable, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:20]
+
+
+def transcript_path(student_id, version):
+    return os.path.join(current_app.config['TRANSCRIPT_CACHE_DIR'], f'transcript-{student_id}-{version}.pdf')
+
+
+def render_transcript_pdf(printable, path):
+    """Render a transcript PDF to path; runs in a worker process"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    story = [
+        Paragraph('Academic Transcript', styles['Title']),
+        Paragraph(f"{escape(printable['name'] or '')} &mdash; {escape(printable['student_number'])}", styles['Heading3']),
+        Paragraph(escape(printable['course'] or ''), styles['Normal']),
+        Spacer(1, 6 * mm)
+    ]
+
+    for semester in printable['semesters']:
+        story.append(Paragraph(escape(semester['term']), styles['Heading4']))
+        rows = [['Code', 'Subject', 'Class', 'Teacher', 'Credits', 'Grade', 'Status']]
+        for subject in semester['subjects']:
+            rows.append([
+                subject['code'],
+                Paragraph(escape(subject['name']), styles['BodyText']),
+                subject['class_code'],
+                Paragraph(escape(subject['teacher']), styles['BodyText']),
+                subject['credits'],
+                f"{subject['final_grade']:.2f}" if subject['final_grade'] is not None else '-',
+                subject['final_status'] or ''
+            ])
+        table = Table(rows, colWidths=[18 * mm, 52 * mm, 20 * mm, 38 * mm, 15 * mm, 15 * mm, 22 * mm], repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
+        ]))
+        story += [table, Spacer(1, 4 * mm)]
+
+    summary = printable['summary']
+    story.append(Paragraph(
+        f"Credits earned: {summary['total_credits_earned']} of {summary['total_credits_attempted']} &nbsp; "
+        f"Subjects approved: {summary['approved_subjects']} of {summary['total_subjects']} &nbsp; "
+        f"GPA: {summary['gpa']}",
+        styles['Normal']
+    ))
+
+    # Written next to the target and moved into place so readers never see a partial file
+    partial = f'{path}.{os.getpid()}.partial'
+    SimpleDocTemplate(partial, pagesize=A4, title='Academic Transcript').build(story)
+    os.replace(partial, path)
+    return path
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=current_app.config['TRANSCRIPT_RENDER_WORKERS'])
+    return _pool
+
+
+def _discard_older_versions(student_id, keep):
+    directory = os.path.dirname(keep)
+    prefix = f'transcript-{student_id}-'
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith('.pdf') and os.path.join(directory, name) != keep:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def _remember_resolved(student_id, versions, path):
+    with _resolved_lock:
+        _resolved[student_id] = (versions, path)
+        _resolved.move_to_end(student_id)
+        while len(_resolved) > current_app.config['TRANSCRIPT_RESOLVED_CACHE_SIZE']:
+            _resolved.popitem(last=False)
+
+
+def request_transcript_pdf(student, versions=None):
+    """Return (path, ready); a missing PDF is queued on the render pool instead of built inline
+
+    versions, the change versions of what the transcript reads (scoped to the student's
+    classes), lets later requests at the same versions find the PDF without building it again.
+    """
+    if versions is not None:
+        versions = tuple(sorted(versions.items()))
+        with _resolved_lock:
+            resolved = _resolved.get(student.id)
+            if resolved is not None:
+                _resolved.move_to_end(student.id)
+        if resolved is not None and resolved[0] == versions and os.path.exists(resolved[1]):
+            return resolved[1], True
+
+    printable = printable_transcript(build_transcript(student))
+    path = transcript_path(student.id, transcript_version(printable))
+    if versions is not None:
+        _remember_resolved(student.id, versions, path)
+    if os.path.exists(path):
+        return path, True
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    submitted = None
+    with _rendering_lock:
+        future = _rendering.get(path)
+        if future is None or (future.done() and future.exception() is not None):
+            # A failed render is retried by the next request
+            submitted = _rendering[path] = _get_pool().submit(render_transcript_pdf, printable, path)
+
+    if submitted is not None:
+        def finished(done, path=path, student_id=student.id):
+            if done.exception() is None:
+                with _rendering_lock:
+                    if _rendering.get(path) is done:
+                        del _rendering[path]
+                _discard_older_versions(student_id, path)
+
+        # Attached outside the lock: an already finished future runs the callback right here
+        submitted.add_done_callback(finished)
+
+    return path, False
+
+
+def prerender_transcripts(students):
+    """Render every out-of-date transcript of the given students on the pool and wait for them"""
+    futures = []
+    for student in students:
+        path, ready = request_transcript_pdf(student)
+        if not ready:
+            with _rendering_lock:
+                future = _rendering.get(path)
+            if future is not None:
+                futures.append(future)
+
+    rendered = failed = 0
+    for future in futures:
+        try:
+            future.result()
+            rendered += 1
+        except Exception:
+            failed += 1
+    return rendered, failed
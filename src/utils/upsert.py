@@ -0,0 +1,13 @@
+from src.models import db
+
+
+def dialect_insert():
+    """INSERT construct with ON CONFLICT support for the bound database, or None"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
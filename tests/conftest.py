@@ -0,0 +1,183 @@
+import itertools
+import os
+import tempfile
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+
+# src.main creates the app on import, so the environment must point at a fresh database first
+_data_dir = tempfile.mkdtemp(prefix='sga-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_data_dir, 'app.db')}"
+os.environ['BCRYPT_ROUNDS'] = '4'
+os.environ['TRANSCRIPT_CACHE_DIR'] = os.path.join(_data_dir, 'transcripts')
+os.environ['JOB_RESULT_DIR'] = os.path.join(_data_dir, 'jobs')
+
+from src.main import app as flask_app  # noqa: E402
+from src.models import db  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def app_context(app):
+    with app.app_context():
+        yield
+
+
+def login(client, username, password):
+    response = client.post('/api/auth/login', json={'username': username, 'password': password})
+    assert response.status_code == 200, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+@pytest.fixture(scope='session')
+def admin_headers(app):
+    return login(app.test_client(), 'admin', 'admin123')
+
+
+@pytest.fixture(scope='session')
+def school(app, admin_headers):
+    """A teacher, a class of the first seeded subject, two enrolled students and an evaluation"""
+    client = app.test_client()
+
+    def post(path, payload):
+        response = client.post(path, json=payload, headers=admin_headers)
+        assert response.status_code in (200, 201), response.get_json()
+        return response.get_json()
+
+    # The seeded computer science course and its subjects
+    course_id = client.get('/api/courses', headers=admin_headers).get_json()['courses'][0]['id']
+    subject = client.get(f'/api/courses/{course_id}/subjects', headers=admin_headers).get_json()['subjects'][0]
+
+    teacher = post('/api/teachers', {
+        'username': 'prof.silva', 'email': 'silva@sga.com', 'password': 'teacher123',
+        'first_name': 'Ana', 'last_name': 'Silva', 'employee_number': 'T001', 'academic_degree': 'master'
+    })['teacher']
+
+    students = [
+        post('/api/students', {
+            'username': username, 'email': f'{username}@sga.com', 'password': 'student123',
+            'first_name': first_name, 'last_name': last_name, 'student_number': number, 'course_id': course_id
+        })['student']
+        for username, first_name, last_name, number in [
+            ('jose', 'José', 'Conceição', 'S001'),
+            ('maria', 'Maria', 'Souza', 'S002')
+        ]
+    ]
+
+    class_group = post('/api/classes', {
+        'subject_id': subject['id'], 'teacher_id': teacher['id'], 'semester': '1', 'year': 2026, 'class_code': 'T1'
+    })['class']
+
+    enrollments = [
+        post(f"/api/classes/{class_group['id']}/students", {'student_id': student['id']})['enrollment']
+        for student in students
+    ]
+
+    evaluation_type_id = client.get('/api/grades/evaluation-types', headers=admin_headers).get_json()['evaluation_types'][0]['id']
+    evaluation = post('/api/grades/evaluations', {
+        'class_group_id': class_group['id'], 'evaluation_type_id': evaluation_type_id,
+        'name': 'Prova 1', 'weight': 1, 'max_score': 10
+    })['evaluation']
+
+    return {
+        'course_id': course_id,
+        'subject': subject,
+        'teacher': teacher,
+        'students': students,
+        'class': class_group,
+        'enrollments': enrollments,
+        'evaluation': evaluation
+    }
+
+
+_class_codes = itertools.count(1)
+
+
+@pytest.fixture
+def graded_class(client, admin_headers, school):
+    """A fresh class of three enrolled students and two evaluations, partly graded
+
+    The first student has both grades, the second only the first evaluation's and the
+    third none.
+    """
+    code = f'G{next(_class_codes)}'
+
+    def post(path, payload):
+        response = client.post(path, headers=admin_headers, json=payload)
+        assert response.status_code in (200, 201), response.get_json()
+        return response.get_json()
+
+    class_group = post('/api/classes', {
+        'subject_id': school['subject']['id'], 'teacher_id': school['teacher']['id'], 'semester': '1',
+        'year': 2025, 'class_code': code
+    })['class']
+    students = [
+        post('/api/students', {
+            'username': f'{code}.{n}'.lower(), 'email': f'{code}.{n}@sga.com'.lower(), 'password': 'student123',
+            'first_name': 'Aluno', 'last_name': str(n), 'student_number': f'{code}-{n}', 'course_id': school['course_id']
+        })['student']
+        for n in range(3)
+    ]
+    enrollments = [
+        post(f"/api/classes/{class_group['id']}/students", {'student_id': student['id']})['enrollment']
+        for student in students
+    ]
+
+    evaluation_type_id = client.get('/api/grades/evaluation-types', headers=admin_headers).get_json()['evaluation_types'][0]['id']
+    evaluations = [
+        post('/api/grades/evaluations', {
+            'class_group_id': class_group['id'], 'evaluation_type_id': evaluation_type_id,
+            'name': name, 'weight': weight, 'max_score': 10
+        })['evaluation']
+        for name, weight in [('Prova 1', 1), ('Prova 2', 2)]
+    ]
+
+    grades = [
+        post('/api/grades', {'enrollment_id': enrollments[n]['id'], 'evaluation_id': evaluations[e]['id'], 'score': score})['grade']
+        for n, e, score in [(0, 0, 8), (0, 1, 6.5), (1, 0, 4)]
+    ]
+
+    return {
+        'class': class_group,
+        'students': students,
+        'enrollments': enrollments,
+        'evaluations': evaluations,
+        'grades': grades
+    }
+
+
+@pytest.fixture
+def evaluation(client, admin_headers, school):
+    """A fresh, ungraded evaluation of weight 2 and max score 10 in the school's class"""
+    evaluation_type_id = client.get('/api/grades/evaluation-types', headers=admin_headers).get_json()['evaluation_types'][0]['id']
+    response = client.post('/api/grades/evaluations', headers=admin_headers, json={
+        'class_group_id': school['class']['id'], 'evaluation_type_id': evaluation_type_id,
+        'name': 'Trabalho em lote', 'weight': 2, 'max_score': 10
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['evaluation']
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements run on the app's engine inside the block"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
@@ -0,0 +1,64 @@
+from datetime import date
+from sqlalchemy import update
+from src.models import db
+from src.models.attendance import Attendance, ATTENDANCE_COUNTERS
+from src.models.enrollment import Enrollment
+from src.utils.attendance_counters import rebuild_attendance_counters
+
+COUNTER_COLUMNS = ['attendance_total', *ATTENDANCE_COUNTERS.values()]
+
+
+def counters(enrollment_ids):
+    rows = db.session.query(Enrollment.id, *[getattr(Enrollment, column) for column in COUNTER_COLUMNS]).filter(
+        Enrollment.id.in_(enrollment_ids)
+    ).order_by(Enrollment.id)
+    return {row.id: tuple(row[1:]) for row in rows}
+
+
+def percentage_from_records(enrollment):
+    """The attendance percentage as computed from the history before the counters"""
+    records = Attendance.query.filter_by(enrollment_id=enrollment.id).all()
+    if not records:
+        return 0
+    present = len([record for record in records if record.status in ('present', 'late')])
+    return round(present / len(records) * 100, 2)
+
+
+def test_writes_keep_counters_equal_to_a_rebuild(graded_class, app_context):
+    first, second, _ = ids = [enrollment['id'] for enrollment in graded_class['enrollments']]
+    records = [
+        Attendance(enrollment_id=first, class_date=date(2025, 3, day), class_period=1, status=status)
+        for day, status in [(3, 'present'), (4, 'late'), (5, 'absent'), (6, 'justified')]
+    ]
+    db.session.add_all(records)
+    db.session.add(Attendance(enrollment_id=second, class_date=date(2025, 3, 3), class_period=1, status='absent'))
+    db.session.commit()
+
+    records[2].status = 'present'
+    records[3].enrollment_id = second
+    db.session.delete(records[1])
+    db.session.commit()
+
+    incremental = counters(ids)
+    # total, present, late, absent, justified
+    assert incremental[first] == (2, 2, 0, 0, 0)
+    assert incremental[second] == (2, 0, 0, 1, 1)
+    rebuild_attendance_counters(enrollment_ids=ids)
+    assert counters(ids) == incremental
+
+    db.session.expire_all()
+    for enrollment in Enrollment.query.filter(Enrollment.id.in_(ids)):
+        assert enrollment.attendance_percentage == percentage_from_records(enrollment)
+
+
+def test_rebuild_repairs_drifted_counters(graded_class, app_context):
+    enrollment_id = graded_class['enrollments'][2]['id']
+    db.session.add(Attendance(enrollment_id=enrollment_id, class_date=date(2025, 3, 10), class_period=2, status='late'))
+    db.session.commit()
+    db.session.execute(update(Enrollment).where(Enrollment.id == enrollment_id).values(
+        attendance_total=9, attendance_late=0
+    ))
+    db.session.commit()
+
+    assert rebuild_attendance_counters(enrollment_ids=[enrollment_id]) == 1
+    assert counters([enrollment_id])[enrollment_id] == (1, 0, 1, 0, 0)
@@ -0,0 +1,87 @@
+import pytest
+from flask_jwt_extended import decode_token
+from src.models import db
+from src.models.teacher import Teacher
+from tests.conftest import login
+
+
+@pytest.fixture
+def account(client, admin_headers, request):
+    username = f'token.{request.node.name}'[:80].replace('[', '.').replace(']', '')
+    response = client.post('/api/users', headers=admin_headers, json={
+        'username': username, 'email': f'{username}@sga.com', 'password': 'secret123',
+        'first_name': 'Token', 'last_name': 'Holder', 'role': 'teacher'
+    })
+    assert response.status_code == 201, response.get_json()
+    user = response.get_json()['user']
+    return user, login(client, username, 'secret123')
+
+
+def claims(headers):
+    return decode_token(headers['Authorization'].split()[1])
+
+
+def me(client, headers):
+    return client.get('/api/auth/me', headers=headers).status_code
+
+
+def test_claims_carry_role_and_profiles(client, school, app_context):
+    headers = login(client, 'prof.silva', 'teacher123')
+
+    token = claims(headers)
+    assert token['role'] == 'teacher'
+    assert token['teacher_id'] == school['teacher']['id']
+    assert token['student_id'] is None
+
+
+def test_password_change_revokes_tokens(client, account):
+    user, headers = account
+    response = client.post('/api/auth/change-password', headers=headers, json={
+        'current_password': 'secret123', 'new_password': 'secret456'
+    })
+    assert response.status_code == 200
+
+    assert me(client, headers) == 401
+    assert me(client, {'Authorization': f"Bearer {response.get_json()['access_token']}"}) == 200
+
+
+@pytest.mark.parametrize('change', [{'role': 'coordinator'}, {'is_active': False}])
+def test_role_or_status_change_revokes_tokens(client, admin_headers, account, change):
+    user, headers = account
+    assert me(client, headers) == 200
+
+    assert client.put(f"/api/users/{user['id']}", headers=admin_headers, json=change).status_code == 200
+
+    assert me(client, headers) == 401
+
+
+def test_profile_change_revokes_tokens(client, account, app_context):
+    user, headers = account
+    assert claims(headers)['teacher_id'] is None
+
+    teacher = Teacher(user_id=user['id'], employee_number='T-TOKEN', academic_degree='doctorate')
+    db.session.add(teacher)
+    db.session.commit()
+
+    assert me(client, headers) == 401
+    fresh = login(client, user['username'], 'secret123')
+    assert claims(fresh)['teacher_id'] == teacher.id
+
+    db.session.delete(teacher)
+    db.session.commit()
+
+    assert me(client, fresh) == 401
+    assert claims(login(client, user['username'], 'secret123'))['teacher_id'] is None
+
+
+def test_profile_edit_keeps_tokens(client, account, app_context):
+    user, headers = account
+    teacher = Teacher(user_id=user['id'], employee_number='T-KEEP', academic_degree='master')
+    db.session.add(teacher)
+    db.session.commit()
+    headers = login(client, user['username'], 'secret123')
+
+    teacher.department = 'Matemática'
+    db.session.commit()
+
+    assert me(client, headers) == 200
@@ -0,0 +1,127 @@
+import itertools
+import threading
+import pytest
+from src.models import db
+from src.models.enrollment import Enrollment
+from src.utils.bulk_enrollment import enroll_students
+
+_class_codes = itertools.count(1)
+
+
+@pytest.fixture
+def small_class(client, admin_headers, school):
+    """A class with two seats and three students not yet enrolled anywhere"""
+    code = f'B{next(_class_codes)}'
+
+    def post(path, payload):
+        response = client.post(path, headers=admin_headers, json=payload)
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()
+
+    class_group = post('/api/classes', {
+        'subject_id': school['subject']['id'], 'teacher_id': school['teacher']['id'], 'semester': '2',
+        'year': 2026, 'class_code': code, 'max_students': 2
+    })['class']
+    students = [
+        post('/api/students', {
+            'username': f'{code}.{n}'.lower(), 'email': f'{code}.{n}@sga.com'.lower(), 'password': 'student123',
+            'first_name': 'Bulk', 'last_name': str(n), 'student_number': f'{code}-{n}', 'course_id': school['course_id']
+        })['student']
+        for n in range(3)
+    ]
+    return class_group, [student['id'] for student in students]
+
+
+def enroll(client, headers, class_id, student_ids):
+    response = client.post(f'/api/classes/{class_id}/students/bulk', headers=headers, json={'student_ids': student_ids})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_results_per_pair(client, admin_headers, small_class):
+    class_group, (first, second, _) = small_class
+
+    data = enroll(client, admin_headers, class_group['id'], [first, second])
+
+    assert (data['enrolled'], data['failed']) == (2, 0)
+    assert [(result['student_id'], result['status']) for result in data['results']] == [
+        (first, 'enrolled'), (second, 'enrolled')
+    ]
+    assert all(result['enrollment_id'] for result in data['results'])
+
+
+def test_full_class(client, admin_headers, small_class):
+    class_group, student_ids = small_class
+
+    data = enroll(client, admin_headers, class_group['id'], student_ids)
+
+    assert [result['status'] for result in data['results']] == ['enrolled', 'enrolled', 'error']
+    assert data['results'][2]['error'] == 'Class is full'
+
+
+def test_duplicate_and_existing_pairs(client, admin_headers, small_class):
+    class_group, (first, second, _) = small_class
+    enroll(client, admin_headers, class_group['id'], [first])
+
+    data = enroll(client, admin_headers, class_group['id'], [first, second, second])
+
+    assert [result.get('error') for result in data['results']] == [
+        'Student is already enrolled in this class', None, 'Duplicate entry in request'
+    ]
+    assert data['enrolled'] == 1
+
+
+def test_unknown_ids(client, admin_headers, small_class):
+    class_group, (first, _, _) = small_class
+
+    data = client.post('/api/classes/enrollments/bulk', headers=admin_headers, json={
+        'class_ids': [class_group['id'], 999999], 'student_ids': [first, 888888]
+    }).get_json()
+
+    assert [(result['class_id'], result['student_id'], result.get('error')) for result in data['results']] == [
+        (class_group['id'], first, None),
+        (class_group['id'], 888888, 'Student not found'),
+        (999999, first, 'Class not found'),
+        (999999, 888888, 'Class not found')
+    ]
+
+
+def test_bulk_requests_validate_their_lists(client, admin_headers, small_class):
+    class_group, _ = small_class
+
+    assert client.post(f"/api/classes/{class_group['id']}/students/bulk", headers=admin_headers,
+                       json={'student_ids': []}).status_code == 400
+    assert client.post('/api/classes/999999/students/bulk', headers=admin_headers,
+                       json={'student_ids': [1]}).status_code == 404
+
+
+def test_concurrent_requests_cannot_oversubscribe(app, small_class):
+    class_group, (first, second, third) = small_class
+    class_id = class_group['id']
+    first_enrolled = threading.Event()
+    outcomes = {}
+
+    def first_request():
+        with app.app_context():
+            outcomes['first'] = enroll_students([(class_id, first), (class_id, second)])
+            first_enrolled.set()
+            # Keep the transaction open while the second request counts seats
+            threading.Event().wait(0.3)
+            db.session.commit()
+
+    def second_request():
+        with app.app_context():
+            first_enrolled.wait()
+            outcomes['second'] = enroll_students([(class_id, third)])
+            db.session.commit()
+
+    threads = [threading.Thread(target=first_request), threading.Thread(target=second_request)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [result['status'] for result in outcomes['first']] == ['enrolled', 'enrolled']
+    assert outcomes['second'][0].get('error') == 'Class is full'
+    with app.app_context():
+        assert Enrollment.query.filter_by(class_group_id=class_id).count() == 2
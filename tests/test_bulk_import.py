@@ -0,0 +1,82 @@
+import io
+from src.models import db
+from src.models.user import User
+from src.utils.bulk_import import _Importer, _check_utf8
+
+
+def student_row(school, suffix):
+    return {
+        'username': f'import.{suffix}', 'email': f'import.{suffix}@sga.com', 'password': 'student123',
+        'first_name': 'Import', 'last_name': suffix.title(), 'student_number': f'I-{suffix}',
+        'course_id': str(school['course_id'])
+    }
+
+
+def test_conflict_after_validation_names_the_field(school, app_context):
+    importer = _Importer('students')
+    values, errors = importer.validate(student_row(school, 'race'))
+    assert errors == []
+
+    # Another writer takes the email after the uniqueness sets were loaded
+    db.session.add(User(username='other.writer', email=values['email'], password='secret123',
+                        first_name='Other', last_name='Writer', role='coordinator'))
+    db.session.commit()
+
+    importer.insert([(2, values)])
+
+    assert importer.created == 0
+    assert importer.errors == [{'row': 2, 'errors': ['Email already exists']}]
+
+
+def test_other_integrity_errors_are_not_reported_as_duplicates(school, app_context):
+    importer = _Importer('students')
+    values, errors = importer.validate(student_row(school, 'broken'))
+    assert errors == []
+    values['last_name'] = None
+
+    importer.insert([(3, values)])
+
+    [error] = importer.errors
+    assert error['row'] == 3
+    assert 'already exists' not in error['errors'][0]
+    assert 'NOT NULL' in error['errors'][0]
+
+
+def upload(client, headers, content, filename='students.csv'):
+    return client.post('/api/students/import', headers=headers, content_type='multipart/form-data',
+                       data={'file': (io.BytesIO(content), filename)})
+
+
+def csv_file(school, *suffixes):
+    header = 'username,email,password,first_name,last_name,student_number,course_id\n'
+    return header + ''.join(
+        f"import.{suffix},import.{suffix}@sga.com,student123,João,{suffix.title()},I-dup,{school['course_id']}\n"
+        for suffix in suffixes
+    )
+
+
+def test_file_that_is_not_utf8_is_rejected_whole(client, admin_headers, school, app_context):
+    content = csv_file(school, 'latin', 'second').replace('I-dup', 'I-latin', 1).encode('latin-1')
+
+    response = upload(client, admin_headers, content)
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Row 2: file is not UTF-8')
+    assert User.query.filter_by(username='import.latin').first() is None
+
+
+def test_duplicate_number_in_file_uses_the_field_label(client, admin_headers, school):
+    response = upload(client, admin_headers, csv_file(school, 'first', 'repeat').encode('utf-8'))
+
+    data = response.get_json()
+    assert response.status_code == 200, data
+    assert data['created'] == 1
+    assert data['errors'] == [{'row': 3, 'errors': ['Student number already exists']}]
+
+
+def test_utf8_characters_split_across_reads(school):
+    stream = io.BytesIO(csv_file(school, 'split').encode('utf-8'))
+
+    _check_utf8(stream, chunk_size=3)
+
+    assert stream.tell() == 0
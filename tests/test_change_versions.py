@@ -0,0 +1,77 @@
+from datetime import date, datetime
+from src.models import db
+from src.models.attendance import Attendance
+from src.utils.attendance_counters import rebuild_attendance_counters
+from src.utils import change_versions
+from src.utils.change_versions import compute_etag, current_versions
+
+
+def roster_etag(client, headers, class_id):
+    response = client.get(f'/api/classes/{class_id}/students', headers=headers)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+
+def roster_status(client, headers, class_id, etag):
+    return client.get(f'/api/classes/{class_id}/students', headers={**headers, 'If-None-Match': etag}).status_code
+
+
+def enrollment_versions(class_id):
+    keys = [('enrollments', 0), ('enrollments', class_id)]
+    return current_versions(keys)
+
+
+def test_unchanged_roster_answers_304(client, admin_headers, school):
+    class_id = school['class']['id']
+    etag = roster_etag(client, admin_headers, class_id)
+
+    assert roster_status(client, admin_headers, class_id, etag) == 304
+
+
+def test_single_grade_write_changes_the_roster(client, admin_headers, school):
+    class_id = school['class']['id']
+    etag = roster_etag(client, admin_headers, class_id)
+
+    response = client.post('/api/grades', headers=admin_headers, json={
+        'enrollment_id': school['enrollments'][1]['id'], 'evaluation_id': school['evaluation']['id'], 'score': 6.5
+    })
+
+    assert response.status_code in (200, 201), response.get_json()
+    assert roster_status(client, admin_headers, class_id, etag) == 200
+
+
+def test_attendance_flush_bumps_enrollment_versions(client, admin_headers, school, app_context):
+    class_id = school['class']['id']
+    before = enrollment_versions(class_id)
+
+    db.session.add(Attendance(
+        enrollment_id=school['enrollments'][0]['id'], class_date=date(2026, 3, 2), class_period=1, status='present'
+    ))
+    db.session.commit()
+
+    after = enrollment_versions(class_id)
+    assert all(after[key] > before[key] for key in before)
+
+
+def test_counter_rebuild_bumps_enrollment_versions(school, app_context):
+    class_id = school['class']['id']
+    before = enrollment_versions(class_id)
+
+    rebuild_attendance_counters([enrollment['id'] for enrollment in school['enrollments']])
+
+    after = enrollment_versions(class_id)
+    assert all(after[key] > before[key] for key in before)
+
+
+def test_daily_etag_rolls_over_at_utc_midnight(monkeypatch):
+    def etag_at(now):
+        class Clock(datetime):
+            @classmethod
+            def utcnow(cls):
+                return now
+
+        monkeypatch.setattr(change_versions, 'datetime', Clock)
+        return compute_etag('/api/reports/dashboard', None, {}, daily=True)
+
+    assert etag_at(datetime(2026, 3, 2, 0, 5)) == etag_at(datetime(2026, 3, 2, 23, 55))
+    assert etag_at(datetime(2026, 3, 2, 23, 55)) != etag_at(datetime(2026, 3, 3, 0, 5))
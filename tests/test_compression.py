@@ -0,0 +1,100 @@
+import gzip
+import brotli
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from src.utils.compression import AsgiCompressionMiddleware, negotiate_encoding
+
+LIST_PATH = '/api/subjects?per_page=100'
+
+DECOMPRESS = {'br': brotli.decompress, 'gzip': gzip.decompress}
+
+
+@pytest.mark.parametrize('accept, expected', [
+    ('br, gzip', 'br'),
+    ('gzip, br;q=0.5', 'gzip'),
+    ('gzip;q=0, br;q=0', None),
+    ('*', 'br'),
+    ('identity', None),
+    ('', None)
+])
+def test_negotiate_encoding(accept, expected):
+    assert negotiate_encoding(accept, ('br', 'gzip')) == expected
+
+
+@pytest.mark.parametrize('encoding', ['br', 'gzip'])
+def test_list_compressed_per_accept_encoding(client, admin_headers, school, encoding):
+    plain = client.get(LIST_PATH, headers=admin_headers)
+    response = client.get(LIST_PATH, headers={**admin_headers, 'Accept-Encoding': encoding})
+
+    assert response.headers['Content-Encoding'] == encoding
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert DECOMPRESS[encoding](response.data) == plain.data
+    assert int(response.headers['Content-Length']) == len(response.data) < len(plain.data)
+
+
+def test_identity_when_nothing_acceptable(client, admin_headers, school):
+    response = client.get(LIST_PATH, headers={**admin_headers, 'Accept-Encoding': 'br;q=0, gzip;q=0'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['subjects']
+
+
+def test_encoded_etag_revalidates(client, admin_headers, school):
+    path = f"/api/classes/{school['class']['id']}/students"
+    headers = {**admin_headers, 'Accept-Encoding': 'gzip'}
+    response = client.get(path, headers=headers)
+    etag = response.headers['ETag']
+
+    revalidated = client.get(path, headers={**headers, 'If-None-Match': etag})
+
+    if response.headers.get('Content-Encoding') == 'gzip':
+        assert etag.endswith('-gzip"')
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == etag
+
+
+def _asgi_app(size):
+    async def payload(request):
+        return JSONResponse({'items': ['row'] * size}, headers={'ETag': '"v1"'})
+
+    config = {
+        'COMPRESSION_MIN_SIZE': 1024,
+        'COMPRESSION_ROUTE_CLASSES': [('/api', 'api')],
+        'COMPRESSION_QUALITY': {'api': {'br': 4, 'gzip': 6}, 'default': {'br': 6, 'gzip': 6}}
+    }
+    return AsgiCompressionMiddleware(Starlette(routes=[Route('/api/payload', payload)]), config)
+
+
+@pytest.mark.parametrize('encoding', ['br', 'gzip'])
+def test_asgi_compression(encoding):
+    with TestClient(_asgi_app(1000)) as client:
+        response = client.get('/api/payload', headers={'Accept-Encoding': encoding})
+
+    assert response.headers['content-encoding'] == encoding
+    assert response.headers['etag'] == f'"v1-{encoding}"'
+    assert response.json() == {'items': ['row'] * 1000}
+
+
+def test_asgi_small_bodies_sent_as_is():
+    with TestClient(_asgi_app(1)) as client:
+        response = client.get('/api/payload', headers={'Accept-Encoding': 'br'})
+
+    assert 'content-encoding' not in response.headers
+    assert response.headers['vary'] == 'Accept-Encoding'
+
+
+def test_read_api_revalidates_encoded_etag(admin_headers, school):
+    from src.asgi import app as asgi_app
+
+    with TestClient(asgi_app) as client:
+        headers = {**admin_headers, 'Accept-Encoding': 'gzip'}
+        response = client.get('/api/reports/dashboard', headers=headers)
+        revalidated = client.get('/api/reports/dashboard', headers={**headers, 'If-None-Match': response.headers['etag']})
+
+    assert response.status_code == 200
+    assert 'accept-encoding' in response.headers['vary'].lower()
+    assert revalidated.status_code == 304
+    assert revalidated.headers['etag'] == response.headers['etag']
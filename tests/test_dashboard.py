@@ -0,0 +1,64 @@
+import pytest
+from src.utils.dashboard import SNAPSHOT_BUILDERS, get_dashboard_snapshot, rebuild_dashboard_snapshots
+
+
+def snapshot_values(scope, owner_id):
+    snapshot = get_dashboard_snapshot(scope, owner_id)
+    return {name: getattr(snapshot, name) for name in SNAPSHOT_BUILDERS[scope](owner_id)}
+
+
+def recounted_values(scope, owner_id):
+    return SNAPSHOT_BUILDERS[scope](owner_id)
+
+
+@pytest.fixture
+def scopes(graded_class, school):
+    return [('global', 0), ('teacher', school['teacher']['id']), ('student', graded_class['students'][0]['id'])]
+
+
+def test_writes_keep_snapshots_equal_to_a_recount(client, admin_headers, graded_class, school, scopes, app):
+    with app.app_context():
+        for scope, owner_id in scopes:
+            assert snapshot_values(scope, owner_id) == recounted_values(scope, owner_id)
+
+    class_id = graded_class['class']['id']
+    writes = [
+        client.put(f'/api/classes/{class_id}', headers=admin_headers, json={'status': 'active'}),
+        client.post('/api/grades', headers=admin_headers, json={
+            'enrollment_id': graded_class['enrollments'][2]['id'],
+            'evaluation_id': graded_class['evaluations'][0]['id'], 'score': 6
+        }),
+        client.delete(f"/api/classes/{class_id}/students/{graded_class['students'][0]['id']}", headers=admin_headers),
+        client.post('/api/students', headers=admin_headers, json={
+            'username': f"late.{class_id}", 'email': f'late.{class_id}@sga.com', 'password': 'student123',
+            'first_name': 'Late', 'last_name': 'Joiner', 'student_number': f'L-{class_id}', 'course_id': school['course_id']
+        })
+    ]
+    assert [response.status_code for response in writes] == [200, 201, 200, 201]
+
+    with app.app_context():
+        for scope, owner_id in scopes:
+            assert snapshot_values(scope, owner_id) == recounted_values(scope, owner_id), scope
+
+
+def test_rebuild_matches_the_incremental_rows(client, admin_headers, graded_class, scopes, app):
+    class_id = graded_class['class']['id']
+    response = client.put(f'/api/classes/{class_id}', headers=admin_headers, json={'status': 'cancelled'})
+    assert response.status_code == 200, response.get_json()
+
+    with app.app_context():
+        incremental = {key: snapshot_values(*key) for key in scopes}
+        assert rebuild_dashboard_snapshots() >= len(scopes)
+        assert {key: snapshot_values(*key) for key in scopes} == incremental
+
+
+def test_admin_dashboard_reads_the_global_snapshot(client, admin_headers, graded_class, app):
+    response = client.get('/api/reports/dashboard', headers=admin_headers)
+
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()
+    with app.app_context():
+        expected = recounted_values('global', 0)
+    for name in ['total_students', 'total_teachers', 'total_courses', 'total_subjects', 'active_classes',
+                 'recent_enrollments', 'pending_grades']:
+        assert data[name] == expected[name], name
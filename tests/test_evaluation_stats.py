@@ -0,0 +1,65 @@
+import json
+from sqlalchemy import update
+from src.models import db
+from src.models.evaluation import Evaluation
+from src.utils.evaluation_stats import apply_score_changes, rebuild_evaluation_stats
+
+STAT_FIELDS = ['grades_count', 'average_score', 'score_std_dev', 'score_distribution']
+
+
+def statistics(evaluation_id):
+    db.session.expire_all()
+    rendered = db.session.get(Evaluation, evaluation_id).to_dict()
+    return {field: rendered[field] for field in STAT_FIELDS}
+
+
+def grade(client, headers, enrollment, evaluation, score):
+    response = client.post('/api/grades', headers=headers, json={
+        'enrollment_id': enrollment['id'], 'evaluation_id': evaluation['id'], 'score': score
+    })
+    assert response.status_code in (200, 201), response.get_json()
+    return response.get_json()['grade']
+
+
+def test_grade_writes_match_a_rebuild(client, admin_headers, school, evaluation, app_context):
+    first, second = school['enrollments']
+    grade(client, admin_headers, first, evaluation, 4)
+    written = grade(client, admin_headers, second, evaluation, 9.5)
+    grade(client, admin_headers, first, evaluation, 7)
+    assert client.put(f"/api/grades/{written['id']}", headers=admin_headers, json={'score': 10}).status_code == 200
+
+    maintained = statistics(evaluation['id'])
+    assert maintained['grades_count'] == 2
+    assert maintained['average_score'] == 8.5
+    assert maintained['score_distribution'][7] == maintained['score_distribution'][9] == 1
+
+    rebuild_evaluation_stats([evaluation['id']])
+    assert statistics(evaluation['id']) == maintained
+
+
+def test_deleted_grade_leaves_the_statistics(client, admin_headers, school, evaluation, app_context):
+    written = grade(client, admin_headers, school['enrollments'][0], evaluation, 6)
+
+    assert client.delete(f"/api/grades/{written['id']}", headers=admin_headers).status_code == 200
+
+    assert statistics(evaluation['id']) == {
+        'grades_count': 0, 'average_score': None, 'score_std_dev': None, 'score_distribution': [0] * 10
+    }
+
+
+def test_histogram_keeps_a_concurrent_write(school, evaluation, app_context):
+    stale = db.session.get(Evaluation, evaluation['id'])
+    assert stale.score_distribution == [0] * 10
+
+    # Another writer commits a score of 10 after this evaluation was loaded
+    histogram = [0] * 9 + [1]
+    db.session.execute(update(Evaluation).where(Evaluation.id == stale.id).values(
+        score_count=1, score_sum=10, score_sum_squares=100, score_histogram=json.dumps(histogram)
+    ).execution_options(synchronize_session=False))
+
+    apply_score_changes(stale, [(None, 5)])
+    db.session.commit()
+
+    stored = statistics(evaluation['id'])
+    assert stored['grades_count'] == 2
+    assert stored['score_distribution'] == [0] * 5 + [1] + [0] * 3 + [1]
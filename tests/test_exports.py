@@ -0,0 +1,31 @@
+import csv
+import io
+from decimal import Decimal
+import pytest
+from openpyxl import load_workbook
+from src.utils.exports import stream_csv, stream_xlsx
+
+COLUMNS = ['student_number', 'first_name', 'final_grade']
+
+
+@pytest.mark.parametrize('text', ['=HYPERLINK("http://x","y")', '+1', '-2+3', '@SUM(A1)', '\t=1'])
+def test_csv_quotes_formula_text(text):
+    body = b''.join(stream_csv(COLUMNS, [['S001', text, Decimal('-1.5')]])).decode('utf-8-sig')
+
+    header, row = list(csv.reader(io.StringIO(body)))
+    assert row == ['S001', f"'{text}", '-1.5']
+
+
+def test_csv_leaves_plain_text():
+    body = b''.join(stream_csv(COLUMNS, [['S001', 'José', None]])).decode('utf-8-sig')
+
+    assert list(csv.reader(io.StringIO(body)))[1] == ['S001', 'José', '']
+
+
+def test_xlsx_writes_formula_text_as_string():
+    body = b''.join(stream_xlsx(COLUMNS, [['S001', '=1+1', Decimal('7.5')]]))
+
+    sheet = load_workbook(io.BytesIO(body)).active
+    name, grade = sheet['B2'], sheet['C2']
+    assert (name.value, name.data_type) == ('=1+1', 's')
+    assert grade.value == 7.5
@@ -0,0 +1,56 @@
+from decimal import Decimal
+from sqlalchemy import update
+from src.models import db
+from src.models.enrollment import Enrollment
+from src.utils.final_grades import verify_final_grades
+
+
+def final_grades(enrollments):
+    rows = Enrollment.query.filter(Enrollment.id.in_([enrollment['id'] for enrollment in enrollments])).order_by(Enrollment.id)
+    return [float(row.final_grade) if row.final_grade is not None else None for row in rows]
+
+
+def enrollment_ids(graded_class):
+    return [enrollment['id'] for enrollment in graded_class['enrollments']]
+
+
+def test_grade_creation_moves_final_grades(graded_class, app_context):
+    # (8 x 1 + 6.5 x 2) / 3 and 4 x 1 / 1
+    assert final_grades(graded_class['enrollments']) == [7.0, 4.0, None]
+    assert verify_final_grades(enrollment_ids=enrollment_ids(graded_class)) == []
+
+
+def test_updates_and_deletes_apply_their_deltas(client, admin_headers, graded_class, app):
+    first, _, second = graded_class['grades']
+    enrollments, evaluations = graded_class['enrollments'], graded_class['evaluations']
+
+    response = client.put(f"/api/grades/{first['id']}", headers=admin_headers, json={'score': 9.5})
+    assert response.status_code == 200, response.get_json()
+    response = client.delete(f"/api/grades/{second['id']}", headers=admin_headers)
+    assert response.status_code == 200, response.get_json()
+    response = client.post('/api/grades/batch', headers=admin_headers, json={'grades': [
+        {'enrollment_id': enrollments[2]['id'], 'evaluation_id': evaluations[1]['id'], 'score': 5},
+        {'enrollment_id': enrollments[0]['id'], 'evaluation_id': evaluations[1]['id'], 'score': 10}
+    ]})
+    assert response.status_code == 200, response.get_json()
+
+    with app.app_context():
+        # (9.5 x 1 + 10 x 2) / 3 rounds half up
+        assert final_grades(enrollments) == [9.83, None, 5.0]
+        assert verify_final_grades(enrollment_ids=enrollment_ids(graded_class)) == []
+
+
+def test_verify_reports_and_fixes_drift(graded_class, app_context):
+    drifted = graded_class['enrollments'][0]['id']
+    db.session.execute(update(Enrollment).where(Enrollment.id == drifted).values(
+        grade_weighted_sum=Decimal(1), final_grade=Decimal('0.33')
+    ))
+    db.session.commit()
+
+    drift = verify_final_grades(fix=True, enrollment_ids=enrollment_ids(graded_class))
+
+    assert [item['enrollment_id'] for item in drift] == [drifted]
+    assert drift[0]['expected'] == {'weighted_sum': 21.0, 'total_weight': 3.0, 'final_grade': 7.0}
+    assert verify_final_grades(enrollment_ids=enrollment_ids(graded_class)) == []
+    db.session.expire_all()
+    assert final_grades(graded_class['enrollments'])[0] == 7.0
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import func
+from src.models import db
+from src.models.enrollment import Enrollment
+from src.models.evaluation import Evaluation
+from src.models.grade import Grade
+from src.models.table_counter import TableCounter
+from src.utils import grade_batch
+from src.utils.evaluation_stats import apply_score_change
+from src.utils.final_grades import apply_grade_change, verify_final_grades
+from src.utils.pagination import estimated_count
+
+
+def post_batch(client, headers, grades):
+    return client.post('/api/grades/batch', headers=headers, json={'grades': grades})
+
+
+def batch(school, evaluation, *scores):
+    return [
+        {'enrollment_id': enrollment['id'], 'evaluation_id': evaluation['id'], 'score': score}
+        for enrollment, score in zip(school['enrollments'], scores)
+    ]
+
+
+def scores(evaluation_id):
+    return sorted(score for (score,) in db.session.query(Grade.score).filter_by(evaluation_id=evaluation_id))
+
+
+def test_batch_creates_then_updates(client, admin_headers, school, evaluation, app_context):
+    created = post_batch(client, admin_headers, batch(school, evaluation, 8, 5.5))
+    assert created.status_code == 200, created.get_json()
+    assert (created.get_json()['created'], created.get_json()['updated']) == (2, 0)
+
+    updated = post_batch(client, admin_headers, batch(school, evaluation, 9, 7))
+    assert updated.status_code == 200, updated.get_json()
+    assert (updated.get_json()['created'], updated.get_json()['updated']) == (0, 2)
+
+    db.session.expire_all()
+    assert scores(evaluation['id']) == [7, 9]
+
+
+def test_batch_keeps_derived_totals_in_step(client, admin_headers, school, evaluation, app_context):
+    assert post_batch(client, admin_headers, batch(school, evaluation, 6, 10)).status_code == 200
+    assert post_batch(client, admin_headers, batch(school, evaluation, 4, None)).status_code == 200
+
+    # Final grades were moved incrementally; a full recompute must agree with them
+    assert verify_final_grades() == []
+    stored = db.session.get(Evaluation, evaluation['id'])
+    assert stored.grades_count == 1
+    assert stored.average_score == 4
+
+
+def test_pair_inserted_after_the_prefetch_is_updated(client, admin_headers, school, evaluation, app_context, monkeypatch):
+    enrollment_id = school['enrollments'][0]['id']
+    estimated_count(Grade)
+
+    # Another writer's grade, committed after the batch looked for existing rows
+    prefetch = grade_batch._locked_grades
+    calls = []
+
+    def late_prefetch(pairs):
+        calls.append(pairs)
+        if len(calls) == 1:
+            stored = db.session.get(Evaluation, evaluation['id'])
+            db.session.add(Grade(enrollment_id=enrollment_id, evaluation_id=stored.id, score=3))
+            apply_grade_change(db.session.get(Enrollment, enrollment_id), stored.weight, None, 3)
+            apply_score_change(stored, None, 3)
+            db.session.flush()
+            return {}
+        return prefetch(pairs)
+
+    monkeypatch.setattr(grade_batch, '_locked_grades', late_prefetch)
+
+    created, updated, errors = grade_batch.upsert_grades(batch(school, evaluation, 8)[:1])
+    db.session.commit()
+
+    assert (created, updated, errors) == (0, 1, [])
+    assert len(calls) == 2
+    assert scores(evaluation['id']) == [8]
+    assert verify_final_grades() == []
+    stored = db.session.get(Evaluation, evaluation['id'])
+    assert (stored.grades_count, stored.average_score) == (1, 8)
+    assert stored.score_distribution.count(1) == 1
+    counter = db.session.get(TableCounter, Grade.__tablename__)
+    assert counter.row_count == db.session.query(func.count(Grade.id)).scalar()
+
+
+def test_batch_with_errors_writes_nothing(client, admin_headers, school, evaluation, app_context):
+    grades = batch(school, evaluation, 8, 5) + [{'enrollment_id': 999999, 'evaluation_id': evaluation['id'], 'score': 1}]
+
+    response = post_batch(client, admin_headers, grades)
+
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == ['Grade 3: Enrollment not found']
+    assert scores(evaluation['id']) == []
+
+
+@pytest.mark.parametrize('grades', [None, [], 'not a list'])
+def test_batch_requires_a_list(client, admin_headers, school, grades):
+    response = client.post('/api/grades/batch', headers=admin_headers, json={'grades': grades})
+
+    assert response.status_code == 400
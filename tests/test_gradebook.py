@@ -0,0 +1,83 @@
+from src.models import db
+from src.models.class_group import ClassGroup
+from src.models.enrollment import Enrollment
+from src.models.evaluation import Evaluation
+from src.models.grade import Grade
+from src.utils.gradebook import build_class_gradebook
+from tests.conftest import count_queries
+
+
+def gradebook_per_row(class_group):
+    """The gradebook as built before, with one grade lookup per student and evaluation"""
+    evaluations = Evaluation.query.filter_by(class_group_id=class_group.id).all()
+    gradebook = {
+        'class': class_group.to_dict(),
+        'evaluations': [evaluation.to_dict() for evaluation in evaluations],
+        'students': []
+    }
+    for enrollment in Enrollment.query.filter_by(class_group_id=class_group.id, status='enrolled'):
+        student_data = {
+            'student': enrollment.student.to_dict(),
+            'enrollment': {
+                'id': enrollment.id,
+                'final_grade': float(enrollment.final_grade) if enrollment.final_grade else None,
+                'final_status': enrollment.final_status,
+                'attendance_percentage': enrollment.attendance_percentage
+            },
+            'grades': {}
+        }
+        for evaluation in evaluations:
+            grade = Grade.query.filter_by(enrollment_id=enrollment.id, evaluation_id=evaluation.id).first()
+            student_data['grades'][evaluation.id] = {
+                'score': float(grade.score) if grade and grade.score else None,
+                'comments': grade.comments if grade else None,
+                'graded_at': grade.graded_at.isoformat() if grade and grade.graded_at else None
+            }
+        gradebook['students'].append(student_data)
+    return gradebook
+
+
+def test_matches_per_row_gradebook(graded_class, app_context):
+    class_group = db.session.get(ClassGroup, graded_class['class']['id'])
+
+    gradebook = build_class_gradebook(class_group)
+
+    assert gradebook == gradebook_per_row(class_group)
+    assert [student['grades'][graded_class['evaluations'][0]['id']]['score'] for student in gradebook['students']] == [8, 4, None]
+
+
+def test_query_count_does_not_grow_with_the_class(client, admin_headers, graded_class, school, app):
+    class_id = graded_class['class']['id']
+    with app.app_context():
+        with count_queries() as before:
+            build_class_gradebook(db.session.get(ClassGroup, class_id))
+
+    response = client.post(f'/api/classes/{class_id}/students', headers=admin_headers,
+                           json={'student_id': school['students'][0]['id']})
+    assert response.status_code == 201, response.get_json()
+    response = client.post('/api/grades', headers=admin_headers, json={
+        'enrollment_id': response.get_json()['enrollment']['id'],
+        'evaluation_id': graded_class['evaluations'][1]['id'], 'score': 9
+    })
+    assert response.status_code == 201, response.get_json()
+
+    with app.app_context():
+        with count_queries() as after:
+            gradebook = build_class_gradebook(db.session.get(ClassGroup, class_id))
+
+    assert len(gradebook['students']) == 4
+    assert len(after) == len(before)
+
+
+def test_gradebook_endpoint(client, admin_headers, graded_class, app):
+    class_id = graded_class['class']['id']
+
+    response = client.get(f'/api/grades/class/{class_id}/gradebook', headers=admin_headers)
+
+    assert response.status_code == 200, response.get_json()
+    with app.app_context():
+        expected = gradebook_per_row(db.session.get(ClassGroup, class_id))
+    # JSON turns the evaluation ids keying each student's grades into strings
+    for student in expected['students']:
+        student['grades'] = {str(evaluation_id): grade for evaluation_id, grade in student['grades'].items()}
+    assert response.get_json() == expected
@@ -0,0 +1,144 @@
+import os
+from datetime import datetime, timedelta
+import pytest
+from src.models import db
+from src.models.job import Job
+from src.routes import reports
+from src.utils.jobs import claim_next_job, result_path, run_job, run_worker, sweep_job_results
+
+
+@pytest.fixture
+def transcript_path(school):
+    return f"/api/reports/student-transcript/{school['students'][0]['id']}"
+
+
+def enqueue(client, headers, path):
+    response = client.get(f'{path}?async=1', headers=headers)
+    assert response.status_code == 202, response.get_json()
+    assert response.headers['Location'] == f"/api/jobs/{response.get_json()['job']['id']}"
+    return response.get_json()['job']['id']
+
+
+def job_state(client, headers, job_id):
+    return client.get(f'/api/jobs/{job_id}', headers=headers).get_json()['job']
+
+
+def failing_build(student):
+    raise RuntimeError('database went away')
+
+
+def test_job_result_matches_the_synchronous_response(app, client, admin_headers, transcript_path):
+    job_id = enqueue(client, admin_headers, transcript_path)
+
+    assert run_worker(app, once=True) == 1
+
+    job = job_state(client, admin_headers, job_id)
+    assert (job['status'], job['attempts']) == ('succeeded', 1)
+    result = client.get(f'/api/jobs/{job_id}/result', headers=admin_headers)
+    assert result.status_code == 200
+    assert result.get_json() == client.get(transcript_path, headers=admin_headers).get_json()
+
+
+def test_server_error_is_retried_with_backoff(app, client, admin_headers, transcript_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_RETRY_DELAY', 60)
+    job_id = enqueue(client, admin_headers, transcript_path)
+
+    monkeypatch.setattr(reports, 'build_transcript', failing_build)
+    started = datetime.utcnow()
+    run_worker(app, once=True)
+
+    job = job_state(client, admin_headers, job_id)
+    assert (job['status'], job['attempts']) == ('queued', 1)
+    assert 'database went away' in job['error']
+    with app.app_context():
+        stored = db.session.get(Job, job_id)
+        assert stored.run_after >= started + timedelta(seconds=60)
+        # Skip the backoff; the endpoint has recovered
+        stored.run_after = datetime.utcnow()
+        db.session.commit()
+
+    monkeypatch.undo()
+    run_worker(app, once=True)
+
+    job = job_state(client, admin_headers, job_id)
+    assert (job['status'], job['attempts']) == ('succeeded', 2)
+
+
+def test_job_fails_after_max_attempts(app, client, admin_headers, transcript_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_RETRY_DELAY', 0)
+    monkeypatch.setattr(reports, 'build_transcript', failing_build)
+    job_id = enqueue(client, admin_headers, transcript_path)
+
+    run_worker(app, once=True)
+
+    job = job_state(client, admin_headers, job_id)
+    assert (job['status'], job['attempts']) == ('failed', app.config['JOB_MAX_ATTEMPTS'])
+    assert client.get(f'/api/jobs/{job_id}/result', headers=admin_headers).status_code == 409
+
+
+def test_client_error_is_not_retried(app, client, admin_headers, school):
+    job_id = enqueue(client, admin_headers, '/api/reports/student-transcript/999999')
+
+    run_worker(app, once=True)
+
+    job = job_state(client, admin_headers, job_id)
+    assert (job['status'], job['attempts']) == ('failed', 1)
+
+
+def test_reclaimed_job_ignores_the_stale_worker(app, client, admin_headers, transcript_path):
+    job_id = enqueue(client, admin_headers, transcript_path)
+    with app.app_context():
+        stale = claim_next_job('stale-worker')
+        # Past JOB_TIMEOUT the job looks orphaned and another worker takes it over
+        stale.started_at = stale.started_at - timedelta(seconds=app.config['JOB_TIMEOUT'] + 1)
+        db.session.commit()
+        stale_claim = (stale.id, stale.worker, stale.started_at)
+    assert stale_claim[0] == job_id
+
+    with app.app_context():
+        current = claim_next_job('current-worker')
+        current_claim = (current.id, current.worker, current.started_at)
+    assert current_claim[0] == job_id
+
+    assert run_job(app, stale_claim) is None
+    job = job_state(client, admin_headers, job_id)
+    assert (job['status'], job['attempts'], job['progress']) == ('running', 2, 0)
+
+    assert run_job(app, current_claim) == 'succeeded'
+    job = job_state(client, admin_headers, job_id)
+    assert (job['status'], job['attempts']) == ('succeeded', 2)
+    assert client.get(f'/api/jobs/{job_id}/result', headers=admin_headers).status_code == 200
+    with app.app_context():
+        assert not os.path.exists(result_path(*stale_claim[::2]))
+
+
+def test_sweep_removes_expired_and_orphaned_results(app, client, admin_headers, transcript_path, monkeypatch):
+    kept_id = enqueue(client, admin_headers, transcript_path)
+    run_worker(app, once=True)
+    expired_id = enqueue(client, admin_headers, transcript_path)
+    run_worker(app, once=True)
+
+    with app.app_context():
+        expired = db.session.get(Job, expired_id)
+        expired.finished_at = datetime.utcnow() - timedelta(seconds=app.config['JOB_RESULT_RETENTION'] + 1)
+        db.session.commit()
+        expired_path = result_path(expired.id, expired.started_at)
+        kept = db.session.get(Job, kept_id)
+        kept_path = result_path(kept.id, kept.started_at)
+
+        # Left behind by a reclaimed attempt: kept while a worker may still write it
+        orphan_path = result_path(kept_id, datetime(2000, 1, 1))
+        with open(orphan_path, 'w') as stream:
+            stream.write('{}')
+        assert sweep_job_results() == 1
+        assert not os.path.exists(expired_path)
+        assert os.path.exists(orphan_path)
+
+        # Earlier tests' retried attempts may leave unowned files of their own
+        monkeypatch.setitem(app.config, 'JOB_TIMEOUT', -1)
+        assert sweep_job_results() >= 1
+        assert not os.path.exists(orphan_path)
+        assert os.path.exists(kept_path)
+
+    assert client.get(f'/api/jobs/{expired_id}/result', headers=admin_headers).status_code == 410
+    assert client.get(f'/api/jobs/{kept_id}/result', headers=admin_headers).status_code == 200
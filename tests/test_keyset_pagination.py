@@ -0,0 +1,71 @@
+import pytest
+
+
+def walk(client, headers, path, **args):
+    """Follow next_cursor from the first page to the last, collecting every page"""
+    pages = []
+    cursor = None
+    while True:
+        query = dict(args, **({'cursor': cursor} if cursor else {}))
+        response = client.get(path, headers=headers, query_string=query)
+        assert response.status_code == 200, response.get_json()
+        data = response.get_json()
+        pages.append(data)
+        cursor = data['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def all_subjects(client, headers):
+    return client.get('/api/subjects?per_page=100', headers=headers).get_json()['subjects']
+
+
+@pytest.mark.parametrize('sort, key, reverse', [
+    ('id', lambda subject: subject['id'], False),
+    ('-id', lambda subject: subject['id'], True),
+    ('name', lambda subject: (subject['name'], subject['id']), False),
+    ('-name', lambda subject: (subject['name'], subject['id']), True)
+])
+def test_cursor_walk_visits_every_row_once_in_order(client, admin_headers, school, sort, key, reverse):
+    pages = walk(client, admin_headers, '/api/subjects', sort=sort, per_page=2)
+
+    walked = [subject for page in pages for subject in page['subjects']]
+    expected = sorted(all_subjects(client, admin_headers), key=key, reverse=reverse)
+    assert [subject['id'] for subject in walked] == [subject['id'] for subject in expected]
+    assert all(len(page['subjects']) == 2 for page in pages[:-1])
+    assert all(page['sort'] == sort and 'total' not in page for page in pages)
+
+
+def test_keyset_pages_render_like_offset_pages(client, admin_headers, school):
+    pages = walk(client, admin_headers, '/api/students', sort='name', per_page=1)
+
+    walked = {student['id']: student for page in pages for student in page['students']}
+    listed = client.get('/api/students?per_page=100', headers=admin_headers).get_json()['students']
+    offset = {student['id']: student for student in listed}
+    assert walked == offset
+
+
+def test_keyset_with_exact_total(client, admin_headers, school):
+    response = client.get('/api/subjects?sort=id&per_page=2&include_total=exact', headers=admin_headers)
+
+    assert response.get_json()['total'] == len(all_subjects(client, admin_headers))
+
+
+@pytest.mark.parametrize('query', [
+    'sort=unknown',
+    'sort=id&cursor=not-a-cursor',
+    'include_total=sometimes'
+])
+def test_invalid_keyset_arguments(client, admin_headers, school, query):
+    response = client.get(f'/api/subjects?{query}', headers=admin_headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['error']
+
+
+def test_cursor_is_bound_to_its_sort(client, admin_headers, school):
+    cursor = client.get('/api/subjects?sort=id&per_page=1', headers=admin_headers).get_json()['next_cursor']
+
+    response = client.get('/api/subjects', headers=admin_headers, query_string={'sort': 'name', 'cursor': cursor})
+
+    assert response.status_code == 400
@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+from src.models import db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS = os.path.join(ROOT, 'src', 'migrations')
+
+# A sample of the index pack, one per filtered table
+PACKED_INDEXES = [
+    ('users', 'ix_users_role_active'),
+    ('students', 'ix_students_course_status'),
+    ('class_groups', 'ix_class_groups_teacher_term'),
+    ('enrollments', 'ix_enrollments_class_group_status'),
+    ('grades', 'ix_grades_evaluation_score'),
+    ('attendance', 'ix_attendance_enrollment_status')
+]
+
+
+def run(database_url, *args):
+    """Run a command in a fresh interpreter against another database"""
+    result = subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env={**os.environ, 'DATABASE_URL': database_url},
+        capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def schema_drift(engine):
+    def include_object(object, name, type_, reflected, compare_to):
+        # Same filter as migrations/env.py: the FTS5 search index is not in the models
+        return not (type_ == 'table' and name.startswith('search_index'))
+
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={'include_object': include_object})
+        return compare_metadata(context, db.metadata)
+
+
+def head_revision():
+    config = Config(os.path.join(MIGRATIONS, 'alembic.ini'))
+    config.set_main_option('script_location', MIGRATIONS)
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'migrated.db'}"
+
+
+def check_migrated(database_url):
+    engine = create_engine(database_url)
+    try:
+        assert schema_drift(engine) == []
+        indexes = inspect(engine)
+        for table_name, index_name in PACKED_INDEXES:
+            assert index_name in {index['name'] for index in indexes.get_indexes(table_name)}
+        with engine.connect() as connection:
+            assert connection.execute(text('SELECT version_num FROM alembic_version')).scalar() == head_revision()
+    finally:
+        engine.dispose()
+
+
+def test_upgrade_builds_the_model_schema(database_url):
+    run(database_url, '-m', 'flask', '--app', 'src.main', 'db', 'upgrade')
+
+    check_migrated(database_url)
+
+
+def test_upgrade_adopts_a_create_all_database(database_url):
+    # Importing the app outside flask db creates the tables and seeds the default data
+    run(database_url, '-c', 'import src.main')
+    run(database_url, '-m', 'flask', '--app', 'src.main', 'db', 'upgrade')
+
+    check_migrated(database_url)
@@ -0,0 +1,67 @@
+import pytest
+from src.models.subject import Subject
+from src.utils.pagination import MAX_PER_PAGE
+
+LIST_ENDPOINTS = [
+    ('/api/students', 'students'),
+    ('/api/teachers', 'teachers'),
+    ('/api/courses', 'courses'),
+    ('/api/subjects', 'subjects'),
+    ('/api/classes', 'classes'),
+    ('/api/grades', 'grades')
+]
+
+
+@pytest.mark.parametrize('path, key', LIST_ENDPOINTS)
+@pytest.mark.parametrize('query', ['', '?include_total=estimate', '?include_total=none', '?search=a'])
+def test_plain_list_get(client, admin_headers, school, path, key, query):
+    response = client.get(f'{path}{query}', headers=admin_headers)
+
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()
+    assert isinstance(data[key], list)
+    assert data['current_page'] == 1
+
+
+def test_offset_pages_and_exact_total(client, admin_headers, school):
+    response = client.get('/api/subjects?per_page=2&page=2', headers=admin_headers)
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert len(data['subjects']) == 2
+    assert data['total'] > 2
+    assert data['pages'] == -(-data['total'] // 2)
+
+
+def test_estimated_total_of_unfiltered_list(client, admin_headers, school, app_context):
+    response = client.get('/api/subjects?include_total=estimate', headers=admin_headers)
+
+    data = response.get_json()
+    assert data['total_is_estimate'] is True
+    assert data['total'] == Subject.query.count()
+
+
+def test_estimated_total_falls_back_to_exact_when_filtered(client, admin_headers, school, app_context):
+    course_id = school['course_id']
+    response = client.get(f'/api/subjects?include_total=estimate&course_id={course_id}', headers=admin_headers)
+
+    data = response.get_json()
+    assert 'total_is_estimate' not in data
+    assert data['total'] == Subject.query.filter_by(course_id=course_id).count()
+
+
+def test_estimated_total_falls_back_to_exact_when_searching(client, admin_headers, school):
+    response = client.get('/api/students?include_total=estimate&search=maria', headers=admin_headers)
+
+    data = response.get_json()
+    assert 'total_is_estimate' not in data
+    assert data['total'] == 1
+
+
+@pytest.mark.parametrize('per_page', [0, -1, MAX_PER_PAGE + 1])
+@pytest.mark.parametrize('mode', ['', '&sort=id'])
+def test_out_of_range_page_size(client, admin_headers, school, per_page, mode):
+    response = client.get(f'/api/subjects?per_page={per_page}{mode}', headers=admin_headers)
+
+    assert response.status_code == 400
+    assert 'per_page' in response.get_json()['error']
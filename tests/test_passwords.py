@@ -0,0 +1,49 @@
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import pytest
+from src.utils import passwords
+from src.utils.passwords import PasswordPoolBusy
+
+
+@pytest.fixture(params=[PasswordPoolBusy('Password hashing queue is full'), FutureTimeoutError()])
+def saturated_pool(request, monkeypatch):
+    def refuse(function, *args):
+        raise request.param
+
+    monkeypatch.setattr(passwords, '_run', refuse)
+    return request.param
+
+
+def assert_retry_later(response):
+    assert response.status_code == 503, response.get_json()
+    assert response.headers['Retry-After'] == str(passwords.RETRY_AFTER_SECONDS)
+
+
+def test_login(client, saturated_pool):
+    assert_retry_later(client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'}))
+
+
+def test_change_password(client, admin_headers, saturated_pool):
+    response = client.post('/api/auth/change-password', headers=admin_headers, json={
+        'current_password': 'admin123', 'new_password': 'admin456'
+    })
+
+    assert_retry_later(response)
+
+
+def test_create_student(client, admin_headers, school, saturated_pool):
+    response = client.post('/api/students', headers=admin_headers, json={
+        'username': 'busy', 'email': 'busy@sga.com', 'password': 'student123', 'first_name': 'Busy',
+        'last_name': 'Pool', 'student_number': 'S999', 'course_id': school['course_id']
+    })
+
+    assert_retry_later(response)
+    assert client.get('/api/students?search=busy', headers=admin_headers).get_json()['students'] == []
+
+
+def test_create_user(client, admin_headers, saturated_pool):
+    response = client.post('/api/users', headers=admin_headers, json={
+        'username': 'busy.user', 'email': 'busy.user@sga.com', 'password': 'secret123',
+        'first_name': 'Busy', 'last_name': 'User', 'role': 'coordinator'
+    })
+
+    assert_retry_later(response)
@@ -0,0 +1,67 @@
+from src.models.class_group import ClassGroup
+from src.models.enrollment import Enrollment
+from src.models.evaluation import Evaluation
+from src.models.grade import Grade
+from src.utils.pending_grades import get_pending_grades
+
+
+def pending_per_pair(class_groups):
+    """The per evaluation/enrollment lookups the grouped anti-join replaced"""
+    pending = {}
+    for class_group in class_groups:
+        count = 0
+        for evaluation in Evaluation.query.filter_by(class_group_id=class_group.id):
+            for enrollment in Enrollment.query.filter_by(class_group_id=class_group.id, status='enrolled'):
+                if Grade.query.filter_by(enrollment_id=enrollment.id, evaluation_id=evaluation.id).first() is None:
+                    count += 1
+        if count:
+            pending[class_group.id] = count
+    return pending
+
+
+def test_matches_per_pair_lookups(graded_class, app_context):
+    class_groups = ClassGroup.query.all()
+    pending = get_pending_grades()
+
+    assert pending['by_class'] == pending_per_pair(class_groups)
+    assert pending['by_class'][graded_class['class']['id']] == 3
+    assert pending['total'] == sum(pending['by_class'].values())
+    assert sum(pending['by_teacher'].values()) == sum(pending['by_institution'].values()) == pending['total']
+
+
+def test_teacher_filter(graded_class, school, app_context):
+    teacher_id = school['teacher']['id']
+    pending = get_pending_grades(teacher_id=teacher_id)
+
+    assert pending['by_class'] == pending_per_pair(ClassGroup.query.filter_by(teacher_id=teacher_id))
+    assert list(pending['by_teacher']) == [teacher_id]
+
+
+def test_grading_and_dropping_clear_pending_pairs(app, client, admin_headers, graded_class):
+    class_id = graded_class['class']['id']
+    enrollments, evaluations = graded_class['enrollments'], graded_class['evaluations']
+
+    response = client.post('/api/grades', headers=admin_headers, json={
+        'enrollment_id': enrollments[1]['id'], 'evaluation_id': evaluations[1]['id'], 'score': 7
+    })
+    assert response.status_code == 201, response.get_json()
+    response = client.delete(f"/api/classes/{class_id}/students/{graded_class['students'][2]['id']}", headers=admin_headers)
+    assert response.status_code == 200, response.get_json()
+
+    with app.app_context():
+        assert get_pending_grades(class_group_ids=[class_id])['by_class'] == {}
+
+
+def test_teacher_workload_uses_the_grouped_counts(app, client, admin_headers, graded_class, school):
+    teacher_id = school['teacher']['id']
+
+    response = client.get(f'/api/reports/teacher-workload/{teacher_id}', headers=admin_headers)
+
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()
+    by_class = {item['class']['id']: item['pending_grades'] for item in data['classes']}
+    assert by_class[graded_class['class']['id']] == 3
+    with app.app_context():
+        expected = pending_per_pair(ClassGroup.query.filter_by(teacher_id=teacher_id))
+    assert {class_id: count for class_id, count in by_class.items() if count} == expected
+    assert data['summary']['pending_grades'] == sum(expected.values())
@@ -0,0 +1,15 @@
+def test_lookup_headers_hidden_by_default(client, admin_headers):
+    response = client.get('/api/auth/me', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert 'X-Identity-Lookups' not in response.headers
+    assert 'X-Identity-Lookups-Saved' not in response.headers
+
+
+def test_lookup_headers_when_enabled(app, client, admin_headers, monkeypatch):
+    monkeypatch.setitem(app.config, 'IDENTITY_LOOKUP_HEADERS', True)
+
+    response = client.get('/api/auth/me', headers=admin_headers)
+
+    assert response.headers['X-Identity-Lookups'] == '1'
+    assert int(response.headers['X-Identity-Lookups-Saved']) >= 1
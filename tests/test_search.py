@@ -0,0 +1,34 @@
+import pytest
+
+
+def names(client, headers, path, key, search):
+    response = client.get(path, headers=headers, query_string={'search': search})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()[key]
+
+
+@pytest.mark.parametrize('search', ['jose', 'José', 'JOSE', 'conceicao', 'Conceição'])
+def test_student_search_ignores_accents_and_case(client, admin_headers, school, search):
+    students = names(client, admin_headers, '/api/students', 'students', search)
+
+    assert [student['student_number'] for student in students] == ['S001']
+
+
+@pytest.mark.parametrize('search', ['programacao', 'Programação', 'PROGRAMACAO orientada'])
+def test_subject_search_ignores_accents(client, admin_headers, school, search):
+    subjects = names(client, admin_headers, '/api/subjects', 'subjects', search)
+
+    assert 'POO' in [subject['code'] for subject in subjects]
+
+
+def test_search_without_matches(client, admin_headers, school):
+    assert names(client, admin_headers, '/api/students', 'students', 'zzzz') == []
+
+
+def test_search_sees_later_writes(client, admin_headers, school):
+    student_id = school['students'][1]['id']
+    response = client.put(f'/api/students/{student_id}', headers=admin_headers, json={'last_name': 'Araújo'})
+    assert response.status_code == 200, response.get_json()
+
+    assert [s['id'] for s in names(client, admin_headers, '/api/students', 'students', 'araujo')] == [student_id]
+    assert names(client, admin_headers, '/api/students', 'students', 'souza') == []
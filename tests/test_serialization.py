@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import inspect
+from src.models import db
+from src.models.class_group import ClassGroup
+from src.models.course import Course
+from src.models.enrollment import Enrollment
+from src.models.evaluation import Evaluation
+from src.models.grade import Grade
+from src.models.student import Student
+from src.models.subject import Subject
+from src.models.teacher import Teacher
+from src.utils.serialization import with_graph
+from tests.conftest import count_queries
+
+MODELS = [Course, Subject, Teacher, Student, ClassGroup, Enrollment, Evaluation, Grade]
+
+
+@pytest.mark.parametrize('model', MODELS, ids=lambda model: model.__name__)
+def test_to_dict_runs_no_lazy_loads(graded_class, app_context, model):
+    primary_key = inspect(model).primary_key[0]
+    expected = [instance.to_dict() for instance in model.query.order_by(primary_key)]
+    db.session.expunge_all()
+
+    instances = with_graph(model.query.order_by(primary_key), model).all()
+    with count_queries() as statements:
+        rendered = [instance.to_dict() for instance in instances]
+
+    assert rendered == expected
+    assert statements == []
+
+
+@pytest.mark.parametrize('path', [
+    '/api/grades', '/api/students', '/api/teachers', '/api/classes', '/api/subjects', '/api/courses',
+    '/api/grades/evaluations'
+])
+def test_list_queries_do_not_grow_with_the_page(client, admin_headers, graded_class, app_context, path):
+    with count_queries() as one_row:
+        response = client.get(f'{path}?per_page=1', headers=admin_headers)
+    assert response.status_code == 200, response.get_json()
+
+    with count_queries() as full_page:
+        response = client.get(f'{path}?per_page=50', headers=admin_headers)
+    assert response.status_code == 200, response.get_json()
+
+    assert len(full_page) == len(one_row)
@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import inspect
+from src.models import db
+from src.models.class_group import ClassGroup
+from src.models.course import Course
+from src.models.grade import Grade
+from src.models.student import Student
+from src.models.subject import Subject
+from src.models.teacher import Teacher
+from src.utils.serializers import benchmark_serializer, serializer_for
+
+MODELS = [Student, Teacher, Course, Subject, ClassGroup, Grade]
+
+
+@pytest.fixture
+def graded(client, admin_headers, school):
+    response = client.post('/api/grades', headers=admin_headers, json={
+        'enrollment_id': school['enrollments'][0]['id'], 'evaluation_id': school['evaluation']['id'], 'score': 7.5
+    })
+    assert response.status_code in (200, 201), response.get_json()
+    return school
+
+
+@pytest.mark.parametrize('model', MODELS, ids=lambda model: model.__name__)
+def test_serializer_matches_to_dict(graded, app_context, model):
+    primary_key = inspect(model).primary_key[0]
+    serializer = serializer_for(model)
+
+    rows = db.session.execute(serializer.select().order_by(primary_key)).all()
+    expected = [instance.to_dict() for instance in model.query.order_by(primary_key)]
+
+    assert expected
+    assert serializer.all(rows) == expected
+
+
+@pytest.mark.parametrize('model', MODELS, ids=lambda model: model.__name__)
+def test_benchmark_reports_no_mismatches(graded, app_context, model):
+    result = benchmark_serializer(model, rows=100, repeat=1)
+
+    assert result['rows'] > 0
+    assert result['mismatches'] == 0
+
+
+def test_field_subset(graded, app_context):
+    serializer = serializer_for(Student, ['id', 'student_number'])
+
+    rows = db.session.execute(serializer.select().order_by(Student.id)).all()
+
+    assert serializer.all(rows) == [
+        {'id': student.id, 'student_number': student.student_number} for student in Student.query.order_by(Student.id)
+    ]
+
+
+def test_unknown_field_rejected():
+    with pytest.raises(ValueError):
+        serializer_for(Student, ['id', 'password'])
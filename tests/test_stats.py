@@ -0,0 +1,144 @@
+from datetime import datetime
+import pytest
+from src.models import db
+from src.models.class_group import ClassGroup
+from src.models.course import Course
+from src.models.institution import Institution
+from src.models.student import Student
+from src.models.subject import Subject
+from src.models.teacher import Teacher
+from src.models.user import User
+from tests.conftest import count_queries
+
+# The per-status and per-row computations the grouped statements replaced
+
+
+def user_stats():
+    return {
+        'total_users': User.query.count(),
+        'active_users': User.query.filter(User.is_active == True).count(),
+        'users_by_role': {
+            role: User.query.filter(User.role == role, User.is_active == True).count()
+            for role in ['admin', 'coordinator', 'teacher', 'student']
+        }
+    }
+
+
+def class_stats():
+    now = datetime.now()
+    current_semester = f'{now.year}.1' if now.month <= 6 else f'{now.year}.2'
+    stats = {
+        'total_classes': ClassGroup.query.count(),
+        'active_classes': ClassGroup.query.filter(ClassGroup.status == 'active').count(),
+        'classes_by_status': {
+            status: ClassGroup.query.filter(ClassGroup.status == status).count()
+            for status in ['planned', 'active', 'completed', 'cancelled']
+        },
+        'classes_by_semester': {},
+        'average_enrollment': 0
+    }
+    for class_group in ClassGroup.query.filter(ClassGroup.semester == current_semester):
+        stats['classes_by_semester'][class_group.semester] = stats['classes_by_semester'].get(class_group.semester, 0) + 1
+    open_classes = ClassGroup.query.filter(ClassGroup.status.in_(['active', 'planned'])).all()
+    if open_classes:
+        total = sum(class_group.enrolled_students_count for class_group in open_classes)
+        stats['average_enrollment'] = round(total / len(open_classes), 2)
+    return stats
+
+
+def subject_stats():
+    active = Subject.query.filter(Subject.is_active == True).all()
+    stats = {
+        'total_subjects': Subject.query.count(),
+        'active_subjects': len(active),
+        'mandatory_subjects': len([subject for subject in active if subject.is_mandatory]),
+        'elective_subjects': len([subject for subject in active if not subject.is_mandatory]),
+        'subjects_by_course': {
+            course.name: Subject.query.filter(Subject.course_id == course.id, Subject.is_active == True).count()
+            for course in Course.query.filter(Course.is_active == True)
+        },
+        'average_credits': 0,
+        'average_workload': 0
+    }
+    if active:
+        stats['average_credits'] = round(sum(subject.credits for subject in active) / len(active), 2)
+        stats['average_workload'] = round(sum(subject.workload_hours for subject in active) / len(active), 2)
+    return stats
+
+
+def course_stats():
+    return {
+        'total_courses': Course.query.count(),
+        'active_courses': Course.query.filter(Course.is_active == True).count(),
+        'courses_by_degree_type': {
+            degree_type: Course.query.filter(Course.degree_type == degree_type, Course.is_active == True).count()
+            for degree_type in ['bachelor', 'master', 'doctorate', 'technical', 'other']
+        },
+        'courses_by_institution': {
+            institution.name: Course.query.filter(Course.institution_id == institution.id, Course.is_active == True).count()
+            for institution in Institution.query.filter(Institution.is_active == True)
+        }
+    }
+
+
+def teacher_stats():
+    return {
+        'total_teachers': Teacher.query.count(),
+        'active_teachers': Teacher.query.filter(Teacher.status == 'active').count(),
+        'teachers_by_status': {
+            status: Teacher.query.filter(Teacher.status == status).count()
+            for status in ['active', 'inactive', 'on_leave']
+        },
+        'teachers_by_department': {
+            department: Teacher.query.filter(Teacher.department == department, Teacher.status == 'active').count()
+            for (department,) in db.session.query(Teacher.department).distinct() if department
+        },
+        'teachers_by_degree': {
+            degree: Teacher.query.filter(Teacher.academic_degree == degree, Teacher.status == 'active').count()
+            for degree in ['bachelor', 'master', 'doctorate', 'post_doctorate']
+        }
+    }
+
+
+def student_stats():
+    return {
+        'total_students': Student.query.count(),
+        'active_students': Student.query.filter(Student.status == 'active').count(),
+        'students_by_status': {
+            status: Student.query.filter(Student.status == status).count()
+            for status in ['active', 'inactive', 'graduated', 'dropped', 'suspended']
+        },
+        'students_by_course': {
+            course.name: Student.query.filter(Student.course_id == course.id, Student.status == 'active').count()
+            for course in Course.query
+        }
+    }
+
+
+STATS = [
+    ('/api/users/stats', user_stats),
+    ('/api/classes/stats', class_stats),
+    ('/api/subjects/stats', subject_stats),
+    ('/api/courses/stats', course_stats),
+    ('/api/teachers/stats', teacher_stats),
+    ('/api/students/stats', student_stats)
+]
+
+
+@pytest.mark.parametrize('path, per_row', STATS, ids=[path for path, _ in STATS])
+def test_matches_per_row_stats(client, admin_headers, graded_class, app, path, per_row):
+    response = client.get(path, headers=admin_headers)
+
+    assert response.status_code == 200, response.get_json()
+    with app.app_context():
+        assert response.get_json() == per_row()
+
+
+@pytest.mark.parametrize('path', [path for path, _ in STATS])
+def test_stats_run_a_fixed_number_of_statements(client, admin_headers, graded_class, app_context, path):
+    with count_queries() as statements:
+        response = client.get(path, headers=admin_headers)
+
+    assert response.status_code == 200, response.get_json()
+    # One summary statement and at most one GROUP BY, besides a token version check
+    assert len(statements) <= 3
@@ -0,0 +1,70 @@
+from sqlalchemy import delete, func, insert
+from src.models import db
+from src.models.course import Course
+from src.models.subject import Subject
+from src.models.table_counter import COUNTED_TABLES, TableCounter
+from src.utils.table_counters import estimated_count, rebuild_table_counters
+
+
+def counted(model):
+    db.session.expire_all()
+    return db.session.get(TableCounter, model.__tablename__).row_count
+
+
+def exact(model):
+    return db.session.query(func.count()).select_from(model).scalar()
+
+
+def course_row(code):
+    institution_id = Course.query.first().institution_id
+    return {
+        'institution_id': institution_id, 'name': f'Curso {code}', 'code': code,
+        'duration_semesters': 8, 'total_credits': 200, 'degree_type': 'bachelor'
+    }
+
+
+def test_fresh_schema_seeds_every_counter(app_context):
+    assert {counter.table_name for counter in TableCounter.query} >= set(COUNTED_TABLES)
+
+
+def test_orm_writes_move_the_counter(school, app_context):
+    course_id = school['course_id']
+    subject = Subject(course_id=course_id, name='Contagem', code='CNT101', credits=2, workload_hours=30)
+    db.session.add(subject)
+    db.session.commit()
+    assert counted(Subject) == exact(Subject)
+
+    db.session.delete(subject)
+    db.session.commit()
+    assert counted(Subject) == exact(Subject)
+
+
+def test_core_writes_move_the_counter(app_context):
+    courses = Course.__table__
+    db.session.execute(insert(courses), [course_row(f'CORE{n}') for n in range(3)])
+    db.session.commit()
+    assert counted(Course) == exact(Course)
+
+    db.session.execute(delete(courses).where(courses.c.code.like('CORE%')))
+    db.session.commit()
+    assert counted(Course) == exact(Course)
+
+
+def test_rolled_back_writes_leave_the_counter(app_context):
+    before = counted(Course)
+    db.session.add(Course(**course_row('UNDO1')))
+    db.session.flush()
+    db.session.rollback()
+
+    assert counted(Course) == before == exact(Course)
+
+
+def test_reads_never_seed_a_counter(app_context):
+    db.session.delete(db.session.get(TableCounter, Course.__tablename__))
+    db.session.commit()
+
+    assert estimated_count(Course) == exact(Course)
+    assert db.session.get(TableCounter, Course.__tablename__) is None
+
+    assert rebuild_table_counters() == len(COUNTED_TABLES)
+    assert counted(Course) == exact(Course)
@@ -0,0 +1,106 @@
+import time
+import pytest
+from src.utils import transcripts
+
+
+def download(client, headers, student_id, timeout=30):
+    """Poll the PDF route until the background render is done"""
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(f'/api/reports/student-transcript/{student_id}/pdf', headers=headers)
+        if response.status_code != 202 or time.monotonic() > deadline:
+            return response
+        time.sleep(0.2)
+
+
+def test_transcript_pdf_revalidates_without_rebuilding(client, admin_headers, school, monkeypatch):
+    student_id = school['students'][0]['id']
+    response = download(client, admin_headers, student_id)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert response.data.startswith(b'%PDF')
+    etag = response.headers['ETag']
+
+    def unexpected_build(student):
+        raise AssertionError('transcript rebuilt at unchanged versions')
+
+    monkeypatch.setattr(transcripts, 'build_transcript', unexpected_build)
+
+    revalidated = client.get(
+        f'/api/reports/student-transcript/{student_id}/pdf', headers={**admin_headers, 'If-None-Match': etag}
+    )
+    assert revalidated.status_code == 304
+
+    repeated = client.get(f'/api/reports/student-transcript/{student_id}/pdf', headers=admin_headers)
+    assert repeated.status_code == 200
+    assert repeated.data == response.data
+
+
+@pytest.fixture
+def other_class_grade(client, admin_headers, school):
+    """Posts a grade in a class the school's students are not enrolled in"""
+    def post(path, payload):
+        response = client.post(path, headers=admin_headers, json=payload)
+        assert response.status_code in (200, 201), response.get_json()
+        return response.get_json()
+
+    class_group = post('/api/classes', {
+        'subject_id': school['subject']['id'], 'teacher_id': school['teacher']['id'], 'semester': '1',
+        'year': 2026, 'class_code': 'T-OTHER'
+    })['class']
+    student = post('/api/students', {
+        'username': 'other.student', 'email': 'other.student@sga.com', 'password': 'student123',
+        'first_name': 'Outra', 'last_name': 'Turma', 'student_number': 'S-OTHER', 'course_id': school['course_id']
+    })['student']
+    enrollment = post(f"/api/classes/{class_group['id']}/students", {'student_id': student['id']})['enrollment']
+    evaluation = post('/api/grades/evaluations', {
+        'class_group_id': class_group['id'], 'evaluation_type_id': school['evaluation']['evaluation_type_id'],
+        'name': 'Prova', 'weight': 1, 'max_score': 10
+    })['evaluation']
+
+    def grade(score):
+        post('/api/grades', {'enrollment_id': enrollment['id'], 'evaluation_id': evaluation['id'], 'score': score})
+    return grade
+
+
+def test_writes_to_other_classes_keep_the_cached_pdf(client, admin_headers, school, other_class_grade, monkeypatch):
+    student_id = school['students'][0]['id']
+    etag = download(client, admin_headers, student_id).headers['ETag']
+
+    other_class_grade(7)
+
+    def unexpected_build(student):
+        raise AssertionError('transcript rebuilt after a write to another class')
+
+    monkeypatch.setattr(transcripts, 'build_transcript', unexpected_build)
+    revalidated = client.get(
+        f'/api/reports/student-transcript/{student_id}/pdf', headers={**admin_headers, 'If-None-Match': etag}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_writes_to_own_class_rebuild_the_transcript(client, admin_headers, school, monkeypatch):
+    student_id = school['students'][0]['id']
+    etag = download(client, admin_headers, student_id).headers['ETag']
+    built = []
+    build = transcripts.build_transcript
+    monkeypatch.setattr(transcripts, 'build_transcript', lambda student: built.append(student.id) or build(student))
+
+    client.post('/api/grades', headers=admin_headers, json={
+        'enrollment_id': school['enrollments'][0]['id'], 'evaluation_id': school['evaluation']['id'], 'score': 3.5
+    })
+    response = download(client, admin_headers, student_id)
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert set(built) == {student_id}
+
+
+def test_resolved_versions_are_bounded(app, client, admin_headers, school, monkeypatch):
+    monkeypatch.setitem(app.config, 'TRANSCRIPT_RESOLVED_CACHE_SIZE', 1)
+
+    for student in school['students']:
+        download(client, admin_headers, student['id'])
+
+    assert list(transcripts._resolved) == [school['students'][-1]['id']]